@@ -56,16 +56,12 @@ class Appartement(models.Model):
     
     def get_occupation_actuelle(self):
         """Vérifier si appartement occupé aujourd'hui"""
+        from datetime import timedelta
         from django.utils import timezone
-        from apps.reservations.models import Reservation
+        from apps.reservations.disponibilite import DisponibiliteService
         
         today = timezone.now().date()
-        return Reservation.objects.filter(
-            appartement=self,
-            date_arrivee__lte=today,
-            date_depart__gt=today,
-            statut__in=['confirmee', 'en_cours']
-        ).exists()
+        return not DisponibiliteService.est_disponible(self, today, today + timedelta(days=1))
     
     def get_photo_principale(self):
         return self.photos.filter(est_principale=True).first()
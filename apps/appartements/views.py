@@ -11,6 +11,7 @@ from apps.notifications.services import NotificationService
 from apps.users.views import is_gestionnaire
 from .models import Appartement, PhotoAppartement
 from apps.appartements.forms import AppartementForm, PhotoAppartementForm
+from utils.pagination import paginer, demande_json, reponse_json
 
 @login_required
 @user_passes_test(is_gestionnaire)
@@ -33,6 +34,10 @@ def liste_appartements(request):
             Q(maison__icontains=recherche)
         )
     
+    appartements = paginer(request, appartements, ('numero', 'pk'))
+    if demande_json(request):
+        return reponse_json(appartements, _serialiser_appartement)
+    
     # AJOUT : Calcul des statistiques par statut
     from django.db.models import Count
     stats_statut = Appartement.objects.values('statut').annotate(
@@ -96,6 +101,16 @@ def liste_appartements(request):
     }
     return render(request, 'appartements/liste.html', context)
 
+def _serialiser_appartement(appartement):
+    return {
+        'id': appartement.pk,
+        'numero': appartement.numero,
+        'maison': appartement.maison,
+        'type_logement': appartement.type_logement,
+        'statut': appartement.statut,
+        'prix_par_nuit': str(appartement.prix_par_nuit),
+    }
+
 @login_required
 @user_passes_test(is_gestionnaire)
 def detail_appartement(request, pk):
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ClientsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.clients'
+
+    def ready(self):
+        """Importer les signaux"""
+        try:
+            import apps.clients.signals
+        except ImportError:
+            pass
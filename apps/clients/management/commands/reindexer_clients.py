@@ -0,0 +1,12 @@
+# apps/clients/management/commands/reindexer_clients.py
+from django.core.management.base import BaseCommand
+
+from apps.clients.recherche import RechercheClients
+
+
+class Command(BaseCommand):
+    help = "Reconstruire l'index de recherche des clients (noms repliés, chiffres du téléphone)"
+
+    def handle(self, *args, **options):
+        total = RechercheClients.reindexer()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} clients réindexés'))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.clients.recherche import RechercheClients, champs_recherche
+
+
+def remplir_index(apps, schema_editor):
+    """Champs normalisés et jetons des clients existants"""
+    Client = apps.get_model('clients', 'Client')
+    JetonClient = apps.get_model('clients', 'JetonClient')
+
+    jetons = []
+    for client in Client.objects.all().iterator(chunk_size=500):
+        client.nom_normalise, client.telephone_chiffres = champs_recherche(client)
+        client.save(update_fields=['nom_normalise', 'telephone_chiffres'])
+        jetons += [JetonClient(client=client, jeton=jeton) for jeton in RechercheClients.jetons_client(client)]
+    JetonClient.objects.bulk_create(jetons, batch_size=1000)
+
+
+def creer_index_trigramme(apps, schema_editor):
+    """PostgreSQL : index GIN pg_trgm pour le repli par similarité (sans effet ailleurs)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS client_nom_trgm_idx ON clients_client '
+        'USING gin (nom_normalise gin_trgm_ops)'
+    )
+
+
+def supprimer_index_trigramme(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS client_nom_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0007_remove_client_unique_telephone_complet_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='nom_normalise',
+            field=models.CharField(blank=True, editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='telephone_chiffres',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.CreateModel(
+            name='JetonClient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jeton', models.CharField(db_index=True, max_length=100)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jetons_recherche', to='clients.client')),
+            ],
+            options={
+                'verbose_name': 'Jeton de recherche client',
+                'verbose_name_plural': 'Jetons de recherche clients',
+                'constraints': [models.UniqueConstraint(fields=('client', 'jeton'), name='jeton_client_unique')],
+            },
+        ),
+        migrations.RunPython(remplir_index, migrations.RunPython.noop),
+        migrations.RunPython(creer_index_trigramme, supprimer_index_trigramme),
+    ]
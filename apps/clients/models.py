@@ -59,9 +59,22 @@ class Client(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
     
+    # Recherche (calculés à l'enregistrement, voir recherche.py)
+    nom_normalise = models.CharField(max_length=201, blank=True, editable=False)
+    telephone_chiffres = models.CharField(max_length=20, blank=True, editable=False, db_index=True)
+    
     def __str__(self):
         return f"{self.prenom} {self.nom}"
     
+    def save(self, *args, **kwargs):
+        from .recherche import champs_recherche
+        
+        self.nom_normalise, self.telephone_chiffres = champs_recherche(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'nom_normalise', 'telephone_chiffres'}
+        super().save(*args, **kwargs)
+    
     def get_nombre_sejours(self):
         """Nombre de séjours effectués"""
         return self.reservation_set.filter(statut='terminee').count()
@@ -69,4 +82,23 @@ class Client(models.Model):
     class Meta:
         verbose_name = 'Client'
         verbose_name_plural = 'Clients'
-        ordering = ['nom', 'prenom']
\ No newline at end of file
+        ordering = ['nom', 'prenom']
+
+
+class JetonClient(models.Model):
+    """
+    Index de recherche : un mot du nom/prénom (replié, sans accents) ou les
+    chiffres du téléphone, par client. Recherché par préfixe sur l'index.
+    """
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name='jetons_recherche')
+    jeton = models.CharField(max_length=100, db_index=True)
+    
+    def __str__(self):
+        return f"{self.client_id} - {self.jeton}"
+    
+    class Meta:
+        verbose_name = 'Jeton de recherche client'
+        verbose_name_plural = 'Jetons de recherche clients'
+        constraints = [
+            models.UniqueConstraint(fields=['client', 'jeton'], name='jeton_client_unique'),
+        ]
@@ -0,0 +1,162 @@
+# ==========================================
+# apps/clients/recherche.py - Index de recherche des clients (nom / téléphone)
+# ==========================================
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+# Fin de plage pour une recherche par préfixe en parcours d'index (jeton >= q et < q + FIN)
+FIN_PREFIXE = '\uffff'
+LONGUEUR_JETON = 100
+SIMILARITE_MIN = 0.3
+# Au-delà, l'OFFSET n'a plus de sens pour une saisie semi-automatique (et déborde)
+PAGE_MAX = 1000
+
+_REQUETE_TELEPHONE = re.compile(r'^[\d\s+().\-/]+$')
+
+
+def replier(texte):
+    """Minuscules sans accents : 'Éloïse N'Dongo' -> "eloise n'dongo\""""
+    texte = unicodedata.normalize('NFKD', texte or '')
+    return ''.join(c for c in texte if not unicodedata.combining(c)).lower()
+
+
+def jetons_texte(texte):
+    """Mots repliés : 'Jean-Pierre' -> ['jean', 'pierre']"""
+    return [jeton[:LONGUEUR_JETON] for jeton in re.findall(r'\w+', replier(texte))]
+
+
+def chiffres_telephone(telephone):
+    """(numéro national, numéro complet) en chiffres : ('699123456', '237699123456')"""
+    if not telephone:
+        return '', ''
+    national = getattr(telephone, 'national_number', None)
+    indicatif = getattr(telephone, 'country_code', None)
+    if national is None:
+        chiffres = re.sub(r'\D', '', str(telephone))
+        return chiffres, chiffres
+    return str(national), f'{indicatif}{national}'
+
+
+def champs_recherche(client):
+    """(nom_normalise, telephone_chiffres) stockés sur la fiche client"""
+    return replier(f'{client.nom} {client.prenom}').strip()[:201], chiffres_telephone(client.telephone)[0]
+
+
+def _prefixe(jeton):
+    """
+    Jetons commençant par `jeton`. PostgreSQL : LIKE 'x%' servi par l'index
+    varchar_pattern_ops créé par Django ; SQLite : plage (son LIKE n'utilise pas l'index).
+    """
+    if connection.vendor == 'postgresql':
+        return Q(jeton__startswith=jeton)
+    return Q(jeton__gte=jeton, jeton__lt=jeton + FIN_PREFIXE)
+
+
+def jetons_requete(requete):
+    """Jetons d'une saisie ; un numéro saisi avec espaces ('6 99 12 34 56') forme un seul jeton"""
+    requete = (requete or '').strip()
+    if _REQUETE_TELEPHONE.match(requete) and re.search(r'\d', requete):
+        chiffres = re.sub(r'\D', '', requete)
+        # Préfixe international 00 : '00237 6...' -> '2376...'
+        if chiffres.startswith('00'):
+            chiffres = chiffres[2:]
+        return [chiffres] if chiffres else []
+    return jetons_texte(requete)
+
+
+class RechercheClients:
+    """
+    Recherche par préfixe de mots (nom, prénom) et de chiffres (téléphone)
+    sur la table de jetons, en parcours d'index quel que soit le SGBD.
+    Sur PostgreSQL, repli par similarité trigramme quand rien ne correspond
+    (fautes de frappe).
+    """
+
+    @staticmethod
+    def jetons_client(client):
+        national, complet = chiffres_telephone(client.telephone)
+        jetons = set(jetons_texte(client.nom)) | set(jetons_texte(client.prenom))
+        jetons.update(jeton for jeton in (national, complet) if jeton)
+        return jetons
+
+    @staticmethod
+    def indexer(client):
+        """Réécrit les jetons d'un client s'ils ont changé"""
+        from .models import JetonClient
+
+        attendus = RechercheClients.jetons_client(client)
+        existants = set(client.jetons_recherche.values_list('jeton', flat=True))
+        if attendus == existants:
+            return
+
+        with transaction.atomic():
+            client.jetons_recherche.filter(jeton__in=existants - attendus).delete()
+            JetonClient.objects.bulk_create([
+                JetonClient(client=client, jeton=jeton) for jeton in attendus - existants
+            ])
+
+    @staticmethod
+    def reindexer(clients=None):
+        """Reconstruit l'index (tous les clients par défaut) ; renvoie le nombre de clients"""
+        from .models import Client, JetonClient
+
+        clients = clients if clients is not None else Client.objects.all()
+        total = 0
+        with transaction.atomic():
+            for client in clients.iterator(chunk_size=500):
+                nom_normalise, telephone_chiffres = champs_recherche(client)
+                Client.objects.filter(pk=client.pk).update(
+                    nom_normalise=nom_normalise, telephone_chiffres=telephone_chiffres
+                )
+                JetonClient.objects.filter(client=client).delete()
+                JetonClient.objects.bulk_create([
+                    JetonClient(client=client, jeton=jeton)
+                    for jeton in RechercheClients.jetons_client(client)
+                ])
+                total += 1
+        return total
+
+    @staticmethod
+    def filtrer(clients, requete):
+        """
+        Clients correspondant à tous les jetons saisis, classés par pertinence
+        (mots exacts d'abord, puis préfixes), puis par nom.
+        """
+        from .models import JetonClient
+
+        jetons = jetons_requete(requete)
+        if not jetons:
+            return clients
+
+        base = clients
+        for jeton in jetons:
+            clients = clients.filter(pk__in=JetonClient.objects.filter(_prefixe(jeton)).values('client_id'))
+
+        resultats = clients.annotate(
+            pertinence=Count('jetons_recherche', filter=Q(jetons_recherche__jeton__in=jetons), distinct=True)
+        ).order_by('-pertinence', 'nom', 'prenom', 'pk')
+
+        if connection.vendor == 'postgresql' and not jetons[0].isdigit() and not resultats.exists():
+            return RechercheClients._similaires(base, ' '.join(jetons))
+        return resultats
+
+    @staticmethod
+    def _similaires(clients, texte):
+        """Repli PostgreSQL : similarité trigramme sur le nom replié (index GIN pg_trgm)"""
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return clients.annotate(
+            pertinence=TrigramWordSimilarity(texte, 'nom_normalise')
+        ).filter(pertinence__gte=SIMILARITE_MIN).order_by('-pertinence', 'nom', 'prenom', 'pk')
+
+    @staticmethod
+    def page(requete, page=1, taille=10):
+        """Une page de résultats (sans COUNT) : (clients, page suivante existe)"""
+        from .models import Client
+
+        debut = (page - 1) * taille
+        clients = list(RechercheClients.filtrer(Client.objects.all(), requete)[debut:debut + taille + 1])
+        return clients[:taille], len(clients) > taille
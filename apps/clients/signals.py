@@ -0,0 +1,16 @@
+# ==========================================
+# apps/clients/signals.py - Index de recherche des clients
+# ==========================================
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Client
+from .recherche import RechercheClients
+
+
+@receiver(post_save, sender=Client)
+def indexer_client(sender, instance, raw=False, **kwargs):
+    """Jetons nom/prénom/téléphone tenus à jour à chaque enregistrement (suppression : cascade)"""
+    if raw:
+        return
+    RechercheClients.indexer(instance)
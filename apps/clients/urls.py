@@ -15,6 +15,7 @@ urlpatterns = [
     
     # Recherche selon cahier (nom ou téléphone)
     path('recherche/', views.recherche_clients, name='recherche'),
+    path('api/recherche/', views.api_recherche_clients, name='api_recherche'),
     
     # Historique des séjours selon cahier
     path('<int:pk>/historique/', views.historique_sejours, name='historique'),
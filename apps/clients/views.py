@@ -2,29 +2,35 @@
 # apps/clients/views.py - Gestion clients simple
 # ==========================================
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import JsonResponse
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Q
 
 from apps.reservations.models import Reservation
 from apps.users.views import is_gestionnaire, is_receptionniste
 from .models import Client
 from .forms import ClientForm
+from .recherche import PAGE_MAX, RechercheClients
+from utils.pagination import paginer, demande_json, reponse_json
 
 @login_required
 @user_passes_test(is_receptionniste)
 def liste_clients(request):
     """Liste des clients avec recherche selon cahier - Accessible aux réceptionnistes"""
     clients = Client.objects.all()
+    ordre = ('nom', 'prenom', 'pk')
 
-    # Recherche par nom ou téléphone selon cahier
+    # Recherche par nom ou téléphone selon cahier (index de jetons, voir recherche.py)
     recherche = request.GET.get('q')
     if recherche:
-        clients = clients.filter(
-            Q(nom__icontains=recherche) |
-            Q(prenom__icontains=recherche) |
-            Q(telephone__icontains=recherche)
-        )
+        clients = RechercheClients.filtrer(clients, recherche)
+        if 'pertinence' in clients.query.annotations:
+            ordre = ('-pertinence', 'nom', 'prenom', 'pk')
+
+    clients = paginer(request, clients, ordre)
+    if demande_json(request):
+        return reponse_json(clients, _serialiser_client)
 
     context = {
         'clients': clients,
@@ -32,6 +38,16 @@ def liste_clients(request):
     }
     return render(request, 'clients/liste.html', context)
 
+def _serialiser_client(client):
+    return {
+        'id': client.pk,
+        'nom': client.nom,
+        'prenom': client.prenom,
+        'telephone': str(client.telephone),
+        'email': client.email,
+        'url': reverse('clients:detail', args=[client.pk]),
+    }
+
 @login_required
 @user_passes_test(is_receptionniste)
 def detail_client(request, pk):
@@ -115,11 +131,7 @@ def recherche_clients(request):
     """Recherche de clients selon cahier"""
     if request.method == 'POST':
         q = request.POST.get('q')
-        clients = Client.objects.filter(
-            Q(nom__icontains=q) |
-            Q(prenom__icontains=q) |
-            Q(telephone__icontains=q)
-        )
+        clients = RechercheClients.filtrer(Client.objects.all(), q)
         
         context = {
             'clients': clients,
@@ -128,4 +140,27 @@ def recherche_clients(request):
         return render(request, 'clients/recherche_clients.html', context)
     else:
         messages.error(request, 'Veuillez utiliser le formulaire de recherche.')
-        return redirect('clients:liste')
\ No newline at end of file
+        return redirect('clients:liste')
+
+@login_required
+@user_passes_test(is_receptionniste)
+def api_recherche_clients(request):
+    """Saisie semi-automatique (check-in) : résultats classés, paginés, en JSON"""
+    q = request.GET.get('q', '').strip()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        taille = min(max(int(request.GET.get('taille', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'Paramètres de pagination invalides'}, status=400)
+    if page > PAGE_MAX:
+        return JsonResponse({'error': f'Page limitée à {PAGE_MAX}'}, status=400)
+
+    if not q:
+        return JsonResponse({'resultats': [], 'page': page, 'page_suivante': False})
+
+    clients, suivante = RechercheClients.page(q, page=page, taille=taille)
+    return JsonResponse({
+        'resultats': [_serialiser_client(client) for client in clients],
+        'page': page,
+        'page_suivante': suivante,
+    })
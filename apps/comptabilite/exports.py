@@ -0,0 +1,14 @@
+# ==========================================
+# apps/comptabilite/exports.py - Colonnes d'export comptable
+# ==========================================
+from utils.exports import Colonne, SpecExport
+
+EXPORT_MOUVEMENTS = SpecExport('mouvements', [
+    Colonne('Date', 'date_mouvement'),
+    Colonne('Appartement', 'appartement.numero'),
+    Colonne('Type', 'get_type_mouvement_display'),
+    Colonne('Libellé', 'libelle'),
+    Colonne('Montant (FCFA)', 'montant'),
+    Colonne('Réservation', 'reservation_id'),
+    Colonne('Saisi par', lambda m: m.gestionnaire.get_full_name() if m.gestionnaire else ''),
+], select_related=('appartement', 'gestionnaire'))
@@ -0,0 +1,73 @@
+# apps/comptabilite/management/commands/reconcilier_comptabilite.py
+from django.core.management.base import BaseCommand
+
+from apps.comptabilite.models import SerieJournaliere, SyntheseMensuelle
+from apps.paiements.reglement import ReglementService
+
+
+class Command(BaseCommand):
+    help = 'Vérifier (et corriger) les revenus des paiements, la synthèse mensuelle et la série journalière à partir des données sources'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Afficher les écarts sans corriger'
+        )
+
+    def handle(self, *args, **options):
+        corriger = not options['dry_run']
+
+        # Paiements dont le traitement a échoué (ni revenu ni facture), puis
+        # revenus automatiques : les synthèses se recalculent à partir d'eux
+        incomplets = ReglementService.reprendre_incomplets(corriger=corriger)
+
+        for echeance_id in incomplets:
+            self.stdout.write(f'  Incomplet : paiement #{echeance_id} sans revenu ou sans facture')
+
+        if not incomplets:
+            self.stdout.write(self.style.SUCCESS('✅ Paiements encaissés tous traités'))
+        elif corriger:
+            restants = len(ReglementService.reprendre_incomplets(corriger=False))
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(incomplets) - restants} paiements repris'))
+            if restants:
+                self.stdout.write(self.style.WARNING(f'⚠️ {restants} paiements toujours en échec (voir les logs)'))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(incomplets)} paiements incomplets (non repris)'))
+
+        ecarts = ReglementService.reconcilier_revenus(corriger=corriger)
+
+        for echeance_id in ecarts:
+            self.stdout.write(f'  Écart : revenu du paiement #{echeance_id}')
+
+        if not ecarts:
+            self.stdout.write(self.style.SUCCESS('✅ Revenus des paiements cohérents'))
+        elif corriger:
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(ecarts)} revenus corrigés'))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(ecarts)} revenus en écart (non corrigés)'))
+
+        ecarts = SyntheseMensuelle.reconcilier(corriger=corriger)
+
+        for appartement_id, annee, mois in ecarts:
+            self.stdout.write(f'  Écart : appartement {appartement_id} - {mois:02d}/{annee}')
+
+        if not ecarts:
+            self.stdout.write(self.style.SUCCESS('✅ Synthèse mensuelle cohérente'))
+        elif corriger:
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(ecarts)} mois corrigés'))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(ecarts)} mois en écart (non corrigés)'))
+
+        # Série journalière : mises à jour en masse (.update) non vues par les signaux
+        ecarts = SerieJournaliere.reconcilier(corriger=corriger)
+
+        for appartement_id, jour, mode_paiement in ecarts:
+            self.stdout.write(f'  Écart : appartement {appartement_id} - {jour:%d/%m/%Y} {mode_paiement or "réservations"}')
+
+        if not ecarts:
+            self.stdout.write(self.style.SUCCESS('✅ Série journalière cohérente'))
+        elif corriger:
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(ecarts)} jours corrigés'))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(ecarts)} jours en écart (non corrigés)'))
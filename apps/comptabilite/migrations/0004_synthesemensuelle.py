@@ -0,0 +1,60 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def remplir_synthese(apps, schema_editor):
+    """Cumuls initiaux depuis les mouvements existants"""
+    ComptabiliteAppartement = apps.get_model('comptabilite', 'ComptabiliteAppartement')
+    SyntheseMensuelle = apps.get_model('comptabilite', 'SyntheseMensuelle')
+
+    lignes = ComptabiliteAppartement.objects.annotate(
+        annee=ExtractYear('date_mouvement'), mois=ExtractMonth('date_mouvement')
+    ).values('appartement_id', 'annee', 'mois').annotate(
+        total_revenus=Sum('montant', filter=Q(type_mouvement='revenu'), default=0),
+        total_charges=Sum('montant', filter=Q(type_mouvement='charge'), default=0),
+        total_mouvements=Count('id'),
+    ).order_by()
+
+    SyntheseMensuelle.objects.bulk_create([
+        SyntheseMensuelle(
+            appartement_id=ligne['appartement_id'], annee=ligne['annee'], mois=ligne['mois'],
+            revenus=ligne['total_revenus'], charges=ligne['total_charges'],
+            nombre_mouvements=ligne['total_mouvements'],
+        )
+        for ligne in lignes
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appartements', '0001_initial'),
+        ('comptabilite', '0003_comptabiliteappartement_comptabilit_apparte_d5289c_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyntheseMensuelle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annee', models.PositiveSmallIntegerField()),
+                ('mois', models.PositiveSmallIntegerField()),
+                ('revenus', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Revenus (FCFA)')),
+                ('charges', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Charges (FCFA)')),
+                ('nombre_mouvements', models.PositiveIntegerField(default=0)),
+                ('appartement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='syntheses_mensuelles', to='appartements.appartement')),
+            ],
+            options={
+                'verbose_name': 'Synthèse mensuelle',
+                'verbose_name_plural': 'Synthèses mensuelles',
+                'ordering': ['-annee', '-mois'],
+                'indexes': [models.Index(fields=['annee', 'mois'], name='synthese_annee_mois_idx')],
+                'constraints': [models.UniqueConstraint(fields=('appartement', 'annee', 'mois'), name='synthese_appartement_mois_unique')],
+            },
+        ),
+        migrations.RunPython(remplir_synthese, migrations.RunPython.noop),
+    ]
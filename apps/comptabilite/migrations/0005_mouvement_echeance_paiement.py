@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:24
+
+import django.db.models.deletion
+import re
+
+from django.db import migrations, models
+
+
+def relier_paiements(apps, schema_editor):
+    """Rattache les revenus automatiques existants à leur paiement ('... - Paiement #ID')"""
+    ComptabiliteAppartement = apps.get_model('comptabilite', 'ComptabiliteAppartement')
+    EcheancierPaiement = apps.get_model('paiements', 'EcheancierPaiement')
+
+    paiements = set(EcheancierPaiement.objects.values_list('pk', flat=True))
+    relies = set()
+    for mouvement in ComptabiliteAppartement.objects.filter(
+        type_mouvement='revenu', libelle__contains='Paiement #'
+    ).order_by('pk').iterator():
+        correspondance = re.search(r'Paiement #(\d+)$', mouvement.libelle)
+        if not correspondance:
+            continue
+        paiement_id = int(correspondance.group(1))
+        if paiement_id in paiements and paiement_id not in relies:
+            mouvement.echeance_paiement_id = paiement_id
+            mouvement.save(update_fields=['echeance_paiement'])
+            relies.add(paiement_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comptabilite', '0004_synthesemensuelle'),
+        ('paiements', '0004_alter_echeancierpaiement_reservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comptabiliteappartement',
+            name='echeance_paiement',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mouvement_comptable', to='paiements.echeancierpaiement'),
+        ),
+        migrations.RunPython(relier_paiements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def remplir_serie(apps, schema_editor):
+    """Série initiale depuis les paiements encaissés et les réservations existantes"""
+    EcheancierPaiement = apps.get_model('paiements', 'EcheancierPaiement')
+    Reservation = apps.get_model('reservations', 'Reservation')
+    SerieJournaliere = apps.get_model('comptabilite', 'SerieJournaliere')
+
+    lignes = {}
+
+    for ligne in EcheancierPaiement.objects.filter(
+        statut='paye', date_paiement__isnull=False
+    ).values('reservation__appartement_id', 'date_paiement', 'mode_paiement').annotate(
+        total=Sum('montant_paye'), nombre=Count('id')
+    ).order_by():
+        cle = (ligne['reservation__appartement_id'], ligne['date_paiement'], ligne['mode_paiement'] or '')
+        serie = lignes.setdefault(cle, SerieJournaliere(appartement_id=cle[0], jour=cle[1], mode_paiement=cle[2]))
+        serie.encaissements += ligne['total'] or 0
+        serie.nombre_paiements += ligne['nombre']
+
+    for ligne in Reservation.objects.annotate(jour=TruncDate('date_creation')).values(
+        'appartement_id', 'jour'
+    ).annotate(
+        nombre=Count('id'),
+        montant=Sum('prix_total', filter=Q(statut__in=['confirmee', 'terminee'])),
+    ).order_by():
+        cle = (ligne['appartement_id'], ligne['jour'], '')
+        serie = lignes.setdefault(cle, SerieJournaliere(appartement_id=cle[0], jour=cle[1], mode_paiement=''))
+        serie.reservations += ligne['nombre']
+        serie.montant_reservations += ligne['montant'] or 0
+
+    SerieJournaliere.objects.bulk_create(lignes.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appartements', '0001_initial'),
+        ('comptabilite', '0005_mouvement_echeance_paiement'),
+        ('paiements', '0004_alter_echeancierpaiement_reservation'),
+        ('reservations', '0005_occupationjournaliere'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerieJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField()),
+                ('mode_paiement', models.CharField(blank=True, default='', max_length=30)),
+                ('encaissements', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Encaissements (FCFA)')),
+                ('nombre_paiements', models.IntegerField(default=0)),
+                ('reservations', models.IntegerField(default=0)),
+                ('montant_reservations', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Montant réservé (FCFA)')),
+                ('appartement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series_journalieres', to='appartements.appartement')),
+            ],
+            options={
+                'verbose_name': 'Série journalière',
+                'verbose_name_plural': 'Séries journalières',
+                'ordering': ['-jour'],
+                'constraints': [models.UniqueConstraint(fields=('jour', 'appartement', 'mode_paiement'), name='serie_jour_appartement_mode_unique')],
+            },
+        ),
+        migrations.RunPython(remplir_serie, migrations.RunPython.noop),
+    ]
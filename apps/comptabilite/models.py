@@ -1,8 +1,14 @@
 # ==========================================
 # apps/comptabilite/models.py - Comptabilité simple CORRIGÉ
 # ==========================================
-from django.db import models
-from django.db.models import Sum
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear, Trunc, TruncDate
+
+# Réservations dont le montant compte dans le chiffre réservé
+STATUTS_MONTANT_RESERVE = ('confirmee', 'terminee')
 
 class ComptabiliteAppartement(models.Model):
     """
@@ -17,6 +23,11 @@ class ComptabiliteAppartement(models.Model):
     # Liens
     appartement = models.ForeignKey('appartements.Appartement', on_delete=models.CASCADE)
     reservation = models.ForeignKey('reservations.Reservation', on_delete=models.CASCADE, null=True, blank=True)
+    # Paiement à l'origine d'un revenu automatique (un seul mouvement par paiement)
+    echeance_paiement = models.OneToOneField(
+        'paiements.EcheancierPaiement', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='mouvement_comptable'
+    )
     
     # Mouvement financier
     type_mouvement = models.CharField(max_length=10, choices=TYPE_MOUVEMENT_CHOICES)
@@ -32,29 +43,63 @@ class ComptabiliteAppartement(models.Model):
         signe = '+' if self.type_mouvement == 'revenu' else '-'
         return f"{self.appartement.numero} - {signe}{self.montant} FCFA ({self.libelle})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise le mouvement tel que chargé pour corriger la synthèse mensuelle"""
+        instance = super().from_db(db, field_names, values)
+        instance._etat_initial = instance._contribution()
+        return instance
+    
+    def _contribution(self):
+        """(appartement_id, date, type, montant) : ce que le mouvement apporte à la synthèse"""
+        return (self.__dict__.get('appartement_id'), self.__dict__.get('date_mouvement'),
+                self.__dict__.get('type_mouvement'), self.__dict__.get('montant'))
+    
+    def save(self, *args, **kwargs):
+        # Mouvement et synthèse mensuelle sont mis à jour dans la même transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            contribution = self._contribution()
+            etat_initial = getattr(self, '_etat_initial', None)
+            if etat_initial != contribution:
+                if etat_initial:
+                    SyntheseMensuelle.appliquer(*etat_initial, sens=-1)
+                SyntheseMensuelle.appliquer(*contribution)
+                self._etat_initial = contribution
+    
+    def delete(self, *args, **kwargs):
+        # Le retrait de la synthèse est fait par le signal post_delete (couvre aussi les cascades)
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+    
+    @classmethod
+    def get_synthese_mois(cls, annee, mois):
+        """{appartement_id: {'revenus', 'charges', 'nombre_mouvements'}} - une requête"""
+        return {
+            ligne['appartement_id']: ligne
+            for ligne in SyntheseMensuelle.objects.filter(annee=annee, mois=mois).values(
+                'appartement_id', 'revenus', 'charges', 'nombre_mouvements'
+            )
+        }
+    
     @classmethod
     def get_revenus_mois(cls, appartement, annee, mois):
         """Revenus du mois pour un appartement - CORRIGÉ"""
-        result = cls.objects.filter(
-            appartement=appartement,
-            type_mouvement='revenu',
-            date_mouvement__year=annee,
-            date_mouvement__month=mois
-        ).aggregate(total=Sum('montant'))
+        result = SyntheseMensuelle.objects.filter(
+            appartement=appartement, annee=annee, mois=mois
+        ).values_list('revenus', flat=True).first()
         
-        return result.get('total') or 0
+        return result or 0
     
     @classmethod  
     def get_charges_mois(cls, appartement, annee, mois):
         """Charges du mois pour un appartement - CORRIGÉ"""
-        result = cls.objects.filter(
-            appartement=appartement,
-            type_mouvement='charge',
-            date_mouvement__year=annee,
-            date_mouvement__month=mois
-        ).aggregate(total=Sum('montant'))
+        result = SyntheseMensuelle.objects.filter(
+            appartement=appartement, annee=annee, mois=mois
+        ).values_list('charges', flat=True).first()
         
-        return result.get('total') or 0
+        return result or 0
     
     @classmethod
     def get_benefice_mois(cls, appartement, annee, mois):
@@ -71,17 +116,18 @@ class ComptabiliteAppartement(models.Model):
         if not annee:
             annee = timezone.now().year
         
-        mouvements = cls.objects.filter(
-            appartement=appartement,
-            date_mouvement__year=annee
+        result = SyntheseMensuelle.objects.filter(
+            appartement=appartement, annee=annee
+        ).aggregate(
+            revenus=Sum('revenus'), charges=Sum('charges'), mouvements=Sum('nombre_mouvements')
         )
         
-        # CORRECTIONS : Utiliser .get() au lieu d'accès direct
-        revenus_result = mouvements.filter(type_mouvement='revenu').aggregate(total=Sum('montant'))
-        charges_result = mouvements.filter(type_mouvement='charge').aggregate(total=Sum('montant'))
-        
-        revenus_total = revenus_result.get('total') or 0
-        charges_total = charges_result.get('total') or 0
+        return cls._statistiques(appartement, annee, result)
+    
+    @staticmethod
+    def _statistiques(appartement, annee, totaux):
+        revenus_total = totaux.get('revenus') or 0
+        charges_total = totaux.get('charges') or 0
         
         return {
             'appartement': appartement,
@@ -90,7 +136,7 @@ class ComptabiliteAppartement(models.Model):
             'charges_total': charges_total,
             'benefice': revenus_total - charges_total,
             'taux_rentabilite': (revenus_total / charges_total * 100) if charges_total > 0 else 0,
-            'nombre_mouvements': mouvements.count()
+            'nombre_mouvements': totaux.get('mouvements') or 0
         }
     
     @classmethod
@@ -108,27 +154,29 @@ class ComptabiliteAppartement(models.Model):
         else:
             appartements = Appartement.objects.all()
         
-        mouvements = cls.objects.filter(
-            appartement__in=appartements,
-            date_mouvement__year=annee
-        )
-        
-        # CORRECTIONS : Utiliser .get() au lieu d'accès direct
-        revenus_result = mouvements.filter(type_mouvement='revenu').aggregate(total=Sum('montant'))
-        charges_result = mouvements.filter(type_mouvement='charge').aggregate(total=Sum('montant'))
-        
-        revenus_total = revenus_result.get('total') or 0
-        charges_total = charges_result.get('total') or 0
+        # Une seule requête GROUP BY sur la synthèse mensuelle
+        totaux_par_appartement = {
+            ligne['appartement_id']: ligne
+            for ligne in SyntheseMensuelle.objects.filter(
+                appartement__in=appartements, annee=annee
+            ).values('appartement_id').annotate(
+                revenus=Sum('revenus'), charges=Sum('charges'), mouvements=Sum('nombre_mouvements')
+            ).order_by()
+        }
         
         # Statistiques par appartement
-        stats_appartements = []
-        for appartement in appartements:
-            stats = cls.get_statistiques_appartement(appartement, annee)
-            stats_appartements.append(stats)
+        appartements = list(appartements)
+        stats_appartements = [
+            cls._statistiques(appartement, annee, totaux_par_appartement.get(appartement.pk, {}))
+            for appartement in appartements
+        ]
+        
+        revenus_total = sum(stats['revenus_total'] for stats in stats_appartements)
+        charges_total = sum(stats['charges_total'] for stats in stats_appartements)
         
         return {
             'annee': annee,
-            'nb_appartements': appartements.count(),
+            'nb_appartements': len(appartements),
             'revenus_total': revenus_total,
             'charges_total': charges_total,
             'benefice_total': revenus_total - charges_total,
@@ -143,4 +191,317 @@ class ComptabiliteAppartement(models.Model):
         indexes = [
             models.Index(fields=['appartement', 'date_mouvement']),
             models.Index(fields=['type_mouvement', 'date_mouvement']),
-        ]
\ No newline at end of file
+        ]
+
+
+class SyntheseMensuelle(models.Model):
+    """
+    Cumul mensuel des mouvements par appartement.
+    Tenu à jour dans la transaction de chaque mouvement, vérifiable via
+    la commande `reconcilier_comptabilite`.
+    """
+    appartement = models.ForeignKey(
+        'appartements.Appartement', on_delete=models.CASCADE, related_name='syntheses_mensuelles'
+    )
+    annee = models.PositiveSmallIntegerField()
+    mois = models.PositiveSmallIntegerField()
+    
+    revenus = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Revenus (FCFA)')
+    charges = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Charges (FCFA)')
+    nombre_mouvements = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.appartement_id} - {self.mois:02d}/{self.annee}"
+    
+    @classmethod
+    def appliquer(cls, appartement_id, date_mouvement, type_mouvement, montant, sens=1):
+        """Ajoute (sens=1) ou retire (sens=-1) un mouvement du cumul de son mois"""
+        if not (appartement_id and date_mouvement and montant is not None):
+            return
+        
+        champ = 'revenus' if type_mouvement == 'revenu' else 'charges'
+        cle = {'appartement_id': appartement_id, 'annee': date_mouvement.year, 'mois': date_mouvement.month}
+        maj = {champ: F(champ) + sens * montant, 'nombre_mouvements': F('nombre_mouvements') + sens}
+        
+        if cls.objects.filter(**cle).update(**maj) or sens < 0:
+            return
+        
+        try:
+            with transaction.atomic():
+                cls.objects.create(**cle, **{champ: montant, 'nombre_mouvements': 1})
+        except IntegrityError:
+            # Ligne créée entre-temps par une transaction concurrente
+            cls.objects.filter(**cle).update(**maj)
+    
+    @classmethod
+    def calculer_depuis_mouvements(cls):
+        """Cumuls attendus recalculés depuis les mouvements (GROUP BY appartement, année, mois)"""
+        return {
+            (ligne['appartement_id'], ligne['annee'], ligne['mois']): ligne
+            for ligne in ComptabiliteAppartement.objects.annotate(
+                annee=ExtractYear('date_mouvement'), mois=ExtractMonth('date_mouvement')
+            ).values('appartement_id', 'annee', 'mois').annotate(
+                revenus=Sum('montant', filter=Q(type_mouvement='revenu'), default=0),
+                charges=Sum('montant', filter=Q(type_mouvement='charge'), default=0),
+                nombre_mouvements=Count('id'),
+            ).order_by()
+        }
+    
+    @classmethod
+    def reconcilier(cls, corriger=True):
+        """Compare la synthèse aux mouvements, corrige les écarts, retourne les clés en écart"""
+        attendu = cls.calculer_depuis_mouvements()
+        ecarts = []
+        
+        with transaction.atomic():
+            existantes = {
+                (synthese.appartement_id, synthese.annee, synthese.mois): synthese
+                for synthese in cls.objects.select_for_update()
+            }
+            
+            for cle, synthese in existantes.items():
+                valeurs = attendu.get(cle)
+                if valeurs is None:
+                    # Mois vidé par des suppressions : ligne à zéro, cohérente
+                    if not (synthese.revenus or synthese.charges or synthese.nombre_mouvements):
+                        continue
+                    ecarts.append(cle)
+                    if corriger:
+                        synthese.delete()
+                    continue
+                
+                if (synthese.revenus, synthese.charges, synthese.nombre_mouvements) != (
+                        valeurs['revenus'], valeurs['charges'], valeurs['nombre_mouvements']):
+                    ecarts.append(cle)
+                    if corriger:
+                        synthese.revenus = valeurs['revenus']
+                        synthese.charges = valeurs['charges']
+                        synthese.nombre_mouvements = valeurs['nombre_mouvements']
+                        synthese.save(update_fields=['revenus', 'charges', 'nombre_mouvements'])
+            
+            manquantes = [cle for cle in attendu if cle not in existantes]
+            ecarts.extend(manquantes)
+            if corriger and manquantes:
+                cls.objects.bulk_create([
+                    cls(
+                        appartement_id=cle[0], annee=cle[1], mois=cle[2],
+                        revenus=attendu[cle]['revenus'], charges=attendu[cle]['charges'],
+                        nombre_mouvements=attendu[cle]['nombre_mouvements'],
+                    )
+                    for cle in manquantes
+                ])
+        
+        return ecarts
+    
+    class Meta:
+        verbose_name = 'Synthèse mensuelle'
+        verbose_name_plural = 'Synthèses mensuelles'
+        ordering = ['-annee', '-mois']
+        constraints = [
+            models.UniqueConstraint(fields=['appartement', 'annee', 'mois'], name='synthese_appartement_mois_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['annee', 'mois'], name='synthese_annee_mois_idx'),
+        ]
+
+
+
+class SerieJournaliere(models.Model):
+    """
+    Série temporelle des encaissements et réservations : une ligne par jour,
+    appartement et mode de paiement ('' pour les réservations).
+    Alimentée par les signaux de paiement et de réservation ; les graphiques
+    lisent n'importe quelle fenêtre, par jour/semaine/mois, en une requête.
+    """
+    PAS_CHOICES = ('jour', 'semaine', 'mois')
+    CHAMPS = ('encaissements', 'nombre_paiements', 'reservations', 'montant_reservations')
+    
+    jour = models.DateField()
+    appartement = models.ForeignKey(
+        'appartements.Appartement', on_delete=models.CASCADE, related_name='series_journalieres'
+    )
+    mode_paiement = models.CharField(max_length=30, blank=True, default='')
+    
+    # Paiements encaissés ce jour (date_paiement)
+    encaissements = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Encaissements (FCFA)')
+    nombre_paiements = models.IntegerField(default=0)
+    # Réservations créées ce jour ; montant des confirmées/terminées
+    reservations = models.IntegerField(default=0)
+    montant_reservations = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Montant réservé (FCFA)')
+    
+    def __str__(self):
+        return f"{self.jour} - {self.appartement_id} - {self.mode_paiement or 'réservations'}"
+    
+    # ------------------------------------------
+    # Alimentation incrémentale
+    # ------------------------------------------
+    @classmethod
+    def appliquer(cls, appartement_id, jour, mode_paiement, valeurs, sens=1):
+        """Ajoute (sens=1) ou retire (sens=-1) des valeurs {champ: montant} au jour donné"""
+        if not (appartement_id and jour):
+            return
+        
+        cle = {'appartement_id': appartement_id, 'jour': jour, 'mode_paiement': mode_paiement or ''}
+        maj = {champ: F(champ) + sens * valeur for champ, valeur in valeurs.items()}
+        
+        if cls.objects.filter(**cle).update(**maj) or sens < 0:
+            return
+        
+        try:
+            with transaction.atomic():
+                cls.objects.create(**cle, **valeurs)
+        except IntegrityError:
+            # Ligne créée entre-temps par une transaction concurrente
+            cls.objects.filter(**cle).update(**maj)
+    
+    @classmethod
+    def remplacer(cls, avant, apres):
+        """
+        Remplace une contribution par une autre.
+        Contribution = (appartement_id, jour, mode_paiement, {champ: valeur}) ou None.
+        """
+        if avant == apres:
+            return
+        if avant:
+            cls.appliquer(*avant, sens=-1)
+        if apres:
+            cls.appliquer(*apres)
+    
+    # ------------------------------------------
+    # Lecture
+    # ------------------------------------------
+    @staticmethod
+    def _debut_periode(jour, pas):
+        if pas == 'semaine':
+            return jour - timedelta(days=jour.weekday())
+        if pas == 'mois':
+            return jour.replace(day=1)
+        return jour
+    
+    @staticmethod
+    def _periode_suivante(jour, pas):
+        if pas == 'semaine':
+            return jour + timedelta(days=7)
+        if pas == 'mois':
+            return (jour.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return jour + timedelta(days=1)
+    
+    @classmethod
+    def serie(cls, debut, fin, pas='jour', appartements=None, mode_paiement=None):
+        """
+        Totaux par période entre debut et fin inclus, périodes vides à zéro.
+        Un seul parcours de l'index (jour) quel que soit l'intervalle.
+        """
+        if pas not in cls.PAS_CHOICES:
+            raise ValueError(f"Pas inconnu : {pas}")
+        
+        lignes = cls.objects.filter(jour__range=(debut, fin))
+        if appartements is not None:
+            lignes = lignes.filter(appartement__in=appartements)
+        if mode_paiement is not None:
+            lignes = lignes.filter(mode_paiement=mode_paiement)
+        
+        kind = {'jour': 'day', 'semaine': 'week', 'mois': 'month'}[pas]
+        totaux = {
+            ligne['periode']: ligne
+            for ligne in lignes.annotate(
+                periode=Trunc('jour', kind, output_field=models.DateField())
+            ).values('periode').annotate(
+                **{f'total_{champ}': Sum(champ) for champ in cls.CHAMPS}
+            ).order_by()
+        }
+        
+        resultat = []
+        periode = cls._debut_periode(debut, pas)
+        while periode <= fin:
+            ligne = totaux.get(periode, {})
+            resultat.append({
+                'periode': periode,
+                **{champ: ligne.get(f'total_{champ}') or 0 for champ in cls.CHAMPS},
+            })
+            periode = cls._periode_suivante(periode, pas)
+        return resultat
+    
+    # ------------------------------------------
+    # Vérification
+    # ------------------------------------------
+    @classmethod
+    def calculer_depuis_sources(cls):
+        """Série attendue recalculée depuis les paiements et les réservations"""
+        from apps.paiements.models import EcheancierPaiement
+        from apps.reservations.models import Reservation
+        
+        attendu = {}
+        
+        def ajouter(cle, **valeurs):
+            ligne = attendu.setdefault(cle, dict.fromkeys(cls.CHAMPS, 0))
+            for champ, valeur in valeurs.items():
+                ligne[champ] += valeur or 0
+        
+        for ligne in EcheancierPaiement.objects.filter(
+            statut='paye', date_paiement__isnull=False
+        ).values('reservation__appartement_id', 'date_paiement', 'mode_paiement').annotate(
+            total=Sum('montant_paye'), nombre=Count('id')
+        ).order_by():
+            ajouter(
+                (ligne['reservation__appartement_id'], ligne['date_paiement'], ligne['mode_paiement'] or ''),
+                encaissements=ligne['total'], nombre_paiements=ligne['nombre'],
+            )
+        
+        for ligne in Reservation.objects.annotate(jour=TruncDate('date_creation')).values(
+            'appartement_id', 'jour'
+        ).annotate(
+            nombre=Count('id'),
+            montant=Sum('prix_total', filter=Q(statut__in=STATUTS_MONTANT_RESERVE)),
+        ).order_by():
+            ajouter(
+                (ligne['appartement_id'], ligne['jour'], ''),
+                reservations=ligne['nombre'], montant_reservations=ligne['montant'],
+            )
+        
+        return attendu
+    
+    @classmethod
+    def reconcilier(cls, corriger=True):
+        """Compare la série aux paiements/réservations, corrige les écarts, retourne les clés en écart"""
+        attendu = cls.calculer_depuis_sources()
+        ecarts = []
+        
+        with transaction.atomic():
+            existantes = {
+                (ligne.appartement_id, ligne.jour, ligne.mode_paiement): ligne
+                for ligne in cls.objects.select_for_update()
+            }
+            
+            for cle, ligne in existantes.items():
+                valeurs = attendu.get(cle, dict.fromkeys(cls.CHAMPS, 0))
+                if all(getattr(ligne, champ) == valeurs[champ] for champ in cls.CHAMPS):
+                    continue
+                ecarts.append(cle)
+                if corriger:
+                    if cle in attendu:
+                        for champ in cls.CHAMPS:
+                            setattr(ligne, champ, valeurs[champ])
+                        ligne.save(update_fields=list(cls.CHAMPS))
+                    else:
+                        ligne.delete()
+            
+            manquantes = [cle for cle in attendu if cle not in existantes]
+            ecarts.extend(manquantes)
+            if corriger and manquantes:
+                cls.objects.bulk_create([
+                    cls(appartement_id=cle[0], jour=cle[1], mode_paiement=cle[2], **attendu[cle])
+                    for cle in manquantes
+                ], batch_size=1000)
+        
+        return ecarts
+    
+    class Meta:
+        verbose_name = 'Série journalière'
+        verbose_name_plural = 'Séries journalières'
+        ordering = ['-jour']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['jour', 'appartement', 'mode_paiement'], name='serie_jour_appartement_mode_unique'
+            ),
+        ]
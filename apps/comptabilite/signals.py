@@ -1,47 +1,73 @@
 # apps/comptabilite/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from apps.paiements.models import EcheancierPaiement
 from apps.inventaire.models import EquipementAppartement
-from .models import ComptabiliteAppartement
+from apps.paiements.models import EcheancierPaiement
+from apps.reservations.models import Reservation
+from .models import ComptabiliteAppartement, SerieJournaliere, SyntheseMensuelle
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+@receiver(post_delete, sender=ComptabiliteAppartement)
+def retirer_mouvement_synthese(sender, instance, **kwargs):
+    """Suppression (directe, en masse ou en cascade) : retrait du cumul mensuel"""
+    etat = getattr(instance, '_etat_initial', None) or instance._contribution()
+    SyntheseMensuelle.appliquer(*etat, sens=-1)
+
+# ==========================================
+# Série journalière (encaissements / réservations)
+# ==========================================
+def _contribution_paiement(contribution, appartement_id=None):
+    """(reservation_id, jour, mode, montant) -> contribution de la série, appartement résolu"""
+    if not contribution:
+        return None
+    reservation_id, jour, mode, montant = contribution
+    if appartement_id is None:
+        appartement_id = Reservation.objects.filter(pk=reservation_id).values_list(
+            'appartement_id', flat=True
+        ).first()
+    return (appartement_id, jour, mode, {'encaissements': montant, 'nombre_paiements': 1})
+
+
 @receiver(post_save, sender=EcheancierPaiement)
-def creer_revenu_apres_paiement(sender, instance, created, **kwargs):
-    """REVENUS : Mouvement automatique après paiement"""
-    
-    if instance.statut != 'paye':
-        return
-        
-    if not instance.reservation or not instance.reservation.appartement:
-        logger.warning(f"Paiement {instance.id} sans réservation/appartement")
-        return
-    
-    # Éviter doublons
-    if ComptabiliteAppartement.objects.filter(
-        reservation=instance.reservation,
-        type_mouvement='revenu',
-        montant=instance.montant_paye,
-        date_mouvement=instance.date_paiement,
-        libelle__contains=f'Paiement #{instance.id}'
-    ).exists():
-        return
-    
-    try:
-        ComptabiliteAppartement.objects.create(
-            appartement=instance.reservation.appartement,
-            reservation=instance.reservation,
-            type_mouvement='revenu',
-            libelle=f'{instance.get_type_paiement_display()} - {instance.reservation.client.prenom} {instance.reservation.client.nom} - Paiement #{instance.id}',
-            montant=instance.montant_paye,
-            date_mouvement=instance.date_paiement
-        )
-        logger.info(f"Revenu créé: {instance.reservation.appartement.numero} - {instance.montant_paye} FCFA")
-        
-    except Exception as e:
-        logger.error(f"Erreur création revenu: {e}")
+def serie_paiement_enregistre(sender, instance, **kwargs):
+    avant = getattr(instance, '_serie_initiale', None)
+    apres = instance._contribution_serie()
+    if avant != apres:
+        SerieJournaliere.remplacer(_contribution_paiement(avant), _contribution_paiement(apres))
+    instance._serie_initiale = apres
+
+
+@receiver(post_delete, sender=EcheancierPaiement)
+def serie_paiement_supprime(sender, instance, **kwargs):
+    # Suppression en cascade : la réservation est encore en base à ce stade
+    etat = getattr(instance, '_serie_initiale', None) or instance._contribution_serie()
+    SerieJournaliere.remplacer(_contribution_paiement(etat), None)
+
+
+@receiver(post_save, sender=Reservation)
+def serie_reservation_enregistree(sender, instance, created, **kwargs):
+    avant = getattr(instance, '_serie_initiale', None)
+    apres = instance._contribution_serie()
+    SerieJournaliere.remplacer(avant, apres)
+    instance._serie_initiale = apres
+
+    # Changement d'appartement : les paiements encaissés suivent la réservation
+    if avant and apres and avant[0] != apres[0]:
+        for echeance in instance.echeanciers.filter(statut='paye'):
+            contribution = echeance._contribution_serie()
+            SerieJournaliere.remplacer(
+                _contribution_paiement(contribution, appartement_id=avant[0]),
+                _contribution_paiement(contribution, appartement_id=apres[0]),
+            )
+
+
+@receiver(post_delete, sender=Reservation)
+def serie_reservation_supprimee(sender, instance, **kwargs):
+    etat = getattr(instance, '_serie_initiale', None) or instance._contribution_serie()
+    SerieJournaliere.remplacer(etat, None)
 
 
 @receiver(post_save, sender=EquipementAppartement)
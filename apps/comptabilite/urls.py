@@ -22,5 +22,6 @@ urlpatterns = [
 
     # Export simple (bonus)
     path('export/<int:annee>/<int:mois>/', views.export_rapport, name='export_rapport'),
+    path('export/mouvements/', views.export_mouvements, name='export_mouvements'),
 
 ]
@@ -1,9 +1,7 @@
 # ==========================================
 # apps/comptabilite/views.py - Comptabilité simple
 # ==========================================
-import csv
 from django.contrib import messages  # ✅ Import correct
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db.models import Sum
@@ -12,6 +10,8 @@ from datetime import datetime
 from apps.comptabilite.forms import MouvementComptableForm
 from apps.users.views import is_gestionnaire
 from .models import ComptabiliteAppartement
+from .exports import EXPORT_MOUVEMENTS
+from utils.exports import export_csv, export_xlsx, get_format_export, reponse_export
 
 
 @login_required
@@ -23,45 +23,35 @@ def rapport_mensuel(request):
     mois = int(request.GET.get('mois', datetime.now().month))
     
     from apps.appartements.models import Appartement
+    from apps.reservations.occupation import OccupationService
     appartements = Appartement.objects.all()
     
+    # Occupation de tous les appartements en une requête (nuits à cheval sur deux mois incluses)
+    occupation = OccupationService.taux_par_appartement(*OccupationService.periode_mois(annee, mois))
+    
+    # Revenus / charges de tous les appartements en une requête (synthèse mensuelle)
+    synthese = ComptabiliteAppartement.get_synthese_mois(annee, mois)
+    
     rapport_data = []
     total_revenus = 0
     total_charges = 0
     
     for appartement in appartements:
+        synthese_appartement = synthese.get(appartement.pk, {})
+        
         # Revenus du mois (addition simple selon cahier)
-        revenus = ComptabiliteAppartement.get_revenus_mois(appartement, annee, mois)
+        revenus = synthese_appartement.get('revenus', 0)
         
         # Charges du mois (soustraction simple selon cahier)
-        charges = ComptabiliteAppartement.get_charges_mois(appartement, annee, mois)
+        charges = synthese_appartement.get('charges', 0)
         
         # Résultat simple
         resultat = revenus - charges
         
         # Pourcentage d'occupation simple selon cahier
-        from apps.reservations.models import Reservation
-        from calendar import monthrange
-        
-        jours_mois = monthrange(annee, mois)[1]
-        nuits_occupees = 0
-        
-        for res in Reservation.objects.filter(
-            appartement=appartement,
-            statut__in=['confirmee', 'en_cours', 'terminee'],
-            date_arrivee__year=annee,
-            date_arrivee__month=mois
-        ):
-            debut_mois = datetime(annee, mois, 1).date()
-            fin_mois = datetime(annee, mois, jours_mois).date()
-            
-            debut_sejour = max(res.date_arrivee, debut_mois)
-            fin_sejour = min(res.date_depart, fin_mois)
-            
-            if debut_sejour < fin_sejour:
-                nuits_occupees += (fin_sejour - debut_sejour).days
-        
-        taux_occupation = round((nuits_occupees / jours_mois) * 100) if jours_mois > 0 else 0
+        occupation_appartement = occupation.get(appartement.pk, {})
+        nuits_occupees = occupation_appartement.get('nuits_occupees', 0)
+        taux_occupation = occupation_appartement.get('taux_occupation', 0)
         
         rapport_data.append({
             'appartement': appartement,
@@ -187,36 +177,60 @@ def detail_appartement(request, appartement_pk):
 @login_required
 @user_passes_test(is_gestionnaire)
 def export_rapport(request, annee, mois):
-    """Export CSV du rapport mensuel selon cahier"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="rapport_repavi_{annee}_{mois:02d}.csv"'
+    """Export CSV / XLSX du rapport mensuel selon cahier"""
+    from apps.appartements.models import Appartement
+    from apps.reservations.occupation import OccupationService
+    occupation = OccupationService.taux_par_appartement(*OccupationService.periode_mois(annee, mois))
+    synthese = ComptabiliteAppartement.get_synthese_mois(annee, mois)
+    
+    def lignes():
+        for appartement in Appartement.objects.order_by('numero').iterator():
+            revenus = synthese.get(appartement.pk, {}).get('revenus', 0)
+            charges = synthese.get(appartement.pk, {}).get('charges', 0)
+            
+            # Taux d'occupation selon cahier (table d'occupation journalière)
+            taux_occupation = occupation.get(appartement.pk, {}).get('taux_occupation', 0)
+            
+            yield [
+                appartement.numero,
+                appartement.get_type_logement_display(),
+                revenus,
+                charges,
+                revenus - charges,
+                taux_occupation
+            ]
     
-    writer = csv.writer(response)
-    writer.writerow([
-        'Appartement', 'Type', 'Revenus (FCFA)', 'Charges (FCFA)', 
+    entetes = [
+        'Appartement', 'Type', 'Revenus (FCFA)', 'Charges (FCFA)',
         'Résultat (FCFA)', 'Taux Occupation (%)'
-    ])
+    ]
+    nom_fichier = f'rapport_repavi_{annee}_{mois:02d}'
     
-    from apps.appartements.models import Appartement
-    for appartement in Appartement.objects.all():
-        revenus = ComptabiliteAppartement.get_revenus_mois(appartement, annee, mois)
-        charges = ComptabiliteAppartement.get_charges_mois(appartement, annee, mois)
-        resultat = revenus - charges
-        
-        # Calcul taux occupation simple
-        # TODO: Implémenter calcul selon cahier
-        taux_occupation = 0
-        
-        writer.writerow([
-            appartement.numero,
-            appartement.get_type_logement_display(),
-            revenus,
-            charges,
-            resultat,
-            taux_occupation
-        ])
+    if get_format_export(request) == 'xlsx':
+        return export_xlsx(lignes(), entetes, nom_fichier, titre_feuille=f'Rapport {mois:02d}-{annee}')
+    return export_csv(lignes(), entetes, nom_fichier)
+
+
+@login_required
+@user_passes_test(is_gestionnaire)
+def export_mouvements(request):
+    """Export CSV / XLSX des mouvements comptables (?annee=, ?mois=, ?appartement=)"""
+    mouvements = ComptabiliteAppartement.objects.order_by('date_mouvement', 'pk')
+    
+    annee = clean_int_param(request.GET.get('annee'), datetime.now().year)
+    mouvements = mouvements.filter(date_mouvement__year=annee)
+    nom_fichier = f'mouvements_repavi_{annee}'
+    
+    mois = clean_int_param(request.GET.get('mois'), None)
+    if mois:
+        mouvements = mouvements.filter(date_mouvement__month=mois)
+        nom_fichier += f'_{mois:02d}'
+    
+    appartement_id = clean_int_param(request.GET.get('appartement'), None)
+    if appartement_id:
+        mouvements = mouvements.filter(appartement_id=appartement_id)
     
-    return response
+    return reponse_export(EXPORT_MOUVEMENTS, mouvements, get_format_export(request), nom_fichier)
 
 # modifier_mouvement
 @login_required
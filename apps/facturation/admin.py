@@ -1,8 +1,16 @@
 # ==========================================
 # apps/facturation/admin.py - Version simplifiée
 # ==========================================
+from pathlib import Path
+
 from django.contrib import admin
-from .models import Facture, ParametresFacturation
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .lot import FileLots
+from .models import Facture, LotFactures, ParametresFacturation
 
 
 @admin.register(Facture)
@@ -25,6 +33,62 @@ class FactureAdmin(admin.ModelAdmin):
             'fields': ('frais_menage', 'frais_service', 'remise', 'notes')
         }),
     )
+    
+    actions = ['generer_lot_zip']
+    
+    def generer_lot_zip(self, request, queryset):
+        """Met en file un ZIP des PDF sélectionnés + un relevé par client (rendu hors requête)"""
+        lot = FileLots.demander(queryset, request.user)
+        self.message_user(
+            request,
+            f'Lot #{lot.pk} mis en file ({len(lot.factures)} facture(s)). '
+            f'Il sera téléchargeable dans « Lots de factures » une fois généré '
+            f'par traiter_lots_factures.'
+        )
+        return None
+    generer_lot_zip.short_description = 'Générer les PDF (ZIP avec relevés clients)'
+
+
+@admin.register(LotFactures)
+class LotFacturesAdmin(admin.ModelAdmin):
+    """Lots demandés depuis les factures ; téléchargement une fois générés"""
+    
+    list_display = ['__str__', 'demande_par', 'date_creation', 'date_fin', 'statut', 'telechargement']
+    list_filter = ['statut']
+    readonly_fields = ['factures', 'releves', 'demande_par', 'statut', 'erreur',
+                       'date_creation', 'date_debut', 'date_fin']
+    actions = ['relancer']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_urls(self):
+        return [
+            path('<int:pk>/telecharger/', self.admin_site.admin_view(self.telecharger),
+                 name='facturation_lotfactures_telecharger'),
+        ] + super().get_urls()
+    
+    def telechargement(self, lot):
+        if lot.statut != 'termine':
+            return '-'
+        url = reverse('admin:facturation_lotfactures_telecharger', args=[lot.pk])
+        return format_html('<a href="{}">Télécharger</a>', url)
+    telechargement.short_description = 'Fichier'
+    
+    def telecharger(self, request, pk):
+        if not self.has_view_permission(request):
+            raise Http404
+        lot = get_object_or_404(LotFactures, pk=pk, statut='termine')
+        chemin = Path(lot.chemin)
+        if not chemin.exists():
+            raise Http404('Fichier du lot introuvable')
+        return FileResponse(open(chemin, 'rb'), as_attachment=True, filename=chemin.name)
+    
+    def relancer(self, request, queryset):
+        """Remet en file les lots en échec (reprise depuis les documents déjà rendus)"""
+        relances = queryset.filter(statut='echec').update(statut='en_attente', erreur='')
+        self.message_user(request, f'{relances} lot(s) remis en file.')
+    relancer.short_description = 'Relancer les lots en échec'
 
 
 @admin.register(ParametresFacturation)
@@ -0,0 +1,17 @@
+# ==========================================
+# apps/facturation/exports.py - Colonnes d'export des factures
+# ==========================================
+from utils.exports import Colonne, SpecExport
+
+EXPORT_FACTURES = SpecExport('factures', [
+    Colonne('Numéro', 'numero'),
+    Colonne('Émise le', 'date_emission'),
+    Colonne('Client', lambda f: f"{f.client.prenom} {f.client.nom}"),
+    Colonne('Réservation', 'reservation_id'),
+    Colonne('Type', 'get_type_facture_display'),
+    Colonne('Montant HT (FCFA)', 'montant_ht'),
+    Colonne('TVA (FCFA)', 'montant_tva'),
+    Colonne('Montant TTC (FCFA)', 'montant_ttc'),
+    Colonne('Échéance', 'date_echeance'),
+    Colonne('Statut', 'get_statut_display'),
+], select_related=('client',))
@@ -0,0 +1,293 @@
+# ==========================================
+# apps/facturation/lot.py - Génération groupée des factures et relevés clients
+# ==========================================
+import json
+import multiprocessing
+import os
+import zipfile
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.db import connections
+from django.utils.text import slugify
+
+FORMATS_LOT = ('zip', 'pdf')
+
+TEMPLATE_RELEVE = 'facturation/releve_client_pdf.html'
+
+# Lot "en cours" sans nouvelle depuis ce délai : le worker s'est arrêté
+DELAI_LOT_BLOQUE = timedelta(hours=1)
+
+
+def _initialiser_processus():
+    """Chaque processus ouvre ses propres connexions et chauffe son moteur PDF"""
+    from utils.pdf import prechauffer
+
+    connections.close_all()
+    prechauffer()
+
+
+def _executer(tache):
+    """
+    Rend un document du lot (exécuté dans un processus du pool).
+    tache = ('facture', facture_pk, None) ou ('releve', client_pk, (facture_pks, dossier))
+    """
+    type_document, pk, extra = tache
+    try:
+        if type_document == 'facture':
+            chemin = GenerationLot.rendre_facture(pk)
+        else:
+            facture_pks, dossier = extra
+            chemin = GenerationLot.rendre_releve(pk, facture_pks, dossier)
+        return tache, str(chemin), None
+    except Exception as e:
+        return tache, None, str(e)
+
+
+class GenerationLot:
+    """
+    Rend un ensemble de factures (et un relevé par client) dans un pool de
+    processus, puis assemble le tout en un ZIP ou un PDF unique.
+    L'avancement est noté dans un fichier de reprise à côté de la sortie :
+    un lot interrompu repart des documents manquants.
+    """
+
+    def __init__(self, factures, sortie, format_sortie='zip', releves=True,
+                 processus=None, reprendre=False, progression=None):
+        if format_sortie not in FORMATS_LOT:
+            raise ValueError(f"Format inconnu : {format_sortie}")
+        if format_sortie == 'pdf':
+            try:
+                import pypdf  # noqa: F401
+            except ImportError:
+                raise ValueError("Le PDF fusionné nécessite pypdf (pip install pypdf)")
+
+        self.factures = factures
+        self.sortie = Path(sortie).resolve()
+        self.format_sortie = format_sortie
+        self.releves = releves
+        self.processus = processus or os.cpu_count() or 1
+        self.reprendre = reprendre
+        self.progression = progression
+
+        self.fichier_reprise = self.sortie.with_name(self.sortie.name + '.reprise.json')
+        self.dossier_releves = self.sortie.with_name(self.sortie.name + '.releves')
+
+    # ------------------------------------------
+    # Rendu unitaire (dans les processus du pool)
+    # ------------------------------------------
+    @staticmethod
+    def rendre_facture(facture_pk):
+        from .models import Facture
+        from .pdf import FacturePDFService
+
+        facture = Facture.objects.select_related(
+            'client', 'cree_par', 'reservation__appartement', 'echeance_paiement'
+        ).get(pk=facture_pk)
+        return FacturePDFService.obtenir(facture)
+
+    @staticmethod
+    def rendre_releve(client_pk, facture_pks, dossier):
+        from django.conf import settings
+        from apps.clients.models import Client
+        from utils.pdf import rendre_pdf
+        from .models import Facture, ParametresFacturation
+
+        client = Client.objects.get(pk=client_pk)
+        factures = list(
+            Facture.objects.filter(pk__in=facture_pks)
+            .select_related('reservation__appartement')
+            .order_by('date_emission', 'numero')
+        )
+        contexte = {
+            'client': client,
+            'factures': factures,
+            'total_ttc': sum(facture.montant_ttc for facture in factures),
+            'date_debut': factures[0].date_emission if factures else None,
+            'date_fin': factures[-1].date_emission if factures else None,
+            'parametres': ParametresFacturation.get_parametres(),
+            'STATIC_URL': settings.STATIC_URL,
+        }
+
+        # Nom sans caractère de chemin ; le pk garantit l'unicité
+        nom = slugify(f'{client.nom} {client.prenom}').replace('-', '_')
+        chemin = Path(dossier) / f'releve_{client_pk}_{nom}.pdf'
+        temporaire = chemin.with_suffix('.tmp')
+        temporaire.write_bytes(rendre_pdf(TEMPLATE_RELEVE, contexte, feuilles=('facture',)))
+        temporaire.replace(chemin)
+        return chemin
+
+    # ------------------------------------------
+    # Orchestration
+    # ------------------------------------------
+    def _taches(self):
+        lignes = list(self.factures.order_by('numero').values_list('pk', 'client_id'))
+        taches = [('facture', pk, None) for pk, _ in lignes]
+
+        if self.releves:
+            par_client = defaultdict(list)
+            for pk, client_id in lignes:
+                par_client[client_id].append(pk)
+            taches += [
+                ('releve', client_id, (pks, str(self.dossier_releves)))
+                for client_id, pks in par_client.items()
+            ]
+        return taches
+
+    @staticmethod
+    def _cle(tache):
+        return f'{tache[0]}:{tache[1]}'
+
+    def _charger_reprise(self):
+        if not (self.reprendre and self.fichier_reprise.exists()):
+            return {}
+        faits = json.loads(self.fichier_reprise.read_text()).get('faits', {})
+        # Un fichier supprimé entre-temps est à refaire
+        return {cle: chemin for cle, chemin in faits.items() if Path(chemin).exists()}
+
+    def _sauver_reprise(self, faits):
+        temporaire = self.fichier_reprise.with_suffix('.tmp')
+        temporaire.write_text(json.dumps({'sortie': str(self.sortie), 'faits': faits}))
+        temporaire.replace(self.fichier_reprise)
+
+    def executer(self):
+        """Génère le lot ; renvoie (chemin de sortie, erreurs {clé: message})"""
+        self.sortie.parent.mkdir(parents=True, exist_ok=True)
+        self.dossier_releves.mkdir(parents=True, exist_ok=True)
+
+        taches = self._taches()
+        faits = self._charger_reprise()
+        restantes = [tache for tache in taches if self._cle(tache) not in faits]
+        erreurs = {}
+        total = len(taches)
+
+        if self.progression:
+            self.progression(len(faits), total)
+
+        if restantes:
+            # Les processus fils ne doivent pas hériter des connexions du parent
+            connections.close_all()
+            contexte = multiprocessing.get_context('fork') if hasattr(os, 'fork') else multiprocessing
+            with contexte.Pool(min(self.processus, len(restantes)), initializer=_initialiser_processus) as pool:
+                for tache, chemin, erreur in pool.imap_unordered(_executer, restantes):
+                    if erreur:
+                        erreurs[self._cle(tache)] = erreur
+                    else:
+                        faits[self._cle(tache)] = chemin
+                        self._sauver_reprise(faits)
+                    if self.progression:
+                        self.progression(len(faits), total)
+
+        if erreurs:
+            # Sortie non assemblée : relancer avec reprise pour compléter
+            return None, erreurs
+
+        documents = [faits[self._cle(tache)] for tache in taches]
+        self._assembler(documents)
+
+        self.fichier_reprise.unlink(missing_ok=True)
+        for releve in self.dossier_releves.glob('*.pdf'):
+            releve.unlink()
+        self.dossier_releves.rmdir()
+
+        return self.sortie, erreurs
+
+    def _assembler(self, documents):
+        temporaire = self.sortie.with_name(self.sortie.name + '.tmp')
+
+        if self.format_sortie == 'zip':
+            # Les PDF sont déjà compressés : stockage sans recompression
+            with zipfile.ZipFile(temporaire, 'w', zipfile.ZIP_STORED) as archive:
+                for document in documents:
+                    document = Path(document)
+                    if document.parent == self.dossier_releves:
+                        archive.write(document, f'releves/{document.name}')
+                    else:
+                        # Nom sans l'empreinte du cache : FAC2024010001.pdf
+                        archive.write(document, f"factures/{document.stem.rsplit('_', 1)[0]}.pdf")
+        else:
+            from pypdf import PdfWriter
+
+            fusion = PdfWriter()
+            for document in documents:
+                fusion.append(str(document))
+            with open(temporaire, 'wb') as fichier:
+                fusion.write(fichier)
+
+        temporaire.replace(self.sortie)
+
+
+class FileLots:
+    """
+    Lots demandés depuis l'admin (modèle LotFactures) : la requête web ne fait
+    qu'enregistrer la demande, le rendu tourne dans `traiter_lots_factures`.
+    """
+
+    @staticmethod
+    def dossier():
+        from django.conf import settings
+
+        return Path(settings.MEDIA_ROOT) / 'factures' / 'lots'
+
+    @staticmethod
+    def demander(factures, utilisateur=None, releves=True):
+        from .models import LotFactures
+
+        return LotFactures.objects.create(
+            factures=list(factures.order_by('numero').values_list('pk', flat=True)),
+            releves=releves,
+            demande_par=utilisateur if getattr(utilisateur, 'is_authenticated', False) else None,
+        )
+
+    @staticmethod
+    def reclamer():
+        """Prochain lot en attente, réservé par UPDATE conditionnel (plusieurs workers possibles)"""
+        from django.utils import timezone
+        from .models import LotFactures
+
+        # Lot "en cours" depuis trop longtemps : worker arrêté, on le reprend
+        LotFactures.objects.filter(
+            statut='en_cours', date_debut__lt=timezone.now() - DELAI_LOT_BLOQUE
+        ).update(statut='en_attente')
+
+        for pk in LotFactures.objects.filter(statut='en_attente').order_by('date_creation').values_list('pk', flat=True)[:5]:
+            if LotFactures.objects.filter(pk=pk, statut='en_attente').update(
+                statut='en_cours', date_debut=timezone.now()
+            ):
+                return LotFactures.objects.get(pk=pk)
+        return None
+
+    @staticmethod
+    def traiter(lot, processus=None, progression=None):
+        """Génère le ZIP du lot (reprise automatique si un essai précédent a été interrompu)"""
+        from django.utils import timezone
+        from .models import Facture
+
+        sortie = FileLots.dossier() / f'lot_{lot.pk}_{lot.date_creation:%Y%m%d_%H%M}.zip'
+        chemin, erreurs = GenerationLot(
+            Facture.objects.filter(pk__in=lot.factures), sortie,
+            releves=lot.releves, processus=processus, reprendre=True, progression=progression,
+        ).executer()
+
+        if erreurs:
+            lot.statut = 'echec'
+            lot.erreur = '\n'.join(f'{cle} : {erreur}' for cle, erreur in erreurs.items())[:5000]
+        else:
+            lot.statut = 'termine'
+            lot.chemin = str(chemin)
+            lot.erreur = ''
+        lot.date_fin = timezone.now()
+        lot.save(update_fields=['statut', 'chemin', 'erreur', 'date_fin'])
+        return lot
+
+    @staticmethod
+    def supprimer_fichiers(lot):
+        """Archive et fichiers de reprise d'un lot supprimé"""
+        import shutil
+
+        for chemin in FileLots.dossier().glob(f'lot_{lot.pk}_*'):
+            if chemin.is_dir():
+                shutil.rmtree(chemin, ignore_errors=True)
+            else:
+                chemin.unlink(missing_ok=True)
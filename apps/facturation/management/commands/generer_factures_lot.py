@@ -0,0 +1,75 @@
+# apps/facturation/management/commands/generer_factures_lot.py
+from datetime import date, datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.facturation.lot import FORMATS_LOT, GenerationLot
+from apps.facturation.models import Facture
+
+
+def _date(valeur):
+    try:
+        return date.fromisoformat(valeur)
+    except ValueError:
+        raise CommandError(f"Date invalide : {valeur} (format AAAA-MM-JJ)")
+
+
+class Command(BaseCommand):
+    help = "Générer les PDF des factures d'une période et un relevé par client (ZIP ou PDF unique)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--debut', required=True, help='Première date d\'émission (AAAA-MM-JJ)')
+        parser.add_argument('--fin', required=True, help='Dernière date d\'émission incluse (AAAA-MM-JJ)')
+        parser.add_argument('--sortie', help='Fichier de sortie (défaut : factures_DEBUT_FIN.zip|pdf)')
+        parser.add_argument('--format', choices=FORMATS_LOT, default='zip')
+        parser.add_argument('--processus', type=int, default=None,
+                            help='Taille du pool (défaut : nombre de cœurs)')
+        parser.add_argument('--sans-releves', action='store_true',
+                            help='Ne pas générer les relevés clients')
+        parser.add_argument('--reprendre', action='store_true',
+                            help='Reprendre un lot interrompu depuis son fichier de reprise')
+
+    def handle(self, *args, **options):
+        debut, fin = _date(options['debut']), _date(options['fin'])
+        if fin < debut:
+            raise CommandError('La date de fin précède la date de début')
+
+        factures = Facture.objects.filter(
+            date_emission__gte=timezone.make_aware(datetime.combine(debut, time.min)),
+            date_emission__lte=timezone.make_aware(datetime.combine(fin, time.max)),
+        ).exclude(statut='annulee')
+
+        if not factures.exists():
+            self.stdout.write(self.style.WARNING('Aucune facture sur la période'))
+            return
+
+        sortie = options['sortie'] or f"factures_{debut:%Y%m%d}_{fin:%Y%m%d}.{options['format']}"
+
+        def progression(fait, total):
+            self.stdout.write(f'\r📄 {fait}/{total} documents', ending='')
+            self.stdout.flush()
+
+        try:
+            lot = GenerationLot(
+                factures, sortie,
+                format_sortie=options['format'],
+                releves=not options['sans_releves'],
+                processus=options['processus'],
+                reprendre=options['reprendre'],
+                progression=progression,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chemin, erreurs = lot.executer()
+        self.stdout.write('')
+
+        if erreurs:
+            for cle, erreur in erreurs.items():
+                self.stdout.write(self.style.ERROR(f'❌ {cle} : {erreur}'))
+            raise CommandError(
+                f'{len(erreurs)} document(s) en échec - relancer avec --reprendre'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Lot généré : {chemin}'))
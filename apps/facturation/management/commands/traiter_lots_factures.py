@@ -0,0 +1,43 @@
+# apps/facturation/management/commands/traiter_lots_factures.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.facturation.lot import FileLots
+
+
+class Command(BaseCommand):
+    help = "Worker des lots de factures demandés depuis l'admin (file LotFactures)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--une-fois', action='store_true',
+                            help="Vider la file puis s'arrêter")
+        parser.add_argument('--processus', type=int, default=None,
+                            help='Taille du pool (défaut : nombre de cœurs)')
+        parser.add_argument('--intervalle', type=float, default=10,
+                            help='Attente (secondes) quand la file est vide')
+
+    def handle(self, *args, **options):
+        termines, echecs = 0, 0
+
+        try:
+            while True:
+                lot = FileLots.reclamer()
+                if lot is None:
+                    if options['une_fois']:
+                        break
+                    time.sleep(options['intervalle'])
+                    continue
+
+                self.stdout.write(f'📦 Lot #{lot.pk} : {len(lot.factures)} facture(s)')
+                lot = FileLots.traiter(lot, processus=options['processus'])
+                if lot.statut == 'termine':
+                    termines += 1
+                    self.stdout.write(self.style.SUCCESS(f'✅ Lot #{lot.pk} : {lot.chemin}'))
+                else:
+                    echecs += 1
+                    self.stdout.write(self.style.ERROR(f'❌ Lot #{lot.pk} :\n{lot.erreur}'))
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {termines} lot(s) générés, {echecs} en échec'))
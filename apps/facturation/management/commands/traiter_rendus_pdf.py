@@ -0,0 +1,43 @@
+# apps/facturation/management/commands/traiter_rendus_pdf.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.facturation.pdf import FacturePDFService
+from utils.pdf import prechauffer
+
+
+class Command(BaseCommand):
+    help = "Worker de rendu des PDF de factures (file TacheRenduPDF)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--une-fois', action='store_true',
+                            help="Vider la file puis s'arrêter")
+        parser.add_argument('--lot', type=int, default=10,
+                            help='Nombre de tâches prises à chaque passage')
+        parser.add_argument('--intervalle', type=float, default=5,
+                            help='Attente (secondes) quand la file est vide')
+
+    def handle(self, *args, **options):
+        total_rendus, total_echecs = 0, 0
+        prechauffer()
+
+        try:
+            while True:
+                rendus, echecs = FacturePDFService.traiter_lot(options['lot'])
+                total_rendus += rendus
+                total_echecs += echecs
+
+                if rendus or echecs:
+                    self.stdout.write(f'📄 {rendus} PDF rendus, {echecs} échecs')
+                    continue
+
+                if options['une_fois']:
+                    break
+                time.sleep(options['intervalle'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {total_rendus} PDF rendus, {total_echecs} échecs')
+        )
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:18
+
+import re
+
+from django.db import migrations, models
+
+
+def initialiser_sequences(apps, schema_editor):
+    """Reprend le plus grand numéro existant de chaque période (FACAAAAMMNNNN)"""
+    Facture = apps.get_model('facturation', 'Facture')
+    SequenceFacture = apps.get_model('facturation', 'SequenceFacture')
+
+    derniers = {}
+    for numero in Facture.objects.values_list('numero', flat=True).iterator():
+        correspondance = re.fullmatch(r'FAC(\d{6})(\d+)', numero or '')
+        if correspondance:
+            periode, rang = correspondance.group(1), int(correspondance.group(2))
+            derniers[periode] = max(derniers.get(periode, 0), rang)
+
+    SequenceFacture.objects.bulk_create([
+        SequenceFacture(periode=periode, dernier_numero=rang)
+        for periode, rang in derniers.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturation', '0008_remove_facture_taux_tva_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceFacture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(max_length=6, unique=True)),
+                ('dernier_numero', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Séquence de facturation',
+                'verbose_name_plural': 'Séquences de facturation',
+            },
+        ),
+        migrations.RunPython(initialiser_sequences, migrations.RunPython.noop),
+    ]
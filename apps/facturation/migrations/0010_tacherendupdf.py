@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturation', '0009_sequencefacture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TacheRenduPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echec', 'Échec')], default='en_attente', max_length=20)),
+                ('tentatives', models.PositiveSmallIntegerField(default=0)),
+                ('erreur', models.TextField(blank=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_debut', models.DateTimeField(blank=True, null=True)),
+                ('date_fin', models.DateTimeField(blank=True, null=True)),
+                ('facture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taches_pdf', to='facturation.facture')),
+            ],
+            options={
+                'verbose_name': 'Tâche de rendu PDF',
+                'verbose_name_plural': 'Tâches de rendu PDF',
+                'indexes': [models.Index(fields=['statut', 'date_creation'], name='facturation_statut_e4d5f9_idx')],
+            },
+        ),
+    ]
@@ -1,11 +1,22 @@
 # ==========================================
 # apps/facturation/models.py - COMPLET HARMONISÉ
 # ==========================================
-from django.db import models
+import copy
+
+from django.db import models, transaction
 from django.conf import settings
 from decimal import Decimal
 from datetime import datetime, date, timedelta
 
+from utils import cache as cache_partage
+
+# Cache des paramètres : copie locale au processus, validée par la version
+# de l'étiquette 'parametres' du cache partagé (incrémentée à chaque modification).
+# Sans cache partagé entre workers, lecture en base à chaque appel.
+CACHE_ETIQUETTE_PARAMETRES = 'parametres'
+CACHE_TIMEOUT_PARAMETRES = 60 * 60 * 24
+_parametres_locaux = {'courant': (None, None)}
+
 
 def get_date_echeance_defaut():
     """Retourne la date d'échéance par défaut (aujourd'hui + 30 jours)"""
@@ -46,7 +57,7 @@ class ParametresFacturation(models.Model):
     )
     
     @classmethod
-    def get_parametres(cls):
+    def _creer_parametres(cls):
         """Récupère ou crée les paramètres par défaut"""
         parametres, created = cls.objects.get_or_create(
             pk=1,
@@ -68,10 +79,46 @@ class ParametresFacturation(models.Model):
         )
         return parametres
     
+    @classmethod
+    def get_parametres(cls):
+        """
+        Paramètres courants sans requête en régime établi : copie locale tant que
+        la version partagée n'a pas changé, sinon cache partagé, sinon base.
+        Renvoie une copie (un formulaire peut modifier l'instance sans l'enregistrer).
+        """
+        if not cache_partage.est_partage():
+            # Cache propre au processus : un changement de TVA enregistré par
+            # un autre worker n'y serait jamais vu
+            return cls._creer_parametres()
+        
+        version = cache_partage.version(CACHE_ETIQUETTE_PARAMETRES)
+        
+        version_locale, parametres = _parametres_locaux['courant']
+        if version_locale == version:
+            cache_partage.compter('parametres', True)
+        else:
+            parametres = cache_partage.obtenir(
+                'parametres', ('courant', version), cls._creer_parametres, CACHE_TIMEOUT_PARAMETRES
+            )
+            _parametres_locaux['courant'] = (version, parametres)
+        
+        return copy.copy(parametres)
+    
+    @staticmethod
+    def invalider_cache():
+        """Nouvelle version après commit : tous les processus rechargent"""
+        cache_partage.invalider_apres_commit(CACHE_ETIQUETTE_PARAMETRES)
+    
     def save(self, *args, **kwargs):
         """Assurer qu'il n'y a qu'une seule instance"""
         self.pk = 1
         super().save(*args, **kwargs)
+        self.invalider_cache()
+    
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        self.invalider_cache()
+        return resultat
     
     class Meta:
         verbose_name = "Paramètres Facturation"
@@ -81,6 +128,23 @@ class ParametresFacturation(models.Model):
         return f"Paramètres {self.nom_entreprise}"
 
 
+class SequenceFacture(models.Model):
+    """
+    Compteur de numérotation des factures, une ligne par période (AAAAMM).
+    La ligne est verrouillée (select_for_update) le temps de la transaction
+    qui crée la facture : pas de numéro en double, pas de trou.
+    """
+    periode = models.CharField(max_length=6, unique=True)
+    dernier_numero = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Séquence de facturation'
+        verbose_name_plural = 'Séquences de facturation'
+    
+    def __str__(self):
+        return f"{self.periode} - {self.dernier_numero}"
+
+
 class Facture(models.Model):
     """
     Facture par paiement/tranche - UNE facture par paiement effectué
@@ -178,6 +242,12 @@ class Facture(models.Model):
         return parametres.taux_tva_defaut
     
     def save(self, *args, **kwargs):
+        # Numéro et INSERT dans la même transaction : un échec annule aussi
+        # l'incrément du compteur (numérotation sans trou)
+        with transaction.atomic():
+            self._save(*args, **kwargs)
+    
+    def _save(self, *args, **kwargs):
         if not self.numero:
             self.numero = self.generer_numero()
         
@@ -199,18 +269,9 @@ class Facture(models.Model):
         super().save(*args, **kwargs)
     
     def generer_numero(self):
-        """Génère un numéro de facture unique"""
-        annee = datetime.now().year
-        mois = datetime.now().month
-        
-        # Compter les factures du mois
-        count = Facture.objects.filter(
-            date_emission__year=annee,
-            date_emission__month=mois
-        ).count() + 1
-        
-        # Format : FAC2024010001 (année + mois + numéro)
-        return f"FAC{annee}{mois:02d}{count:04d}"
+        """Génère un numéro de facture unique (compteur verrouillé de la période)"""
+        from .numerotation import NumerotationFactures
+        return NumerotationFactures.prochain_numero()
     
     def calculer_montants(self):
         """Calcule les montants de cette facture"""
@@ -282,4 +343,66 @@ class Facture(models.Model):
     @property
     def est_paiement_final(self):
         """Vérifie si c'est le dernier paiement de la réservation"""
-        return self.solde_apres_paiement <= 0
\ No newline at end of file
+        return self.solde_apres_paiement <= 0
+
+class TacheRenduPDF(models.Model):
+    """File d'attente des rendus PDF, traitée par `manage.py traiter_rendus_pdf`"""
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('terminee', 'Terminée'),
+        ('echec', 'Échec'),
+    ]
+    
+    facture = models.ForeignKey(Facture, on_delete=models.CASCADE, related_name='taches_pdf')
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    erreur = models.TextField(blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_debut = models.DateTimeField(null=True, blank=True)
+    date_fin = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Tâche de rendu PDF'
+        verbose_name_plural = 'Tâches de rendu PDF'
+        indexes = [
+            models.Index(fields=['statut', 'date_creation']),
+        ]
+    
+    def __str__(self):
+        return f"PDF {self.facture_id} - {self.get_statut_display()}"
+
+
+class LotFactures(models.Model):
+    """
+    Génération groupée demandée depuis l'admin, traitée hors requête web
+    par `manage.py traiter_lots_factures` ; le fichier se télécharge ensuite
+    depuis l'admin.
+    """
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('termine', 'Terminé'),
+        ('echec', 'Échec'),
+    ]
+    
+    factures = models.JSONField(default=list, help_text='PK des factures du lot')
+    releves = models.BooleanField(default=True, verbose_name='Relevés clients')
+    demande_par = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True, blank=True)
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    chemin = models.CharField(max_length=500, blank=True, editable=False)
+    erreur = models.TextField(blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_debut = models.DateTimeField(null=True, blank=True)
+    date_fin = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Lot de factures'
+        verbose_name_plural = 'Lots de factures'
+        ordering = ['-date_creation']
+        indexes = [
+            models.Index(fields=['statut', 'date_creation']),
+        ]
+    
+    def __str__(self):
+        return f"Lot #{self.pk} - {len(self.factures)} facture(s) - {self.get_statut_display()}"
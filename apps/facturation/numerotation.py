@@ -0,0 +1,72 @@
+# ==========================================
+# apps/facturation/numerotation.py - Numérotation des factures
+# ==========================================
+from typing import List
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+PREFIXE = 'FAC'
+
+
+class NumerotationFactures:
+    """
+    Numéros FAC{AAAA}{MM}{NNNN} tirés d'un compteur par période.
+    À appeler dans la transaction qui enregistre la ou les factures : le verrou
+    sur le compteur est tenu jusqu'au commit, un rollback rend les numéros.
+    """
+
+    @staticmethod
+    def periode(jour=None) -> str:
+        jour = jour or timezone.localdate()
+        return f"{jour.year}{jour.month:02d}"
+
+    @staticmethod
+    def formater(periode: str, numero: int) -> str:
+        return f"{PREFIXE}{periode}{numero:04d}"
+
+    @staticmethod
+    def _sequence_verrouillee(periode: str):
+        from .models import SequenceFacture
+
+        try:
+            # Premier numéro du mois : création concurrente possible
+            with transaction.atomic():
+                SequenceFacture.objects.get_or_create(periode=periode)
+        except IntegrityError:
+            pass
+        return SequenceFacture.objects.select_for_update().get(periode=periode)
+
+    @staticmethod
+    def reserver(quantite: int = 1, jour=None) -> List[str]:
+        """Réserve une plage contiguë de numéros (facturation groupée)"""
+        if quantite < 1:
+            return []
+
+        periode = NumerotationFactures.periode(jour)
+        with transaction.atomic():
+            sequence = NumerotationFactures._sequence_verrouillee(periode)
+            premier = sequence.dernier_numero + 1
+            sequence.dernier_numero += quantite
+            sequence.save(update_fields=['dernier_numero'])
+
+        return [
+            NumerotationFactures.formater(periode, numero)
+            for numero in range(premier, premier + quantite)
+        ]
+
+    @staticmethod
+    def prochain_numero(jour=None) -> str:
+        return NumerotationFactures.reserver(1, jour)[0]
+
+    @staticmethod
+    def numeroter(factures) -> list:
+        """
+        Attribue une plage de numéros aux factures non numérotées, avant un
+        bulk_create (qui n'appelle pas save()). Même transaction que l'INSERT.
+        """
+        a_numeroter = [facture for facture in factures if not facture.numero]
+        numeros = NumerotationFactures.reserver(len(a_numeroter))
+        for facture, numero in zip(a_numeroter, numeros):
+            facture.numero = numero
+        return factures
@@ -0,0 +1,294 @@
+# ==========================================
+# apps/facturation/pdf.py - Rendu PDF des factures (file d'attente + cache disque)
+# ==========================================
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.forms.models import model_to_dict
+from django.template.loader import get_template
+from django.utils import timezone
+
+from utils.pdf import enregistrer_feuille, rendre_pdf
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PDF = 'facturation/facture_pdf.html'
+
+# À incrémenter si le rendu change sans que le template ni le CSS ne changent
+VERSION_RENDU = 1
+
+# Nombre d'essais avant de laisser une tâche en échec
+TENTATIVES_MAX = 3
+# Tâche "en cours" sans nouvelle depuis ce délai : worker arrêté, on la relance
+DELAI_TACHE_BLOQUEE = timedelta(minutes=15)
+
+CSS_FACTURE = """
+
+    @page {
+        size: A4;
+        margin: 15mm 12mm;
+    }
+    
+    body {
+        font-family: 'DejaVu Sans', Arial, sans-serif;
+        font-size: 11px;
+        line-height: 1.4;
+        color: #1f2937;
+        position: relative;
+    }
+    
+    /* Filigrane en CSS (fallback si l'image ne charge pas) */
+    body::before {
+        content: '';
+        position: fixed;
+        top: 50%;
+        left: 50%;
+        transform: translate(-50%, -50%);
+        width: 400px;
+        height: 400px;
+        background-image: url('data:image/svg+xml;charset=utf-8,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><text y="50" font-size="20" fill="rgba(2,6,111,0.03)" text-anchor="middle">RepAvi</text></svg>');
+        background-repeat: no-repeat;
+        background-position: center;
+        background-size: contain;
+        z-index: -1;
+        pointer-events: none;
+    }
+    
+    .container {
+        position: relative;
+        z-index: 1;
+        background: rgba(255, 255, 255, 0.98);
+    }
+    
+    /* Styles optimisés pour WeasyPrint */
+    .header {
+        display: flex;
+        justify-content: space-between;
+        align-items: flex-start;
+        padding: 20px 0;
+        border-bottom: 3px solid #02066F;
+        margin-bottom: 25px;
+    }
+    
+    .logo-section {
+        display: flex;
+        align-items: center;
+        gap: 15px;
+    }
+    
+    .company-info h1 {
+        font-size: 24px;
+        font-weight: bold;
+        color: #02066F;
+        margin: 0;
+    }
+    
+    .facture-title {
+        background: #02066F;
+        color: white;
+        padding: 15px;
+        text-align: center;
+        margin-bottom: 20px;
+    }
+    
+    .facture-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 20px 0;
+    }
+    
+    .facture-table th {
+        background: #02066F;
+        color: white;
+        padding: 10px;
+        text-align: center;
+        font-weight: bold;
+    }
+    
+    .facture-table td {
+        padding: 8px;
+        border: 1px solid #e5e7eb;
+        text-align: center;
+    }
+    
+    .totaux-table {
+        border: 2px solid #02066F;
+        margin-left: auto;
+        margin-top: 20px;
+    }
+    
+    .totaux-table td {
+        padding: 8px 15px;
+        border-bottom: 1px solid #e5e7eb;
+    }
+    
+    .total-final td {
+        background: #02066F;
+        color: white;
+        font-weight: bold;
+    }
+"""
+
+
+enregistrer_feuille('facture', CSS_FACTURE)
+
+
+class FacturePDFService:
+    """
+    PDF des factures rendus une seule fois et stockés sous MEDIA_ROOT/factures.
+    Le nom du fichier contient une empreinte des données affichées : toute
+    modification de la facture ou des paramètres produit un nouveau fichier.
+    """
+
+    @staticmethod
+    def dossier() -> Path:
+        dossier = Path(settings.MEDIA_ROOT) / 'factures'
+        dossier.mkdir(parents=True, exist_ok=True)
+        return dossier
+
+    @staticmethod
+    def contexte(facture):
+        from .models import ParametresFacturation
+
+        return {
+            'facture': facture,
+            'lignes': facture.get_lignes_facture(),
+            'details_sejour': facture.get_details_sejour(),
+            'parametres': ParametresFacturation.get_parametres(),
+            'STATIC_URL': settings.STATIC_URL,
+        }
+
+    @staticmethod
+    def empreinte(facture, contexte) -> str:
+        """Empreinte du contenu affiché (données, template, CSS)"""
+        cree_par = facture.cree_par
+        donnees = {
+            'version': VERSION_RENDU,
+            'template': get_template(TEMPLATE_PDF).template.source,
+            'css': CSS_FACTURE,
+            'facture': model_to_dict(facture),
+            'date_emission': facture.date_emission,
+            'client': model_to_dict(facture.client),
+            'cree_par': cree_par.get_full_name() or cree_par.username if cree_par else None,
+            'lignes': contexte['lignes'],
+            'details_sejour': contexte['details_sejour'],
+            'parametres': model_to_dict(contexte['parametres']),
+        }
+        brut = json.dumps(donnees, sort_keys=True, default=str)
+        return hashlib.sha256(brut.encode('utf-8')).hexdigest()[:20]
+
+    @staticmethod
+    def chemin(facture, empreinte) -> Path:
+        return FacturePDFService.dossier() / f'{facture.numero}_{empreinte}.pdf'
+
+    @staticmethod
+    def get_pdf(facture):
+        """Chemin du PDF à jour s'il a déjà été rendu, sinon None"""
+        contexte = FacturePDFService.contexte(facture)
+        chemin = FacturePDFService.chemin(facture, FacturePDFService.empreinte(facture, contexte))
+        return chemin if chemin.exists() else None
+
+    @staticmethod
+    def rendre(facture) -> Path:
+        """Rend le PDF sur disque (écriture atomique) et supprime les versions périmées"""
+        contexte = FacturePDFService.contexte(facture)
+        chemin = FacturePDFService.chemin(facture, FacturePDFService.empreinte(facture, contexte))
+        if chemin.exists():
+            return chemin
+
+        pdf = rendre_pdf(TEMPLATE_PDF, contexte, feuilles=('facture',))
+
+        # Fichier temporaire propre à ce rendu : le worker et une vue peuvent
+        # rendre la même facture en même temps sans s'écrire l'un sur l'autre
+        with tempfile.NamedTemporaryFile(
+            dir=chemin.parent, prefix=f'{chemin.stem}_', suffix='.tmp', delete=False
+        ) as temporaire:
+            try:
+                temporaire.write(pdf)
+                temporaire.close()
+                os.replace(temporaire.name, chemin)
+            except OSError:
+                Path(temporaire.name).unlink(missing_ok=True)
+                raise
+
+        for ancien in chemin.parent.glob(f'{facture.numero}_*.pdf'):
+            if ancien != chemin:
+                ancien.unlink(missing_ok=True)
+
+        return chemin
+
+    @staticmethod
+    def obtenir(facture) -> Path:
+        """PDF à jour : depuis le disque, ou rendu maintenant si le worker ne l'a pas encore fait"""
+        return FacturePDFService.get_pdf(facture) or FacturePDFService.rendre(facture)
+
+    @staticmethod
+    def planifier(facture):
+        """Ajoute le rendu de la facture à la file (après commit, sans doublon)"""
+        from .models import TacheRenduPDF
+
+        def creer():
+            if not TacheRenduPDF.objects.filter(facture_id=facture.pk, statut='en_attente').exists():
+                TacheRenduPDF.objects.create(facture_id=facture.pk)
+
+        transaction.on_commit(creer)
+
+    @staticmethod
+    def reclamer(taille_lot=10):
+        """
+        Prend jusqu'à taille_lot tâches en attente. La réservation se fait par un
+        UPDATE conditionnel : deux workers ne peuvent pas prendre la même tâche.
+        """
+        from .models import TacheRenduPDF
+
+        TacheRenduPDF.objects.filter(
+            statut='en_cours',
+            date_debut__lt=timezone.now() - DELAI_TACHE_BLOQUEE
+        ).update(statut='en_attente')
+
+        reclamees = []
+        candidates = TacheRenduPDF.objects.filter(
+            statut='en_attente'
+        ).order_by('date_creation').values_list('pk', flat=True)[:taille_lot]
+
+        for pk in candidates:
+            prise = TacheRenduPDF.objects.filter(pk=pk, statut='en_attente').update(
+                statut='en_cours', date_debut=timezone.now()
+            )
+            if prise:
+                reclamees.append(pk)
+
+        return TacheRenduPDF.objects.filter(pk__in=reclamees).select_related(
+            'facture__client', 'facture__cree_par', 'facture__reservation__appartement',
+            'facture__echeance_paiement'
+        )
+
+    @staticmethod
+    def traiter_lot(taille_lot=10):
+        """Traite un lot de tâches ; renvoie (rendus, échecs)"""
+        rendus, echecs = 0, 0
+
+        for tache in FacturePDFService.reclamer(taille_lot):
+            tache.tentatives += 1
+            try:
+                FacturePDFService.rendre(tache.facture)
+                tache.statut = 'terminee'
+                tache.erreur = ''
+                rendus += 1
+            except Exception as e:
+                logger.error(f"Rendu PDF facture {tache.facture_id} impossible: {e}")
+                tache.statut = 'echec' if tache.tentatives >= TENTATIVES_MAX else 'en_attente'
+                tache.erreur = str(e)[:1000]
+                echecs += 1
+
+            tache.date_fin = timezone.now()
+            tache.save(update_fields=['statut', 'tentatives', 'erreur', 'date_fin'])
+
+        return rendus, echecs
@@ -1,70 +1,24 @@
 # ==========================================
 # apps/facturation/signals.py - FACTURATION PAR TRANCHE
 # ==========================================
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django.conf import settings
 from django.db.models import Sum
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from datetime import datetime, timedelta
 from decimal import Decimal
 import logging
 
 from apps.reservations.models import Reservation
 from apps.paiements.models import EcheancierPaiement
-from .models import Facture, ParametresFacturation
+from apps.notifications.emails import BoiteEnvoi
+from .models import Facture, LotFactures, ParametresFacturation
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-@receiver(post_save, sender=EcheancierPaiement)
-def creer_facture_apres_chaque_paiement(sender, instance, created, **kwargs):
-    """
-    Crée une facture à chaque paiement effectué (acompte OU solde)
-    """
-    # Ne traiter que les paiements qui viennent d'être marqués comme payés
-    if instance.statut != 'paye':
-        return
-    
-    try:
-        # Vérifier si une facture existe déjà pour ce paiement spécifique
-        try:
-            facture_existante = Facture.objects.get(echeance_paiement=instance)
-            logger.info(f"Facture {facture_existante.numero} existe déjà pour le paiement {instance.pk}")
-            return
-        except Facture.DoesNotExist:
-            # Pas de facture pour ce paiement, continuer
-            pass
-        
-        # Récupérer les paramètres
-        parametres = ParametresFacturation.get_parametres()
-        
-        # Créer la facture pour ce paiement spécifique
-        facture = Facture.objects.create(
-            echeance_paiement=instance,
-            date_echeance=datetime.now().date() + timedelta(days=parametres.delai_paiement_jours),
-            notes=f"Facture générée automatiquement pour {instance.get_type_paiement_display().lower()} le {datetime.now().strftime('%d/%m/%Y à %H:%M')}",
-            statut='payee',  # Directement payée puisque paiement effectué
-            cree_par=None  # Création automatique
-        )
-        
-        # Calculer le contexte du paiement (soldes avant/après)
-        facture.calculer_contexte_paiement()
-        facture.save()
-        
-        logger.info(f"✅ Facture {facture.numero} créée pour {instance.get_type_paiement_display()} de {instance.montant_paye} FCFA")
-        
-        # Notifier les gestionnaires
-        notifier_facture_generee(facture)
-        
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la création de facture pour le paiement {instance.pk}: {e}")
-        import traceback
-        traceback.print_exc()
-
-
 def notifier_facture_generee(facture):
     """
     Notifie les gestionnaires qu'une facture a été générée
@@ -110,17 +64,16 @@ Période : du {facture.reservation.date_arrivee} au {facture.reservation.date_de
 RepAvi Lodges
             """
             
-            emails_gestionnaires = [g.email for g in gestionnaires]
-            
-            send_mail(
-                subject=sujet,
+            # Boîte d'envoi : enregistré avec la facture, envoyé par `manage.py envoyer_emails`
+            BoiteEnvoi.ajouter(
+                sujet=sujet,
                 message=message,
-                from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@repavilodges.com'),
-                recipient_list=emails_gestionnaires,
-                fail_silently=True
+                destinataires=list(gestionnaires.values_list('email', flat=True)),
+                cle=f'facture:{facture.pk}',
+                expediteur=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@repavilodges.com'),
             )
             
-            logger.info(f"📧 Notification envoyée pour facture {type_paiement} {facture.numero}")
+            logger.info(f"📧 Notification mise en file pour facture {type_paiement} {facture.numero}")
         
     except Exception as e:
         logger.error(f"❌ Erreur notification facture {facture.numero}: {e}")
@@ -214,4 +167,12 @@ def creer_factures_manquantes():
             erreurs += 1
     
     print(f"\n📊 RÉSULTAT: {factures_creees} factures créées, {erreurs} erreurs")
-    return factures_creees, erreurs
\ No newline at end of file
+    return factures_creees, erreurs
+
+
+@receiver(post_delete, sender=LotFactures)
+def supprimer_fichiers_lot(sender, instance, **kwargs):
+    """Un lot supprimé (admin, suppression groupée comprise) emporte son archive"""
+    from .lot import FileLots
+
+    FileLots.supprimer_fichiers(instance)
@@ -12,6 +12,7 @@ urlpatterns = [
     
     # Gestion des factures
     path('liste/', views.liste_factures, name='liste'),
+    path('export/', views.export_factures, name='export'),
     path('<int:pk>/', views.detail_facture, name='detail'),
     path('<int:pk>/modifier/', views.modifier_facture, name='modifier'),
     
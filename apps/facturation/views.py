@@ -4,8 +4,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse, Http404
-from django.template.loader import get_template
+from django.http import FileResponse, Http404
 from django.conf import settings
 from django.urls import reverse
 from datetime import datetime, timedelta
@@ -13,26 +12,48 @@ import os
 from io import BytesIO
 from django.db.models import Sum
 
-# Import pour PDF
-try:
-    from weasyprint import HTML, CSS
-    from weasyprint.text.fonts import FontConfiguration
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-
 from apps.users.views import is_gestionnaire
 from apps.reservations.models import Reservation
 from .models import Facture, ParametresFacturation
+from .pdf import FacturePDFService
+from utils.pdf import WEASYPRINT_AVAILABLE
+from .exports import EXPORT_FACTURES
+from utils.exports import get_format_export, reponse_export
+from utils.pagination import paginer, demande_json, reponse_json
 
 
 @login_required
 @user_passes_test(is_gestionnaire)
 def liste_factures(request):
     """Liste des factures RepAvi"""
-    factures = Facture.objects.select_related('client', 'reservation').all()
+    factures = _filtrer_factures(request, Facture.objects.select_related('client', 'reservation').all())
+    factures = paginer(request, factures, ('-date_emission', '-pk'))
+    if demande_json(request):
+        return reponse_json(factures, _serialiser_facture)
     
-    # Filtres
+    context = {
+        'factures': factures,
+        'statut_filtre': request.GET.get('statut'),
+        'mois_filtre': request.GET.get('mois'),
+        'statuts': Facture.STATUT_CHOICES,
+    }
+    return render(request, 'facturation/liste.html', context)
+
+
+def _serialiser_facture(facture):
+    return {
+        'id': facture.pk,
+        'numero': facture.numero,
+        'client': f'{facture.client.prenom} {facture.client.nom}',
+        'date_emission': facture.date_emission.isoformat(),
+        'montant_ttc': str(facture.montant_ttc),
+        'statut': facture.statut,
+        'url': reverse('facturation:detail', args=[facture.pk]),
+    }
+
+
+def _filtrer_factures(request, factures):
+    """Filtres communs à la liste et à l'export (?statut=, ?mois=AAAA-MM)"""
     statut = request.GET.get('statut')
     if statut:
         factures = factures.filter(statut=statut)
@@ -47,14 +68,15 @@ def liste_factures(request):
             )
         except ValueError:
             pass
-    
-    context = {
-        'factures': factures,
-        'statut_filtre': statut,
-        'mois_filtre': mois,
-        'statuts': Facture.STATUT_CHOICES,
-    }
-    return render(request, 'facturation/liste.html', context)
+    return factures
+
+
+@login_required
+@user_passes_test(is_gestionnaire)
+def export_factures(request):
+    """Export CSV / XLSX des factures"""
+    factures = _filtrer_factures(request, Facture.objects.order_by('-date_emission'))
+    return reponse_export(EXPORT_FACTURES, factures, get_format_export(request))
 
 
 @login_required
@@ -115,153 +137,33 @@ def generer_facture_reservation(request, reservation_pk):
 @login_required
 @user_passes_test(is_gestionnaire)
 def facture_pdf(request, pk):
-    """Génère le PDF d'une facture - VERSION AMÉLIORÉE"""
+    """
+    PDF d'une facture : servi depuis le disque s'il a déjà été rendu
+    (worker traiter_rendus_pdf), sinon rendu une fois puis conservé.
+    """
     if not WEASYPRINT_AVAILABLE:
         messages.error(request, 'La génération PDF n\'est pas disponible. Veuillez installer WeasyPrint.')
         return redirect('facturation:detail', pk=pk)
     
-    facture = get_object_or_404(Facture, pk=pk)
-    
-    # Contexte pour le template PDF
-    context = {
-        'facture': facture,
-        'lignes': facture.get_lignes_facture(),
-        'details_sejour': facture.get_details_sejour(),
-        'parametres': ParametresFacturation.get_parametres(),
-        'date_impression': datetime.now(),
-        'user': request.user,
-        'STATIC_URL': settings.STATIC_URL,  # ← AJOUT: Pour les images
-    }
-    
-    # Rendu du template HTML
-    template = get_template('facturation/facture_pdf.html')
-    html_string = template.render(context)
-    
-    # Configuration des polices
-    font_config = FontConfiguration()
-    
-    # CSS amélioré pour le PDF avec filigrane
-    css_content = f"""
-        @page {{
-            size: A4;
-            margin: 15mm 12mm;
-        }}
-        
-        body {{
-            font-family: 'DejaVu Sans', Arial, sans-serif;
-            font-size: 11px;
-            line-height: 1.4;
-            color: #1f2937;
-            position: relative;
-        }}
-        
-        /* Filigrane en CSS (fallback si l'image ne charge pas) */
-        body::before {{
-            content: '';
-            position: fixed;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            width: 400px;
-            height: 400px;
-            background-image: url('data:image/svg+xml;charset=utf-8,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><text y="50" font-size="20" fill="rgba(2,6,111,0.03)" text-anchor="middle">RepAvi</text></svg>');
-            background-repeat: no-repeat;
-            background-position: center;
-            background-size: contain;
-            z-index: -1;
-            pointer-events: none;
-        }}
-        
-        .container {{
-            position: relative;
-            z-index: 1;
-            background: rgba(255, 255, 255, 0.98);
-        }}
-        
-        /* Styles optimisés pour WeasyPrint */
-        .header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            padding: 20px 0;
-            border-bottom: 3px solid #02066F;
-            margin-bottom: 25px;
-        }}
-        
-        .logo-section {{
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }}
-        
-        .company-info h1 {{
-            font-size: 24px;
-            font-weight: bold;
-            color: #02066F;
-            margin: 0;
-        }}
-        
-        .facture-title {{
-            background: #02066F;
-            color: white;
-            padding: 15px;
-            text-align: center;
-            margin-bottom: 20px;
-        }}
-        
-        .facture-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-        }}
-        
-        .facture-table th {{
-            background: #02066F;
-            color: white;
-            padding: 10px;
-            text-align: center;
-            font-weight: bold;
-        }}
-        
-        .facture-table td {{
-            padding: 8px;
-            border: 1px solid #e5e7eb;
-            text-align: center;
-        }}
-        
-        .totaux-table {{
-            border: 2px solid #02066F;
-            margin-left: auto;
-            margin-top: 20px;
-        }}
-        
-        .totaux-table td {{
-            padding: 8px 15px;
-            border-bottom: 1px solid #e5e7eb;
-        }}
-        
-        .total-final td {{
-            background: #02066F;
-            color: white;
-            font-weight: bold;
-        }}
-    """
+    facture = get_object_or_404(
+        Facture.objects.select_related(
+            'client', 'cree_par', 'reservation__appartement', 'echeance_paiement'
+        ),
+        pk=pk
+    )
     
-    # Génération du PDF
     try:
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        css = CSS(string=css_content, font_config=font_config)
-        pdf_file = html.write_pdf(stylesheets=[css], font_config=font_config)
-        
-        # Réponse HTTP avec le PDF
-        response = HttpResponse(pdf_file, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="Facture_{facture.numero}.pdf"'
-        
-        return response
-        
+        chemin = FacturePDFService.obtenir(facture)
     except Exception as e:
         messages.error(request, f'Erreur lors de la génération du PDF : {str(e)}')
         return redirect('facturation:detail', pk=pk)
+    
+    return FileResponse(
+        open(chemin, 'rb'),
+        as_attachment=True,
+        filename=f'Facture_{facture.numero}.pdf',
+        content_type='application/pdf'
+    )
 
 
 @login_required
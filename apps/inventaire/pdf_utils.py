@@ -1,20 +1,141 @@
 # apps/inventaire/pdf_utils.py
-from django.http import HttpResponse
-from django.template.loader import get_template
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db.models import Sum
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
-import tempfile
-import os
 from datetime import datetime
 
 from apps.appartements.models import Appartement
 from apps.users.views import is_gestionnaire
 from repavi import settings
+from utils.pdf import enregistrer_feuille, rendre_pdf, reponse_pdf
 from .models import EquipementAppartement
 
+# Feuilles de style compilées une fois par thread de rendu (utils.pdf)
+enregistrer_feuille('inventaire_rapport', """
+@page {
+    size: A4;
+    margin: 2cm;
+    @top-center {
+        content: "RepAvi Lodges - Rapport d'Inventaire";
+        font-size: 10pt;
+        color: #666;
+    }
+    @bottom-center {
+        content: "Page " counter(page) " sur " counter(pages);
+        font-size: 10pt;
+        color: #666;
+    }
+}
+
+body {
+    font-family: 'DejaVu Sans', sans-serif;
+    font-size: 11pt;
+    line-height: 1.4;
+    color: #333;
+}
+
+.header {
+    text-align: center;
+    border-bottom: 2px solid #02066F;
+    padding-bottom: 20px;
+    margin-bottom: 30px;
+}
+
+.logo {
+    font-size: 24pt;
+    font-weight: bold;
+    color: #02066F;
+    margin-bottom: 10px;
+}
+
+.rapport-title {
+    font-size: 18pt;
+    font-weight: bold;
+    margin-bottom: 5px;
+}
+
+.stats-grid {
+    display: table;
+    width: 100%;
+    margin-bottom: 30px;
+}
+
+.stats-row {
+    display: table-row;
+}
+
+.stats-cell {
+    display: table-cell;
+    width: 25%;
+    padding: 15px;
+    text-align: center;
+    border: 1px solid #ddd;
+}
+
+.stats-number {
+    font-size: 18pt;
+    font-weight: bold;
+    color: #02066F;
+}
+
+.equipement-table {
+    width: 100%;
+    border-collapse: collapse;
+    margin-bottom: 30px;
+}
+
+.equipement-table th,
+.equipement-table td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: left;
+}
+
+.equipement-table th {
+    background-color: #f8f9fa;
+    font-weight: bold;
+    color: #02066F;
+}
+
+.etat-bon { color: #10b981; font-weight: bold; }
+.etat-usage { color: #3b82f6; font-weight: bold; }
+.etat-defectueux { color: #f59e0b; font-weight: bold; }
+.etat-hors-service { color: #ef4444; font-weight: bold; }
+
+.footer-info {
+    margin-top: 30px;
+    padding-top: 20px;
+    border-top: 1px solid #ddd;
+    font-size: 10pt;
+    color: #666;
+}
+
+.break-inside-avoid {
+    break-inside: avoid;
+}
+""")
+
+enregistrer_feuille('inventaire_general', """
+@page { size: A4; margin: 2cm; }
+body { font-family: 'DejaVu Sans', sans-serif; font-size: 11pt; }
+.header { text-align: center; border-bottom: 2px solid #02066F; padding-bottom: 20px; margin-bottom: 30px; }
+.logo { font-size: 24pt; font-weight: bold; color: #02066F; }
+.rapport-title { font-size: 18pt; font-weight: bold; margin-bottom: 5px; }
+.stats-grid { display: table; width: 100%; margin-bottom: 30px; }
+.stats-row { display: table-row; }
+.stats-cell { display: table-cell; width: 25%; padding: 15px; text-align: center; border: 1px solid #ddd; }
+.stats-number { font-size: 18pt; font-weight: bold; color: #02066F; }
+table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
+th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+th { background-color: #f8f9fa; color: #02066F; font-weight: bold; }
+.etat-bon { color: #10b981; font-weight: bold; }
+.etat-usage { color: #3b82f6; font-weight: bold; }
+.etat-defectueux { color: #f59e0b; font-weight: bold; }
+.etat-hors-service { color: #ef4444; font-weight: bold; }
+.break-inside-avoid { break-inside: avoid; }
+.footer-info { margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 10pt; color: #666; }
+""")
+
 @login_required
 @user_passes_test(is_gestionnaire)
 def generer_pdf_inventaire(request, appartement_pk):
@@ -51,131 +172,10 @@ def generer_pdf_inventaire(request, appartement_pk):
 
     }
     
-    # Rendu du template
-    template = get_template('inventaire/pdf_rapport.html')
-    html_string = template.render(context)
-    
-    # Configuration des fonts
-    font_config = FontConfiguration()
-    
-    # CSS pour le PDF
-    css_string = """
-    @page {
-        size: A4;
-        margin: 2cm;
-        @top-center {
-            content: "RepAvi Lodges - Rapport d'Inventaire";
-            font-size: 10pt;
-            color: #666;
-        }
-        @bottom-center {
-            content: "Page " counter(page) " sur " counter(pages);
-            font-size: 10pt;
-            color: #666;
-        }
-    }
-    
-    body {
-        font-family: 'DejaVu Sans', sans-serif;
-        font-size: 11pt;
-        line-height: 1.4;
-        color: #333;
-    }
-    
-    .header {
-        text-align: center;
-        border-bottom: 2px solid #02066F;
-        padding-bottom: 20px;
-        margin-bottom: 30px;
-    }
-    
-    .logo {
-        font-size: 24pt;
-        font-weight: bold;
-        color: #02066F;
-        margin-bottom: 10px;
-    }
-    
-    .rapport-title {
-        font-size: 18pt;
-        font-weight: bold;
-        margin-bottom: 5px;
-    }
-    
-    .stats-grid {
-        display: table;
-        width: 100%;
-        margin-bottom: 30px;
-    }
-    
-    .stats-row {
-        display: table-row;
-    }
-    
-    .stats-cell {
-        display: table-cell;
-        width: 25%;
-        padding: 15px;
-        text-align: center;
-        border: 1px solid #ddd;
-    }
-    
-    .stats-number {
-        font-size: 18pt;
-        font-weight: bold;
-        color: #02066F;
-    }
-    
-    .equipement-table {
-        width: 100%;
-        border-collapse: collapse;
-        margin-bottom: 30px;
-    }
-    
-    .equipement-table th,
-    .equipement-table td {
-        border: 1px solid #ddd;
-        padding: 8px;
-        text-align: left;
-    }
-    
-    .equipement-table th {
-        background-color: #f8f9fa;
-        font-weight: bold;
-        color: #02066F;
-    }
-    
-    .etat-bon { color: #10b981; font-weight: bold; }
-    .etat-usage { color: #3b82f6; font-weight: bold; }
-    .etat-defectueux { color: #f59e0b; font-weight: bold; }
-    .etat-hors-service { color: #ef4444; font-weight: bold; }
-    
-    .footer-info {
-        margin-top: 30px;
-        padding-top: 20px;
-        border-top: 1px solid #ddd;
-        font-size: 10pt;
-        color: #666;
-    }
-    
-    .break-inside-avoid {
-        break-inside: avoid;
-    }
-    """
-    
-    # Génération du PDF
-    html = HTML(string=html_string)
-    css = CSS(string=css_string, font_config=font_config)
-    
-    # Nom du fichier
     filename = f"inventaire_{appartement.numero}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
+    pdf = rendre_pdf('inventaire/pdf_rapport.html', context, feuilles=('inventaire_rapport',))
     
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    html.write_pdf(response, stylesheets=[css], font_config=font_config)
-    
-    return response
+    return reponse_pdf(pdf, filename)
 
 @login_required
 @user_passes_test(is_gestionnaire)
@@ -215,37 +215,7 @@ def generer_pdf_general(request):
 
     }
     
-    template = get_template('inventaire/pdf_general.html')
-    html_string = template.render(context)
-    
-    font_config = FontConfiguration()
-    css = CSS(string="""
-    @page { size: A4; margin: 2cm; }
-    body { font-family: 'DejaVu Sans', sans-serif; font-size: 11pt; }
-    .header { text-align: center; border-bottom: 2px solid #02066F; padding-bottom: 20px; margin-bottom: 30px; }
-    .logo { font-size: 24pt; font-weight: bold; color: #02066F; }
-    .rapport-title { font-size: 18pt; font-weight: bold; margin-bottom: 5px; }
-    .stats-grid { display: table; width: 100%; margin-bottom: 30px; }
-    .stats-row { display: table-row; }
-    .stats-cell { display: table-cell; width: 25%; padding: 15px; text-align: center; border: 1px solid #ddd; }
-    .stats-number { font-size: 18pt; font-weight: bold; color: #02066F; }
-    table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-    th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-    th { background-color: #f8f9fa; color: #02066F; font-weight: bold; }
-    .etat-bon { color: #10b981; font-weight: bold; }
-    .etat-usage { color: #3b82f6; font-weight: bold; }
-    .etat-defectueux { color: #f59e0b; font-weight: bold; }
-    .etat-hors-service { color: #ef4444; font-weight: bold; }
-    .break-inside-avoid { break-inside: avoid; }
-    .footer-info { margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 10pt; color: #666; }
-    """, font_config=font_config)
-    
-    html = HTML(string=html_string)
     filename = f"inventaire_general_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
+    pdf = rendre_pdf('inventaire/pdf_general.html', context, feuilles=('inventaire_general',))
     
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    html.write_pdf(response, stylesheets=[css], font_config=font_config)
-    
-    return response
\ No newline at end of file
+    return reponse_pdf(pdf, filename)
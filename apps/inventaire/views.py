@@ -4,53 +4,85 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Sum
+from django.db.models import Count, Q, Sum
 
 from apps.appartements.models import Appartement
 from apps.users.views import is_gestionnaire
 from .models import EquipementAppartement
 from .forms import EquipementForm
+from utils.pagination import paginer, demande_json, reponse_json
+
 
 @login_required
 @user_passes_test(is_gestionnaire)
 def inventaire_general(request):
     """Inventaire général selon cahier"""
-    appartements = Appartement.objects.all()
+    # Statistiques globales (une seule requête)
+    globales = EquipementAppartement.objects.aggregate(
+        total=Count('id'),
+        defectueux=Count('id', filter=Q(etat='defectueux')),
+        hors_service=Count('id', filter=Q(etat='hors_service')),
+        valeur=Sum('prix_achat'),
+    )
+    
+    # Une page d'appartements, compteurs par état calculés en base
+    compteurs_etats = {
+        f'nb_{etat_code}': Count('inventaire_equipements', filter=Q(inventaire_equipements__etat=etat_code))
+        for etat_code, _ in EquipementAppartement.ETAT_CHOICES
+    }
+    appartements = Appartement.objects.annotate(
+        nb_equipements=Count('inventaire_equipements'),
+        valeur_equipements=Sum('inventaire_equipements__prix_achat'),
+        **compteurs_etats
+    ).prefetch_related('inventaire_equipements')
+    appartements = paginer(request, appartements, ('numero', 'pk'), taille=10)
     
-    # Statistiques globales
-    total_equipements = EquipementAppartement.objects.count()
-    equipements_defectueux = EquipementAppartement.objects.filter(etat='defectueux').count()
-    equipements_hors_service = EquipementAppartement.objects.filter(etat='hors_service').count()
-    valeur_totale = EquipementAppartement.objects.aggregate(total=Sum('prix_achat'))['total'] or 0
+    if demande_json(request):
+        return reponse_json(appartements, _serialiser_inventaire)
     
     # Données par appartement
-    appartements_data = []
-    for appartement in appartements:
-        equipements = appartement.inventaire_equipements.all()  # Utilisation du nouveau related_name
-        stats_etats = {}
-        for etat_code, etat_nom in EquipementAppartement.ETAT_CHOICES:
-            stats_etats[etat_code] = {
-                'nom': etat_nom,
-                'count': equipements.filter(etat=etat_code).count()
-            }
-        
-        appartements_data.append({
-            'appartement': appartement,
-            'equipements': equipements,
-            'nb_equipements': equipements.count(),
-            'valeur_totale': equipements.aggregate(total=Sum('prix_achat'))['total'] or 0,
-            'stats_etats': stats_etats,
-        })
+    appartements_data = [_donnees_inventaire(appartement) for appartement in appartements]
     
     context = {
         'appartements_data': appartements_data,
-        'total_equipements': total_equipements,
-        'equipements_defectueux': equipements_defectueux,
-        'equipements_hors_service': equipements_hors_service,
-        'valeur_totale': valeur_totale,
+        'page_appartements': appartements,
+        # Liste courte (pk, numéro) pour le menu "Ajouter équipement à..."
+        'appartements_choix': Appartement.objects.values_list('pk', 'numero'),
+        'total_equipements': globales['total'],
+        'equipements_defectueux': globales['defectueux'],
+        'equipements_hors_service': globales['hors_service'],
+        'valeur_totale': globales['valeur'] or 0,
     }
     return render(request, 'inventaire/general.html', context)
 
+
+def _donnees_inventaire(appartement):
+    """Bloc d'un appartement annoté par inventaire_general (aucune requête)"""
+    return {
+        'appartement': appartement,
+        'equipements': appartement.inventaire_equipements.all(),
+        'nb_equipements': appartement.nb_equipements,
+        'valeur_totale': appartement.valeur_equipements or 0,
+        'stats_etats': {
+            etat_code: {'nom': etat_nom, 'count': getattr(appartement, f'nb_{etat_code}')}
+            for etat_code, etat_nom in EquipementAppartement.ETAT_CHOICES
+        },
+    }
+
+
+def _serialiser_inventaire(appartement):
+    return {
+        'id': appartement.pk,
+        'numero': appartement.numero,
+        'nb_equipements': appartement.nb_equipements,
+        'valeur_totale': str(appartement.valeur_equipements or 0),
+        'etats': {
+            etat_code: getattr(appartement, f'nb_{etat_code}')
+            for etat_code, _ in EquipementAppartement.ETAT_CHOICES
+        },
+    }
+
+
 @login_required
 @user_passes_test(is_gestionnaire)
 def inventaire_par_appartement(request, appartement_pk):
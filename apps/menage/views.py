@@ -1,9 +1,11 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.http import JsonResponse
 from django.utils import timezone
 from apps.users.views import is_gestionnaire
 from .models import TacheMenage
+from utils.pagination import paginer, demande_json
 
 
 @login_required
@@ -17,12 +19,20 @@ def planning_menage(request):
         statut='a_faire',
         date_prevue__lte=today
     ).select_related('appartement', 'reservation')
+    taches_urgentes = paginer(request, taches_urgentes, ('date_prevue', 'pk'), taille=20, parametre='urgentes')
     
     # Tâches à venir
     taches_a_venir = TacheMenage.objects.filter(
         statut='a_faire',
         date_prevue__gt=today
-    ).select_related('appartement', 'reservation').order_by('date_prevue')[:20]
+    ).select_related('appartement', 'reservation')
+    taches_a_venir = paginer(request, taches_a_venir, ('date_prevue', 'pk'), taille=20, parametre='a_venir')
+    
+    if demande_json(request):
+        return JsonResponse({
+            'urgentes': taches_urgentes.en_json(_serialiser_tache),
+            'a_venir': taches_a_venir.en_json(_serialiser_tache),
+        })
     
     # Tâches en cours
     taches_en_cours = TacheMenage.objects.filter(
@@ -44,6 +54,16 @@ def planning_menage(request):
     return render(request, 'menage/planning.html', context)
 
 
+def _serialiser_tache(tache):
+    return {
+        'id': tache.pk,
+        'appartement': tache.appartement.numero,
+        'date_prevue': tache.date_prevue.isoformat(),
+        'statut': tache.statut,
+        'apres_depart': tache.reservation_id is not None,
+    }
+
+
 @login_required
 @user_passes_test(is_gestionnaire)
 def detail_tache(request, tache_pk):
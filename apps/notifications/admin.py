@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import EmailSortant
+
+
+@admin.register(EmailSortant)
+class EmailSortantAdmin(admin.ModelAdmin):
+    """Suivi de la boîte d'envoi"""
+    
+    list_display = ['sujet', 'statut', 'tentatives', 'prochaine_tentative', 'date_envoi']
+    list_filter = ['statut']
+    search_fields = ['sujet', 'cle']
+    readonly_fields = ['cle', 'tentatives', 'erreur', 'date_creation', 'date_envoi']
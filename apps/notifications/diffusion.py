@@ -0,0 +1,126 @@
+# ==========================================
+# apps/notifications/diffusion.py - Diffusion temps réel (pub/sub)
+# ==========================================
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CANAL = 'repavi:notifications'
+
+
+def _redis_url():
+    return getattr(settings, 'NOTIFICATIONS_REDIS_URL', '')
+
+
+# ==========================================
+# Diffusion en mémoire (un seul processus : runserver, uvicorn 1 worker)
+# ==========================================
+_abonnes = defaultdict(set)
+_verrou = threading.Lock()
+
+
+def _publier_local(user_ids):
+    with _verrou:
+        cibles = [abonne for user_id in user_ids for abonne in _abonnes.get(user_id, ())]
+
+    for boucle, evenement in cibles:
+        # Publication depuis un thread (vue synchrone) vers la boucle de l'abonné
+        boucle.call_soon_threadsafe(evenement.set)
+
+
+class _AbonnementLocal:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.evenement = asyncio.Event()
+        self.cle = (asyncio.get_running_loop(), self.evenement)
+
+    def ouvrir(self):
+        with _verrou:
+            _abonnes[self.user_id].add(self.cle)
+
+    def fermer(self):
+        with _verrou:
+            _abonnes[self.user_id].discard(self.cle)
+            if not _abonnes[self.user_id]:
+                del _abonnes[self.user_id]
+
+    async def attendre(self, timeout):
+        """True si une publication est arrivée avant le délai"""
+        try:
+            await asyncio.wait_for(self.evenement.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.evenement.clear()
+        return True
+
+
+# ==========================================
+# Diffusion Redis (plusieurs workers / serveurs)
+# ==========================================
+class _AbonnementRedis:
+    def __init__(self, user_id):
+        import redis.asyncio as aioredis
+
+        self.canal = f'{CANAL}:{user_id}'
+        self.client = aioredis.Redis.from_url(_redis_url())
+        self.pubsub = self.client.pubsub()
+
+    async def ouvrir(self):
+        await self.pubsub.subscribe(self.canal)
+
+    async def fermer(self):
+        await self.pubsub.unsubscribe(self.canal)
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def attendre(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message is not None
+
+
+def publier(user_ids):
+    """Signale aux navigateurs connectés que les notifications de ces utilisateurs ont changé"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    if _redis_url():
+        try:
+            import redis
+            client = redis.Redis.from_url(_redis_url())
+            with client.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.publish(f'{CANAL}:{user_id}', '1')
+                pipe.execute()
+            return
+        except Exception as e:
+            # Redis indisponible : les clients se resynchronisent au prochain battement
+            logger.warning(f"Diffusion Redis impossible: {e}")
+            return
+
+    _publier_local(user_ids)
+
+
+@asynccontextmanager
+async def abonner(user_id):
+    """Abonnement aux changements d'un utilisateur, pour la durée d'un flux SSE"""
+    if _redis_url():
+        abonnement = _AbonnementRedis(user_id)
+        await abonnement.ouvrir()
+        try:
+            yield abonnement
+        finally:
+            await abonnement.fermer()
+    else:
+        abonnement = _AbonnementLocal(user_id)
+        abonnement.ouvrir()
+        try:
+            yield abonnement
+        finally:
+            abonnement.fermer()
@@ -0,0 +1,134 @@
+# ==========================================
+# apps/notifications/emails.py - Boîte d'envoi des emails
+# ==========================================
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Nouvelle tentative après 1, 2, 4, 8, 16 minutes... puis abandon
+DELAI_BASE = timedelta(minutes=1)
+DELAI_MAX = timedelta(hours=2)
+TENTATIVES_MAX = 8
+# Email "en cours" sans résultat depuis ce délai : l'envoyeur s'est arrêté
+DELAI_BLOQUE = timedelta(minutes=10)
+
+
+class BoiteEnvoi:
+    """
+    Les emails sont enregistrés dans la transaction de l'action métier
+    (aucune latence SMTP pour l'utilisateur) puis envoyés par lots,
+    une connexion SMTP par lot, avec reprise en cas d'échec.
+    """
+
+    @staticmethod
+    def ajouter(sujet, message, destinataires, cle=None, expediteur=None):
+        """Met un email en file ; ignoré si un email de même clé existe déjà"""
+        from .models import EmailSortant
+
+        destinataires = [email for email in destinataires if email]
+        if not destinataires:
+            return None
+
+        try:
+            with transaction.atomic():
+                return EmailSortant.objects.create(
+                    sujet=sujet[:255],
+                    message=message,
+                    destinataires=destinataires,
+                    expediteur=expediteur or settings.DEFAULT_FROM_EMAIL,
+                    cle=cle,
+                )
+        except IntegrityError:
+            logger.info(f"Email déjà en file pour {cle}")
+            return None
+
+    @staticmethod
+    def delai_tentative(tentatives):
+        return min(DELAI_BASE * (2 ** max(tentatives - 1, 0)), DELAI_MAX)
+
+    @staticmethod
+    def reclamer(taille_lot):
+        """Emails dus, réservés par UPDATE conditionnel (plusieurs envoyeurs possibles)"""
+        from .models import EmailSortant
+
+        maintenant = timezone.now()
+        EmailSortant.objects.filter(
+            statut='en_cours', prochaine_tentative__lt=maintenant - DELAI_BLOQUE
+        ).update(statut='en_attente')
+
+        candidats = EmailSortant.objects.filter(
+            statut='en_attente', prochaine_tentative__lte=maintenant
+        ).order_by('prochaine_tentative').values_list('pk', flat=True)[:taille_lot]
+
+        reserves = [
+            pk for pk in candidats
+            if EmailSortant.objects.filter(pk=pk, statut='en_attente').update(
+                statut='en_cours', prochaine_tentative=maintenant
+            )
+        ]
+        return list(EmailSortant.objects.filter(pk__in=reserves).order_by('pk'))
+
+    @staticmethod
+    def envoyer_lot(taille_lot=50):
+        """Envoie un lot sur une seule connexion ; renvoie (envoyés, en échec)"""
+        emails = BoiteEnvoi.reclamer(taille_lot)
+        if not emails:
+            return 0, 0
+
+        envoyes, echecs = 0, 0
+        connexion = get_connection(fail_silently=False)
+
+        try:
+            connexion.open()
+        except Exception as e:
+            # Serveur SMTP indisponible : tout le lot est reporté
+            for email in emails:
+                BoiteEnvoi._echec(email, e)
+            return 0, len(emails)
+
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.sujet,
+                    body=email.message,
+                    from_email=email.expediteur or settings.DEFAULT_FROM_EMAIL,
+                    to=email.destinataires,
+                    connection=connexion,
+                )
+                try:
+                    # Un message à la fois sur la connexion ouverte : statut par email
+                    connexion.send_messages([message])
+                except Exception as e:
+                    BoiteEnvoi._echec(email, e)
+                    echecs += 1
+                    continue
+
+                email.statut = 'envoye'
+                email.tentatives += 1
+                email.date_envoi = timezone.now()
+                email.erreur = ''
+                email.save(update_fields=['statut', 'tentatives', 'date_envoi', 'erreur'])
+                envoyes += 1
+        finally:
+            connexion.close()
+
+        return envoyes, echecs
+
+    @staticmethod
+    def _echec(email, erreur):
+        email.tentatives += 1
+        email.erreur = str(erreur)[:1000]
+        if email.tentatives >= TENTATIVES_MAX:
+            email.statut = 'echec'
+            logger.error(f"❌ Email {email.pk} abandonné après {email.tentatives} tentatives: {erreur}")
+        else:
+            email.statut = 'en_attente'
+            email.prochaine_tentative = timezone.now() + BoiteEnvoi.delai_tentative(email.tentatives)
+            logger.warning(f"Email {email.pk} reporté (tentative {email.tentatives}): {erreur}")
+        email.save(update_fields=['statut', 'tentatives', 'erreur', 'prochaine_tentative'])
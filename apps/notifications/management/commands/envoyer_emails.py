@@ -0,0 +1,43 @@
+# apps/notifications/management/commands/envoyer_emails.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.emails import BoiteEnvoi
+
+
+class Command(BaseCommand):
+    help = "Envoyeur de la boîte d'envoi (EmailSortant) : une connexion SMTP par lot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--une-fois', action='store_true',
+                            help="Envoyer les emails dus puis s'arrêter")
+        parser.add_argument('--lot', type=int, default=50,
+                            help='Nombre d\'emails par connexion SMTP')
+        parser.add_argument('--intervalle', type=float, default=10,
+                            help='Attente (secondes) quand la file est vide')
+
+    def handle(self, *args, **options):
+        total_envoyes, total_echecs = 0, 0
+
+        try:
+            while True:
+                envoyes, echecs = BoiteEnvoi.envoyer_lot(options['lot'])
+                total_envoyes += envoyes
+                total_echecs += echecs
+
+                if envoyes or echecs:
+                    self.stdout.write(f'📧 {envoyes} envoyés, {echecs} reportés')
+                    # Lot complet : d'autres emails attendent peut-être
+                    if envoyes + echecs >= options['lot']:
+                        continue
+
+                if options['une_fois']:
+                    break
+                time.sleep(options['intervalle'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {total_envoyes} emails envoyés, {total_echecs} reportés')
+        )
@@ -57,6 +57,9 @@ class Notification(models.Model):
             self.read = True
             self.read_at = timezone.now()
             self.save()
+            
+            from .services import CompteurNotifications
+            CompteurNotifications.ajuster([self.user_id], -1)
     
     def get_icon(self):
         icons = {
@@ -81,4 +84,45 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Recalcul du compteur non lues et liste récente par utilisateur
+            models.Index(fields=['user', 'read'], name='notification_user_read_idx'),
+            models.Index(fields=['user', '-created_at'], name='notification_user_date_idx'),
+        ]
 
+
+
+class EmailSortant(models.Model):
+    """Boîte d'envoi : emails enregistrés avec l'action métier, envoyés par `manage.py envoyer_emails`"""
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('envoye', 'Envoyé'),
+        ('echec', 'Échec'),
+    ]
+    
+    sujet = models.CharField(max_length=255)
+    message = models.TextField()
+    expediteur = models.CharField(max_length=255, blank=True)
+    destinataires = models.JSONField(default=list)
+    
+    # Un seul email par objet métier (ex. 'facture:12'), même si l'action est rejouée
+    cle = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    tentatives = models.PositiveSmallIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=timezone.now)
+    erreur = models.TextField(blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-date_creation']
+        verbose_name = 'Email sortant'
+        verbose_name_plural = 'Emails sortants'
+        indexes = [
+            models.Index(fields=['statut', 'prochaine_tentative'], name='email_sortant_file_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.sujet} ({self.get_statut_display()})"
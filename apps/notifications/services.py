@@ -1,38 +1,110 @@
-from datetime import timezone
+from django.core.cache import cache
+from django.db import transaction
 from django.urls import reverse
+from django.utils import timezone
+from apps.notifications.diffusion import publier
 from apps.notifications.models import Notification
 from apps.users.models import User
+from utils import cache as cache_partage
+
+PROFILS_GESTION = ['gestionnaire', 'super_admin']
+
+
+class CompteurNotifications:
+    """
+    Compteur de notifications non lues par utilisateur, tenu dans le cache.
+    Mis à jour (incr/decr atomiques) après commit ; recalculé sur absence.
+    Sans cache partagé, les autres processus ne verraient pas ces mises à
+    jour : le COUNT (indexé) est alors lu en base.
+    """
+    TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def _cle(user_id):
+        return cache_partage.cle('notifications', 'non_lues', user_id)
+
+    @staticmethod
+    def get(user_id):
+        if not cache_partage.est_partage():
+            return Notification.objects.filter(user_id=user_id, read=False).count()
+
+        count = cache.get(CompteurNotifications._cle(user_id))
+        cache_partage.compter('notifications', count is not None and count >= 0)
+        if count is None or count < 0:
+            count = Notification.objects.filter(user_id=user_id, read=False).count()
+            cache.set(CompteurNotifications._cle(user_id), count, CompteurNotifications.TIMEOUT)
+        return count
+
+    @staticmethod
+    def _ajuster(user_id, delta):
+        try:
+            if delta >= 0:
+                cache.incr(CompteurNotifications._cle(user_id), delta)
+            else:
+                cache.decr(CompteurNotifications._cle(user_id), -delta)
+        except ValueError:
+            # Compteur absent du cache : il sera recalculé à la prochaine lecture
+            pass
+
+    @staticmethod
+    def ajuster(user_ids, delta):
+        """Ajoute delta (négatif pour retirer) aux compteurs après commit"""
+        user_ids = list(user_ids)
+        if not user_ids or not delta:
+            return
+
+        def appliquer():
+            for user_id in user_ids:
+                CompteurNotifications._ajuster(user_id, delta)
+            publier(user_ids)
+
+        transaction.on_commit(appliquer)
 
 
 class NotificationService:
     """Service pour créer des notifications contextuelles"""
     
+    @staticmethod
+    def _gestionnaires(exclure=None):
+        gestionnaires = User.objects.filter(profil__in=PROFILS_GESTION)
+        if exclure is not None:
+            gestionnaires = gestionnaires.exclude(pk=exclure.pk)
+        return gestionnaires.values_list('pk', flat=True)
+    
+    @staticmethod
+    def _notifier(user_ids, **champs):
+        """Une notification par destinataire, en un seul INSERT"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+        
+        notifications = Notification.objects.bulk_create([
+            Notification(user_id=user_id, **champs) for user_id in user_ids
+        ])
+        CompteurNotifications.ajuster(user_ids, 1)
+        return notifications
+    
     @staticmethod
     def notify_reservation_created(reservation, actor):
         # Notifier les gestionnaires
-        from apps.users.models import User
-        gestionnaires = User.objects.filter(profil__in=['gestionnaire', 'super_admin'])
-        
-        for user in gestionnaires:
-            if user != actor:
-                Notification.objects.create(
-                    user=user,
-                    type='reservation',
-                    action='created',
-                    title='Nouvelle réservation',
-                    message=f'{actor.first_name or actor.username} a créé une réservation pour {reservation.client.nom}',
-                    actor=actor,
-                    url=reverse('reservations:detail', kwargs={'pk': reservation.pk}),
-                    url_text='Voir la réservation',
-                    object_type='reservation',
-                    object_id=reservation.pk,
-                    object_name=f'Réservation #{reservation.pk}'
-                )
+        NotificationService._notifier(
+            NotificationService._gestionnaires(exclure=actor),
+            type='reservation',
+            action='created',
+            title='Nouvelle réservation',
+            message=f'{actor.first_name or actor.username} a créé une réservation pour {reservation.client.nom}',
+            actor=actor,
+            url=reverse('reservations:detail', kwargs={'pk': reservation.pk}),
+            url_text='Voir la réservation',
+            object_type='reservation',
+            object_id=reservation.pk,
+            object_name=f'Réservation #{reservation.pk}'
+        )
     
     @staticmethod
     def notify_menage_assigned(tache, assigned_user, actor):
-        Notification.objects.create(
-            user=assigned_user,
+        NotificationService._notifier(
+            [assigned_user.pk],
             type='menage',
             action='assigned',
             title='Tâche ménage assignée',
@@ -48,62 +120,52 @@ class NotificationService:
     @staticmethod
     def notify_paiement_overdue(echeance):
         # Notifier tous les gestionnaires
-        from apps.users.models import User
-        gestionnaires = User.objects.filter(profil__in=['gestionnaire', 'super_admin'])
-        
-        for user in gestionnaires:
-            Notification.objects.create(
-                user=user,
-                type='paiement',
-                action='overdue',
-                title='Paiement en retard',
-                message=f'Le paiement de {echeance.reservation.client.nom} est en retard depuis {(timezone.now().date() - echeance.date_echeance).days} jours',
-                url=reverse('paiements:saisir', kwargs={'pk': echeance.pk}),
-                url_text='Saisir paiement',
-                object_type='paiement',
-                object_id=echeance.pk,
-                object_name=f'{echeance.get_type_paiement_display()} - {echeance.montant_prevu} FCFA'
-            )
+        NotificationService._notifier(
+            NotificationService._gestionnaires(),
+            type='paiement',
+            action='overdue',
+            title='Paiement en retard',
+            message=f'Le paiement de {echeance.reservation.client.nom} est en retard depuis {(timezone.now().date() - echeance.date_echeance).days} jours',
+            url=reverse('paiements:saisir', kwargs={'pk': echeance.pk}),
+            url_text='Saisir paiement',
+            object_type='paiement',
+            object_id=echeance.pk,
+            object_name=f'{echeance.get_type_paiement_display()} - {echeance.montant_prevu} FCFA'
+        )
 
     @staticmethod
     def notify_paiement_received(echeance, actor):
-        gestionnaires = User.objects.filter(profil__in=['gestionnaire', 'super_admin'])
-        for user in gestionnaires:
-            if user != actor:
-                Notification.objects.create(
-                    user=user,
-                    type='paiement',
-                    action='completed',
-                    title='Paiement reçu',
-                    message=f'{actor.first_name} a enregistré un paiement de {echeance.montant_paye} FCFA',
-                    actor=actor,
-                    url=reverse('paiements:echeancier'),
-                    object_type='paiement',
-                    object_id=echeance.pk
-                )
+        NotificationService._notifier(
+            NotificationService._gestionnaires(exclure=actor),
+            type='paiement',
+            action='completed',
+            title='Paiement reçu',
+            message=f'{actor.first_name} a enregistré un paiement de {echeance.montant_paye} FCFA',
+            actor=actor,
+            url=reverse('paiements:echeancier'),
+            object_type='paiement',
+            object_id=echeance.pk
+        )
 
     @staticmethod
     def paiements_overdue():
         # Notifier tous les gestionnaires
-        gestionnaires = User.objects.filter(profil__in=['gestionnaire', 'super_admin'])
-        
-        for user in gestionnaires:
-            Notification.objects.create(
-                user=user,
-                type='paiement',
-                action='overdue',
-                title='Paiement en retard',
-                message='Vous avez des paiements en retard',
-                url=reverse('paiements:echeancier'),
-                url_text='Voir les paiements',
-                object_type='paiement',
-                object_id=None
-            )
+        NotificationService._notifier(
+            NotificationService._gestionnaires(),
+            type='paiement',
+            action='overdue',
+            title='Paiement en retard',
+            message='Vous avez des paiements en retard',
+            url=reverse('paiements:echeancier'),
+            url_text='Voir les paiements',
+            object_type='paiement',
+            object_id=None
+        )
 
     @staticmethod    
     def notify_appartement_created(appartement, actor):
-        Notification.objects.create(
-            user=actor,
+        NotificationService._notifier(
+            [actor.pk],
             type='appartement',
             action='created',
             title='Nouvel appartement',
@@ -117,8 +179,8 @@ class NotificationService:
 
     @staticmethod    
     def notify_appartement_updated(appartement, actor):
-        Notification.objects.create(
-            user=actor,
+        NotificationService._notifier(
+            [actor.pk],
             type='appartement',
             action='updated',
             title='Appartement modifié',
@@ -132,8 +194,8 @@ class NotificationService:
 
     @staticmethod    
     def notify_photo_deleted(photo, actor):
-        Notification.objects.create(
-            user=actor,
+        NotificationService._notifier(
+            [actor.pk],
             type='appartement',
             action='deleted',
             title='Photo supprimée',
@@ -147,38 +209,31 @@ class NotificationService:
 
     @staticmethod
     def notify_appartement_maintenance(appartement, actor):
-        gestionnaires = User.objects.filter(profil__in=['gestionnaire', 'super_admin'])
-        for user in gestionnaires:
-            Notification.objects.create(
-                user=user,
-                type='maintenance',
-                action='updated',
-                title='Appartement en maintenance',
-                message=f'Appartement {appartement.numero} mis en maintenance',
-                actor=actor,
-                url=reverse('appartements:detail', kwargs={'pk': appartement.pk}),
-                object_type='appartement',
-                object_id=appartement.pk
-            )
+        NotificationService._notifier(
+            NotificationService._gestionnaires(),
+            type='maintenance',
+            action='updated',
+            title='Appartement en maintenance',
+            message=f'Appartement {appartement.numero} mis en maintenance',
+            actor=actor,
+            url=reverse('appartements:detail', kwargs={'pk': appartement.pk}),
+            object_type='appartement',
+            object_id=appartement.pk
+        )
     
     @staticmethod
     def notify_facture_created(facture, actor):
         """Notification création facture"""
-        from apps.users.models import User
-        gestionnaires = User.objects.filter(profil__in=['gestionnaire', 'super_admin'])
-        
-        for user in gestionnaires:
-            if user != actor:
-                Notification.objects.create(
-                    user=user,
-                    type='facturation',
-                    action='created',
-                    title='Nouvelle facture générée',
-                    message=f'{actor.first_name or actor.username} a généré la facture {facture.numero_facture} pour {facture.reservation.client.nom}',
-                    actor=actor,
-                    url=reverse('facturation:apercu', kwargs={'pk': facture.pk}),
-                    url_text='Voir la facture',
-                    object_type='facture',
-                    object_id=facture.pk,
-                    object_name=f'Facture {facture.numero_facture}'
-                )
\ No newline at end of file
+        NotificationService._notifier(
+            NotificationService._gestionnaires(exclure=actor),
+            type='facturation',
+            action='created',
+            title='Nouvelle facture générée',
+            message=f'{actor.first_name or actor.username} a généré la facture {facture.numero_facture} pour {facture.reservation.client.nom}',
+            actor=actor,
+            url=reverse('facturation:apercu', kwargs={'pk': facture.pk}),
+            url_text='Voir la facture',
+            object_type='facture',
+            object_id=facture.pk,
+            object_name=f'Facture {facture.numero_facture}'
+        )
\ No newline at end of file
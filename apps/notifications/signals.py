@@ -0,0 +1,15 @@
+# ==========================================
+# apps/notifications/signals.py - Compteur des notifications non lues
+# ==========================================
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Notification
+from .services import CompteurNotifications
+
+
+@receiver(post_delete, sender=Notification)
+def retirer_du_compteur(sender, instance, **kwargs):
+    """Une notification non lue supprimée (une par une ou en masse) sort du compteur"""
+    if not instance.read:
+        CompteurNotifications.ajuster([instance.user_id], -1)
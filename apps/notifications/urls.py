@@ -9,6 +9,7 @@ urlpatterns = [
     path('count/', views.api_notification_count, name='api_count'),
     path('<int:pk>/read/', views.api_mark_as_read, name='api_read'),
     path('mark-all-read/', views.api_mark_all_read, name='api_mark_all'),
+    path('flux/', views.flux_notifications, name='flux'),
     
     # Pages (pour /notifications/)
     path('all/', views.all_notifications, name='all'),
@@ -1,13 +1,41 @@
 # ==========================================
 # apps/notifications/views.py
 # ==========================================
-from django.http import JsonResponse
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.utils.timesince import timesince
 from .models import Notification
+from .diffusion import abonner
+from .services import CompteurNotifications
+from utils.pagination import paginer, demande_json, reponse_json
+
+# Flux SSE : battement régulier pour garder la connexion ouverte derrière les proxys
+FLUX_BATTEMENT = 25
+# Délai de reconnexion demandé au navigateur (ms) quand le flux ne peut pas rester ouvert
+FLUX_RECONNEXION_WSGI = 30000
+
+
+def _serialiser(notif):
+    return {
+        'id': notif.id,
+        'title': notif.title,
+        'message': notif.message,
+        'url': notif.url,
+        'url_text': notif.url_text,
+        'read': notif.read,
+        'icon': notif.get_icon(),
+        'color': notif.get_color(),
+        'time_ago': timesince(notif.created_at),
+        'actor': notif.actor.first_name if notif.actor else None,
+    }
+
 
 @login_required
 @require_http_methods(["GET"])
@@ -15,27 +43,11 @@ def api_notifications(request):
     """API: Liste des notifications utilisateur"""
     notifications = Notification.objects.filter(
         user=request.user
-    ).order_by('-created_at')[:10]
+    ).select_related('actor').order_by('-created_at')[:10]
     
-    data = []
-    for notif in notifications:
-        data.append({
-            'id': notif.id,
-            'title': notif.title,
-            'message': notif.message,
-            'url': notif.url,
-            'url_text': notif.url_text,
-            'read': notif.read,
-            'icon': notif.get_icon(),
-            'color': notif.get_color(),
-            'time_ago': timesince(notif.created_at),
-            'actor': notif.actor.first_name if notif.actor else None,
-        })
+    data = [_serialiser(notif) for notif in notifications]
     
-    unread_count = Notification.objects.filter(
-        user=request.user, 
-        read=False
-    ).count()
+    unread_count = CompteurNotifications.get(request.user.pk)
     
     return JsonResponse({
         'notifications': data,
@@ -46,12 +58,7 @@ def api_notifications(request):
 @require_http_methods(["GET"])
 def api_notification_count(request):
     """API: Compteur notifications non lues"""
-    count = Notification.objects.filter(
-        user=request.user,
-        read=False
-    ).count()
-    
-    return JsonResponse({'count': count})
+    return JsonResponse({'count': CompteurNotifications.get(request.user.pk)})
 
 @login_required
 @require_http_methods(["POST"])
@@ -70,10 +77,11 @@ def api_mark_as_read(request, pk):
 @require_http_methods(["POST"]) 
 def api_mark_all_read(request):
     """API: Marquer toutes comme lues"""
-    Notification.objects.filter(
+    marquees = Notification.objects.filter(
         user=request.user,
         read=False
     ).update(read=True, read_at=timezone.now())
+    CompteurNotifications.ajuster([request.user.pk], -marquees)
     
     return JsonResponse({'success': True})
 
@@ -82,12 +90,102 @@ def all_notifications(request):
     """Page complète des notifications"""
     notifications = Notification.objects.filter(
         user=request.user
-    ).order_by('-created_at')
+    ).select_related('actor')
+    ordre = ('-created_at', '-pk')
+    if demande_json(request):
+        # Variante API : lecture seule, rien n'est marqué comme vu
+        return reponse_json(paginer(request, notifications, ordre), _serialiser)
     
     # Marquer comme vues
-    notifications.filter(read=False).update(read=True, read_at=timezone.now())
+    marquees = notifications.filter(read=False).update(read=True, read_at=timezone.now())
+    CompteurNotifications.ajuster([request.user.pk], -marquees)
+    notifications = paginer(request, notifications, ordre)
     
     context = {
-        'notifications': notifications
+        'notifications': notifications,
+        'non_lues': marquees,
+    }
+    return render(request, 'notifications/all.html', context)
+
+
+def _etat_notifications(user_id, dernier_id):
+    """Nouvelles notifications (id > dernier_id) et compteur non lues"""
+    notifications = Notification.objects.filter(user_id=user_id).select_related('actor')
+    if dernier_id:
+        notifications = notifications.filter(id__gt=dernier_id).order_by('-id')[:10]
+    else:
+        notifications = notifications.order_by('-id')[:10]
+
+    data = [_serialiser(notif) for notif in notifications]
+    if data:
+        dernier_id = max(dernier_id, data[0]['id'])
+
+    return dernier_id, {
+        'notifications': data,
+        'unread_count': CompteurNotifications.get(user_id),
     }
-    return render(request, 'notifications/all.html', context)
\ No newline at end of file
+
+
+def _message_sse(dernier_id, donnees, retry=None):
+    lignes = []
+    if retry:
+        lignes.append(f'retry: {retry}')
+    lignes.append(f'id: {dernier_id}')
+    lignes.append('event: notifications')
+    lignes.append(f'data: {json.dumps(donnees)}')
+    return '\n'.join(lignes) + '\n\n'
+
+
+def _dernier_id(request):
+    # Last-Event-ID est renvoyé automatiquement par EventSource à la reconnexion
+    valeur = request.headers.get('Last-Event-ID') or request.GET.get('depuis') or 0
+    try:
+        return max(int(valeur), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+async def flux_notifications(request):
+    """
+    Flux Server-Sent Events des notifications (remplace le polling de api_notifications).
+    Sous ASGI la connexion reste ouverte et n'est réveillée que par une publication ;
+    sous WSGI on envoie l'état courant et le navigateur se reconnecte après FLUX_RECONNEXION_WSGI.
+    """
+    if request.method != 'GET':
+        return HttpResponse(status=405)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentification requise'}, status=401)
+
+    user_id = user.pk
+    dernier_id = _dernier_id(request)
+    etat = sync_to_async(_etat_notifications)
+
+    if not isinstance(request, ASGIRequest):
+        dernier_id, donnees = await etat(user_id, dernier_id)
+        response = HttpResponse(
+            _message_sse(dernier_id, donnees, retry=FLUX_RECONNEXION_WSGI),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    async def flux():
+        position = dernier_id
+        async with abonner(user_id) as abonnement:
+            position, donnees = await etat(user_id, position)
+            yield _message_sse(position, donnees)
+
+            while True:
+                # Déconnexion du navigateur : la tâche est annulée, l'abonnement fermé
+                if await abonnement.attendre(FLUX_BATTEMENT):
+                    position, donnees = await etat(user_id, position)
+                    yield _message_sse(position, donnees)
+                else:
+                    yield ': ping\n\n'
+
+    response = StreamingHttpResponse(flux(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
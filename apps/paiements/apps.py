@@ -6,4 +6,4 @@ class PaiementsConfig(AppConfig):
     name = 'apps.paiements'
     
     def ready(self):
-        import apps.facturation.signals  # ✅ Pour écouter EcheancierPaiement
\ No newline at end of file
+        import apps.paiements.signals  # Revenu, facture et notification d'un paiement encaissé
\ No newline at end of file
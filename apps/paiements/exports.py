@@ -0,0 +1,17 @@
+# ==========================================
+# apps/paiements/exports.py - Colonnes d'export de l'échéancier
+# ==========================================
+from utils.exports import Colonne, SpecExport
+
+EXPORT_ECHEANCIER = SpecExport('echeancier', [
+    Colonne('Réservation', 'reservation_id'),
+    Colonne('Client', lambda p: f"{p.reservation.client.prenom} {p.reservation.client.nom}"),
+    Colonne('Appartement', 'reservation.appartement.numero'),
+    Colonne('Type', 'get_type_paiement_display'),
+    Colonne('Montant prévu (FCFA)', 'montant_prevu'),
+    Colonne('Échéance', 'date_echeance'),
+    Colonne('Montant payé (FCFA)', 'montant_paye'),
+    Colonne('Mode', 'get_mode_paiement_display'),
+    Colonne('Date paiement', 'date_paiement'),
+    Colonne('Statut', 'get_statut_display'),
+], select_related=('reservation__client', 'reservation__appartement'))
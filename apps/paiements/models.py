@@ -50,6 +50,22 @@ class EcheancierPaiement(models.Model):
     def __str__(self):
         return f"{self.reservation} - {self.get_type_paiement_display()} : {self.montant_prevu} FCFA"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise le paiement tel que chargé pour corriger la série journalière"""
+        instance = super().from_db(db, field_names, values)
+        instance._serie_initiale = instance._contribution_serie()
+        return instance
+    
+    def _contribution_serie(self):
+        """(reservation_id, jour, mode, montant) d'un paiement encaissé, sinon None"""
+        if self.__dict__.get('statut') != 'paye' or not self.__dict__.get('date_paiement'):
+            return None
+        return (
+            self.__dict__.get('reservation_id'), self.__dict__.get('date_paiement'),
+            self.__dict__.get('mode_paiement') or '', self.__dict__.get('montant_paye') or 0,
+        )
+    
     @property
     def solde_restant(self):
         """Solde restant pour cette échéance spécifique"""
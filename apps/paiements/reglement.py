@@ -0,0 +1,164 @@
+# ==========================================
+# apps/paiements/reglement.py - Traitement d'un paiement encaissé
+# ==========================================
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ReglementService:
+    """
+    Étapes déclenchées par un paiement encaissé, dans cet ordre et dans une
+    seule transaction : revenu comptable, facture, rendu PDF planifié.
+    Chaque étape est idempotente (clé = le paiement lui-même, pas un libellé).
+    L'email aux gestionnaires est mis en boîte d'envoi, jamais envoyé ici.
+    """
+
+    @staticmethod
+    def traiter(echeance):
+        if echeance.statut != 'paye':
+            return None
+
+        reservation = echeance.reservation
+        if not reservation or not reservation.appartement_id:
+            logger.warning(f"Paiement {echeance.pk} sans réservation/appartement")
+            return None
+
+        try:
+            with transaction.atomic():
+                ReglementService.enregistrer_revenu(echeance)
+                facture = ReglementService.emettre_facture(echeance)
+                if facture is not None:
+                    ReglementService.notifier(facture)
+        except Exception as e:
+            # Le paiement reste enregistré ; revenu, facture et email sont annulés ensemble
+            logger.error(f"❌ Erreur traitement du paiement {echeance.pk}: {e}")
+            return None
+
+        return facture
+
+    @staticmethod
+    def enregistrer_revenu(echeance):
+        """REVENUS : un mouvement par paiement (contrainte unique sur echeance_paiement)"""
+        from apps.comptabilite.models import ComptabiliteAppartement
+
+        reservation = echeance.reservation
+        mouvement, created = ComptabiliteAppartement.objects.get_or_create(
+            echeance_paiement=echeance,
+            defaults={
+                'appartement': reservation.appartement,
+                'reservation': reservation,
+                'type_mouvement': 'revenu',
+                'libelle': f'{echeance.get_type_paiement_display()} - {reservation.client.prenom} '
+                           f'{reservation.client.nom} - Paiement #{echeance.pk}',
+                'montant': echeance.montant_paye,
+                'date_mouvement': echeance.date_paiement,
+            }
+        )
+        if created:
+            logger.info(f"Revenu créé: {reservation.appartement.numero} - {echeance.montant_paye} FCFA")
+        elif ReglementService._revenu_a_corriger(mouvement, echeance):
+            # Paiement corrigé après encaissement : le revenu suit (synthèses mises à jour par save)
+            mouvement.appartement = reservation.appartement
+            mouvement.reservation = reservation
+            mouvement.montant = echeance.montant_paye
+            mouvement.date_mouvement = echeance.date_paiement
+            mouvement.save(update_fields=['appartement', 'reservation', 'montant', 'date_mouvement'])
+            logger.info(f"Revenu corrigé: {reservation.appartement.numero} - {echeance.montant_paye} FCFA")
+        return mouvement
+
+    @staticmethod
+    def _revenu_a_corriger(mouvement, echeance):
+        return (mouvement.montant, mouvement.date_mouvement, mouvement.appartement_id) != (
+            echeance.montant_paye, echeance.date_paiement, echeance.reservation.appartement_id
+        )
+
+    @staticmethod
+    def reconcilier_revenus(corriger=True):
+        """
+        Revenus automatiques qui ne correspondent plus à leur paiement encaissé
+        (montant, date, appartement) ; renvoie les pk des paiements en écart.
+        """
+        from apps.comptabilite.models import ComptabiliteAppartement
+
+        mouvements = ComptabiliteAppartement.objects.filter(
+            echeance_paiement__statut='paye'
+        ).select_related('echeance_paiement__reservation__appartement', 'echeance_paiement__reservation__client')
+
+        ecarts = []
+        for mouvement in mouvements:
+            echeance = mouvement.echeance_paiement
+            if ReglementService._revenu_a_corriger(mouvement, echeance):
+                ecarts.append(echeance.pk)
+                if corriger:
+                    with transaction.atomic():
+                        ReglementService.enregistrer_revenu(echeance)
+        return ecarts
+
+    @staticmethod
+    def reprendre_incomplets(corriger=True):
+        """
+        Paiements encaissés sans revenu ou sans facture (traitement annulé par
+        une erreur) ; relance `traiter` sur chacun et renvoie leurs pk.
+        """
+        from django.db.models import Q
+
+        from .models import EcheancierPaiement
+
+        echeances = EcheancierPaiement.objects.filter(
+            Q(mouvement_comptable__isnull=True) | Q(facture__isnull=True),
+            statut='paye',
+            reservation__appartement__isnull=False,
+        ).select_related('reservation__appartement', 'reservation__client')
+
+        incomplets = []
+        for echeance in echeances:
+            incomplets.append(echeance.pk)
+            if corriger:
+                ReglementService.traiter(echeance)
+        return incomplets
+
+    @staticmethod
+    def emettre_facture(echeance):
+        """Facture du paiement, enregistrée en un seul INSERT ; None si elle existe déjà"""
+        from apps.facturation.models import Facture, ParametresFacturation
+        from apps.facturation.pdf import FacturePDFService
+
+        if Facture.objects.filter(echeance_paiement=echeance).exists():
+            return None
+
+        parametres = ParametresFacturation.get_parametres()
+        maintenant = timezone.localtime()
+
+        facture = Facture(
+            echeance_paiement=echeance,
+            reservation=echeance.reservation,
+            client=echeance.reservation.client,
+            type_facture=echeance.type_paiement,
+            montant_paiement=echeance.montant_paye,
+            date_echeance=maintenant.date() + timedelta(days=parametres.delai_paiement_jours),
+            notes=f"Facture générée automatiquement pour {echeance.get_type_paiement_display().lower()} "
+                  f"le {maintenant.strftime('%d/%m/%Y à %H:%M')}",
+            statut='payee',  # Directement payée puisque paiement effectué
+            cree_par=None  # Création automatique
+        )
+        # Soldes avant/après calculés avant l'INSERT (plus de second save)
+        facture.calculer_contexte_paiement()
+        facture.save()
+
+        # PDF rendu en arrière-plan, prêt avant le premier téléchargement
+        FacturePDFService.planifier(facture)
+
+        logger.info(f"✅ Facture {facture.numero} créée pour {echeance.get_type_paiement_display()} de {echeance.montant_paye} FCFA")
+        return facture
+
+    @staticmethod
+    def notifier(facture):
+        """Email aux gestionnaires mis en boîte d'envoi (aucun appel SMTP ici)"""
+        from apps.facturation.signals import notifier_facture_generee
+
+        notifier_facture_generee(facture)
@@ -0,0 +1,15 @@
+# ==========================================
+# apps/paiements/signals.py - Paiement encaissé
+# ==========================================
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import EcheancierPaiement
+from .reglement import ReglementService
+
+
+@receiver(post_save, sender=EcheancierPaiement)
+def regler_paiement(sender, instance, created, **kwargs):
+    """Point d'entrée unique : revenu comptable + facture + notification (voir ReglementService)"""
+    if instance.statut == 'paye':
+        ReglementService.traiter(instance)
@@ -10,6 +10,7 @@ urlpatterns = [
     # Échéancier selon cahier (paiements par tranches SIMPLIFIÉ)
     path('', views.echeancier_paiements, name='echeancier'),
     path('retards/', views.paiements_en_retard, name='retards'),
+    path('export/', views.export_echeancier, name='export'),
     
     # Saisie paiements selon cahier
     path('<int:pk>/saisir/', views.saisir_paiement, name='saisir'),
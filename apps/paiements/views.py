@@ -13,7 +13,10 @@ from apps.reservations.models import Reservation
 from apps.users.views import is_gestionnaire
 from .models import EcheancierPaiement
 from .forms import PaiementForm, EcheancierForm
+from .exports import EXPORT_ECHEANCIER
+from utils.exports import get_format_export, reponse_export
 from apps.notifications.services import NotificationService
+from utils.pagination import paginer, demande_json, reponse_json
 
 @login_required
 @user_passes_test(is_gestionnaire)
@@ -30,18 +33,17 @@ def echeancier_paiements(request):
     # Statistiques pour l'affichage
     today = timezone.now().date()
     
-    if statut_filtre == 'en_attente':
-        paiements = paiements.filter(statut='en_attente')
-    elif statut_filtre == 'retard':
-        paiements = paiements.filter(
-            statut='en_attente',
-            date_echeance__lt=today
-        )
-        # Notification pour les gestionnaires
-        if paiements.exists():
-            NotificationService.notify_paiement_overdue(paiements.first())
-    elif statut_filtre == 'paye':
-        paiements = paiements.filter(statut='paye')
+    paiements = _filtrer_paiements(paiements, statut_filtre, today)
+    
+    # Notification pour les gestionnaires
+    if statut_filtre == 'retard':
+        premier_retard = paiements.first()
+        if premier_retard:
+            NotificationService.notify_paiement_overdue(premier_retard)
+    
+    paiements = paginer(request, paiements, ('date_echeance', 'pk'))
+    if demande_json(request):
+        return reponse_json(paiements, _serialiser_paiement)
     
     # Stats pour le dashboard
     stats = {
@@ -61,6 +63,44 @@ def echeancier_paiements(request):
     }
     return render(request, 'paiements/echeancier.html', context)
 
+def _serialiser_paiement(paiement):
+    reservation = paiement.reservation
+    return {
+        'id': paiement.pk,
+        'reservation': reservation.pk,
+        'client': f'{reservation.client.prenom} {reservation.client.nom}',
+        'appartement': reservation.appartement.numero,
+        'type_paiement': paiement.type_paiement,
+        'date_echeance': paiement.date_echeance.isoformat(),
+        'montant_prevu': str(paiement.montant_prevu),
+        'montant_paye': str(paiement.montant_paye),
+        'statut': paiement.statut,
+    }
+
+def _filtrer_paiements(paiements, statut_filtre, today):
+    """Filtres communs à l'échéancier et à son export"""
+    if statut_filtre == 'en_attente':
+        paiements = paiements.filter(statut='en_attente')
+    elif statut_filtre == 'retard':
+        paiements = paiements.filter(
+            statut='en_attente',
+            date_echeance__lt=today
+        )
+    elif statut_filtre == 'paye':
+        paiements = paiements.filter(statut='paye')
+    return paiements
+
+@login_required
+@user_passes_test(is_gestionnaire)
+def export_echeancier(request):
+    """Export CSV / XLSX de l'échéancier (mêmes filtres que le tableau)"""
+    paiements = _filtrer_paiements(
+        EcheancierPaiement.objects.order_by('date_echeance'),
+        request.GET.get('statut', 'tous'),
+        timezone.now().date()
+    )
+    return reponse_export(EXPORT_ECHEANCIER, paiements, get_format_export(request))
+
 @login_required
 @user_passes_test(is_gestionnaire)
 def saisir_paiement(request, pk):
@@ -7,3 +7,4 @@ class ReservationsConfig(AppConfig):
 
     def ready(self):
         import apps.facturation.signals  # ✅ Pour écouter EcheancierPaiement
+        import apps.reservations.signals
@@ -0,0 +1,217 @@
+# ==========================================
+# apps/reservations/calendrier.py - Construction de la grille du calendrier
+# ==========================================
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+from utils import cache as cache_partage
+
+# Limite raisonnable pour la vue multi-mois
+NB_MOIS_MAX = 3
+
+# Cache des grilles : une étiquette par mois + une étiquette globale
+# (appartements / clients), la clé de la grille embarque toutes leurs versions.
+# Actif seulement avec un cache partagé : sinon un autre worker servirait une
+# grille périmée (fausses disponibilités) jusqu'à expiration.
+CACHE_DOMAINE = 'calendrier'
+ETIQUETTE_GLOBALE = 'calendrier:global'
+CACHE_TIMEOUT_GRILLE = 60 * 60 * 24
+
+
+class CalendrierService:
+    """
+    Grille appartements × jours construite en une passe :
+    une requête pour les appartements, une pour les séjours de la période,
+    puis chaque séjour remplit directement les cellules des nuits qu'il couvre.
+    La grille ne contient que des types simples (sérialisable en JSON / cache).
+    """
+
+    @staticmethod
+    def periode_mois(annee: int, mois: int, nb_mois: int = 1) -> Tuple[date, date]:
+        """Période [premier jour du mois, premier jour après le dernier mois["""
+        nb_mois = max(1, min(nb_mois, NB_MOIS_MAX))
+        date_debut = date(annee, mois, 1)
+
+        annee_fin, mois_fin = annee, mois + nb_mois - 1
+        annee_fin += (mois_fin - 1) // 12
+        mois_fin = (mois_fin - 1) % 12 + 1
+        date_fin = date(annee_fin, mois_fin, monthrange(annee_fin, mois_fin)[1]) + timedelta(days=1)
+
+        return date_debut, date_fin
+
+    @staticmethod
+    def periode_semaine(jour: date) -> Tuple[date, date]:
+        """Période [lundi, lundi suivant[ de la semaine contenant le jour"""
+        lundi = jour - timedelta(days=jour.weekday())
+        return lundi, lundi + timedelta(days=7)
+
+    @staticmethod
+    def construire_grille(date_debut: date, date_fin: date) -> Dict[str, Any]:
+        """Grille compacte de la période [date_debut, date_fin["""
+        from apps.appartements.models import Appartement
+        from .models import Reservation
+
+        nb_jours = (date_fin - date_debut).days
+
+        appartements = list(
+            Appartement.objects.order_by('numero').values(
+                'id', 'numero', 'type_logement', 'prix_par_nuit'
+            )
+        )
+        types_logement = dict(Appartement.TYPE_CHOICES)
+        position = {appartement['id']: index for index, appartement in enumerate(appartements)}
+
+        cellules: List[List[List[int]]] = [[[] for _ in range(nb_jours)] for _ in appartements]
+        reservations: Dict[str, Dict[str, Any]] = {}
+        statuts = dict(Reservation.STATUT_CHOICES)
+
+        sejours = Reservation.objects.filter(
+            date_arrivee__lt=date_fin,
+            date_depart__gt=date_debut
+        ).order_by('date_arrivee').values_list(
+            'id', 'appartement_id', 'date_arrivee', 'date_depart', 'nombre_nuits',
+            'statut', 'client__prenom', 'client__nom'
+        )
+
+        for (pk, appartement_id, arrivee, depart, nombre_nuits,
+             statut, client_prenom, client_nom) in sejours:
+            ligne = position.get(appartement_id)
+            if ligne is None:
+                continue
+
+            reservations[str(pk)] = {
+                'id': pk,
+                'appartement_id': appartement_id,
+                'client_prenom': client_prenom,
+                'client_nom': client_nom,
+                'statut': statut,
+                'statut_display': statuts.get(statut, statut),
+                'date_arrivee': arrivee.isoformat(),
+                'date_depart': depart.isoformat(),
+                'nombre_nuits': nombre_nuits,
+            }
+
+            # Parcours des seules nuits du séjour comprises dans la période
+            premiere_nuit = (max(arrivee, date_debut) - date_debut).days
+            derniere_nuit = (min(depart, date_fin) - date_debut).days
+            for jour in range(premiere_nuit, derniere_nuit):
+                cellules[ligne][jour].append(pk)
+
+        return {
+            'debut': date_debut.isoformat(),
+            'fin': date_fin.isoformat(),
+            'jours': [(date_debut + timedelta(days=i)).isoformat() for i in range(nb_jours)],
+            'appartements': [
+                {
+                    'id': appartement['id'],
+                    'numero': appartement['numero'],
+                    'type_logement': appartement['type_logement'],
+                    'type_logement_display': types_logement.get(
+                        appartement['type_logement'], appartement['type_logement']
+                    ),
+                    'prix_par_nuit': str(appartement['prix_par_nuit']),
+                }
+                for appartement in appartements
+            ],
+            'reservations': reservations,
+            'cellules': cellules,
+        }
+
+    @staticmethod
+    def mois_couverts(date_debut: date, date_fin: date) -> List[Tuple[int, int]]:
+        """Mois (annee, mois) touchés par la période [date_debut, date_fin["""
+        if date_fin <= date_debut:
+            return []
+
+        dernier_jour = date_fin - timedelta(days=1)
+        annee, mois = date_debut.year, date_debut.month
+        mois_liste = []
+        while (annee, mois) <= (dernier_jour.year, dernier_jour.month):
+            mois_liste.append((annee, mois))
+            annee, mois = (annee + 1, 1) if mois == 12 else (annee, mois + 1)
+        return mois_liste
+
+    @staticmethod
+    def _etiquette_mois(annee: int, mois: int) -> str:
+        return f'{CACHE_DOMAINE}:{annee}-{mois:02d}'
+
+    @staticmethod
+    def get_grille(date_debut: date, date_fin: date) -> Dict[str, Any]:
+        """Grille de la période, servie depuis le cache tant qu'aucun mois couvert n'a changé"""
+        if not cache_partage.est_partage():
+            return CalendrierService.construire_grille(date_debut, date_fin)
+
+        etiquettes = [ETIQUETTE_GLOBALE] + [
+            CalendrierService._etiquette_mois(annee, mois)
+            for annee, mois in CalendrierService.mois_couverts(date_debut, date_fin)
+        ]
+        return cache_partage.obtenir(
+            CACHE_DOMAINE, ('grille', date_debut.isoformat(), date_fin.isoformat()),
+            lambda: CalendrierService.construire_grille(date_debut, date_fin),
+            CACHE_TIMEOUT_GRILLE, etiquettes=etiquettes,
+        )
+
+    @staticmethod
+    def invalider_periode(date_debut: date, date_fin: date):
+        """Invalide uniquement les mois touchés par un séjour"""
+        cache_partage.invalider(*(
+            CalendrierService._etiquette_mois(annee, mois)
+            for annee, mois in CalendrierService.mois_couverts(date_debut, date_fin)
+        ))
+
+    @staticmethod
+    def invalider_tout():
+        """Invalide toutes les grilles (appartement ou client modifié)"""
+        cache_partage.invalider(ETIQUETTE_GLOBALE)
+
+    @staticmethod
+    def lignes_template(grille: Dict[str, Any]) -> Tuple[List[date], List[Dict[str, Any]]]:
+        """
+        Adapte la grille compacte au format attendu par reservations/calendrier.html
+        (appartement / jours / reservations) sans requête supplémentaire.
+        """
+        jours = [date.fromisoformat(jour) for jour in grille['jours']]
+
+        appartements = {
+            appartement['id']: {
+                'pk': appartement['id'],
+                'numero': appartement['numero'],
+                'type_logement': appartement['type_logement'],
+                'get_type_logement_display': appartement['type_logement_display'],
+                'prix_par_nuit': Decimal(appartement['prix_par_nuit']),
+            }
+            for appartement in grille['appartements']
+        }
+
+        reservations = {}
+        for reservation in grille['reservations'].values():
+            reservations[reservation['id']] = {
+                'pk': reservation['id'],
+                'statut': reservation['statut'],
+                'get_statut_display': reservation['statut_display'],
+                'client': {
+                    'prenom': reservation['client_prenom'],
+                    'nom': reservation['client_nom'],
+                },
+                'appartement': appartements.get(reservation['appartement_id']),
+                'date_arrivee': date.fromisoformat(reservation['date_arrivee']),
+                'date_depart': date.fromisoformat(reservation['date_depart']),
+                'nombre_nuits': reservation['nombre_nuits'],
+            }
+
+        lignes = []
+        for appartement, cellules in zip(grille['appartements'], grille['cellules']):
+            lignes.append({
+                'appartement': appartements[appartement['id']],
+                'jours': [
+                    {
+                        'date': jour,
+                        'reservations': [reservations[pk] for pk in cellule],
+                    }
+                    for jour, cellule in zip(jours, cellules)
+                ],
+            })
+
+        return jours, lignes
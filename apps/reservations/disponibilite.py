@@ -0,0 +1,65 @@
+# ==========================================
+# apps/reservations/disponibilite.py - Moteur de disponibilité des appartements
+# ==========================================
+from datetime import date
+from typing import Optional
+
+from django.db.models import Exists, OuterRef
+
+# Statuts qui bloquent un appartement (une réservation terminée ou annulée libère les dates)
+STATUTS_BLOQUANTS = ('confirmee', 'en_cours')
+
+
+class DisponibiliteService:
+    """
+    Point d'entrée unique pour les questions de disponibilité.
+    Chaque méthode se traduit par UNE requête sur l'index (appartement, date_arrivee, date_depart).
+    """
+
+    @staticmethod
+    def reservations_bloquantes(date_debut: date, date_fin: date,
+                                exclude_reservation_id: Optional[int] = None):
+        """Réservations actives qui chevauchent la période [date_debut, date_fin["""
+        from .models import Reservation
+
+        conflits = Reservation.objects.filter(
+            statut__in=STATUTS_BLOQUANTS,
+            date_arrivee__lt=date_fin,
+            date_depart__gt=date_debut,
+        )
+        if exclude_reservation_id:
+            conflits = conflits.exclude(pk=exclude_reservation_id)
+        return conflits
+
+    @staticmethod
+    def get_conflit(appartement, date_debut: date, date_fin: date,
+                    exclude_reservation_id: Optional[int] = None):
+        """Première réservation en conflit pour cet appartement, ou None"""
+        appartement_id = getattr(appartement, 'pk', appartement)
+        return DisponibiliteService.reservations_bloquantes(
+            date_debut, date_fin, exclude_reservation_id
+        ).filter(appartement_id=appartement_id).order_by('date_arrivee').first()
+
+    @staticmethod
+    def est_disponible(appartement, date_debut: date, date_fin: date,
+                       exclude_reservation_id: Optional[int] = None) -> bool:
+        """L'appartement est-il libre du date_debut au date_fin (départ exclu) ?"""
+        appartement_id = getattr(appartement, 'pk', appartement)
+        return not DisponibiliteService.reservations_bloquantes(
+            date_debut, date_fin, exclude_reservation_id
+        ).filter(appartement_id=appartement_id).exists()
+
+    @staticmethod
+    def appartements_disponibles(date_debut: date, date_fin: date, appartements=None,
+                                 exclude_reservation_id: Optional[int] = None):
+        """Appartements libres sur la période - une seule requête (anti-jointure EXISTS)"""
+        from apps.appartements.models import Appartement
+
+        if appartements is None:
+            appartements = Appartement.objects.all()
+
+        conflits = DisponibiliteService.reservations_bloquantes(
+            date_debut, date_fin, exclude_reservation_id
+        ).filter(appartement=OuterRef('pk'))
+
+        return appartements.annotate(_occupe=Exists(conflits)).filter(_occupe=False)
@@ -0,0 +1,18 @@
+# ==========================================
+# apps/reservations/exports.py - Colonnes d'export des réservations
+# ==========================================
+from utils.exports import Colonne, SpecExport
+
+EXPORT_RESERVATIONS = SpecExport('reservations', [
+    Colonne('N°', 'pk'),
+    Colonne('Client', lambda r: f"{r.client.prenom} {r.client.nom}"),
+    Colonne('Téléphone', lambda r: str(r.client.telephone or '')),
+    Colonne('Appartement', 'appartement.numero'),
+    Colonne('Arrivée', 'date_arrivee'),
+    Colonne('Départ', 'date_depart'),
+    Colonne('Nuits', 'nombre_nuits'),
+    Colonne('Réduction (FCFA)', 'reduction'),
+    Colonne('Prix total (FCFA)', 'prix_total'),
+    Colonne('Statut', 'get_statut_display'),
+    Colonne('Créée le', 'date_creation'),
+], select_related=('client', 'appartement'))
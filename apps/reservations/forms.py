@@ -4,6 +4,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import Reservation
+from .disponibilite import DisponibiliteService
 from apps.clients.models import Client
 from apps.appartements.models import Appartement
 
@@ -63,17 +64,14 @@ class ReservationForm(forms.ModelForm):
         
         if date_arrivee and date_depart and appartement:
             # Vérifier conflits selon cahier
-            conflits = Reservation.objects.filter(
-                appartement=appartement,
-                statut__in=['confirmee', 'en_cours']
-            ).exclude(pk=self.instance.pk if self.instance.pk else None)
-            
-            for conflit in conflits:
-                if (date_arrivee < conflit.date_depart and 
-                    date_depart > conflit.date_arrivee):
-                    raise ValidationError(
-                        f'Conflit de dates avec une réservation existante '
-                        f'({conflit.date_arrivee} au {conflit.date_depart})'
-                    )
+            conflit = DisponibiliteService.get_conflit(
+                appartement, date_arrivee, date_depart,
+                exclude_reservation_id=self.instance.pk
+            )
+            if conflit:
+                raise ValidationError(
+                    f'Conflit de dates avec une réservation existante '
+                    f'({conflit.date_arrivee} au {conflit.date_depart})'
+                )
         
         return cleaned_data
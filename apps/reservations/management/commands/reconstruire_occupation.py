@@ -0,0 +1,14 @@
+# apps/reservations/management/commands/reconstruire_occupation.py
+from django.core.management.base import BaseCommand
+
+from apps.reservations.occupation import OccupationService
+
+
+class Command(BaseCommand):
+    help = "Reconstruire la table d'occupation journalière depuis les réservations"
+
+    def handle(self, *args, **options):
+        total = OccupationService.reconstruire()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Occupation reconstruite : {total} nuits occupées')
+        )
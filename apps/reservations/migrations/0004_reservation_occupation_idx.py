@@ -0,0 +1,70 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:04
+
+from django.conf import settings
+from django.db import migrations, models
+import logging
+
+logger = logging.getLogger(__name__)
+
+NOM_CONTRAINTE = 'reservation_sans_chevauchement'
+
+
+def creer_contrainte_exclusion(apps, schema_editor):
+    """
+    PostgreSQL uniquement : contrainte d'exclusion daterange pour interdire
+    deux séjours actifs qui se chevauchent sur le même appartement.
+    Sous SQLite, la vérification reste applicative (DisponibiliteService).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Reservation = apps.get_model('reservations', 'Reservation')
+    table = Reservation._meta.db_table
+
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('SAVEPOINT contrainte_occupation')
+            try:
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+                cursor.execute(
+                    f'ALTER TABLE {table} ADD CONSTRAINT {NOM_CONTRAINTE} '
+                    f"EXCLUDE USING gist (appartement_id WITH =, daterange(date_arrivee, date_depart, '[)') WITH &&) "
+                    f"WHERE (statut IN ('confirmee', 'en_cours'))"
+                )
+                cursor.execute('RELEASE SAVEPOINT contrainte_occupation')
+            except Exception:
+                cursor.execute('ROLLBACK TO SAVEPOINT contrainte_occupation')
+                raise
+    except Exception as e:
+        # Droits insuffisants pour btree_gist ou données existantes en conflit :
+        # on garde l'index partiel et la vérification applicative
+        logger.warning(f"Contrainte d'exclusion non créée ({NOM_CONTRAINTE}): {e}")
+
+
+def supprimer_contrainte_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Reservation = apps.get_model('reservations', 'Reservation')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {Reservation._meta.db_table} DROP CONSTRAINT IF EXISTS {NOM_CONTRAINTE}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appartements', '0001_initial'),
+        ('clients', '0007_remove_client_unique_telephone_complet_and_more'),
+        ('reservations', '0003_reservation_reduction_alter_reservation_statut'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('statut__in', ('confirmee', 'en_cours'))), fields=['appartement', 'date_arrivee', 'date_depart'], name='reservation_occupation_idx'),
+        ),
+        migrations.RunPython(creer_contrainte_exclusion, supprimer_contrainte_exclusion),
+    ]
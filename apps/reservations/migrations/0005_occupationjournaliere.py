@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:08
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def remplir_occupation(apps, schema_editor):
+    """Remplissage initial depuis les réservations existantes"""
+    Reservation = apps.get_model('reservations', 'Reservation')
+    OccupationJournaliere = apps.get_model('reservations', 'OccupationJournaliere')
+
+    lot = []
+    for reservation in Reservation.objects.filter(
+        statut__in=['confirmee', 'en_cours', 'terminee']
+    ).iterator():
+        for i in range((reservation.date_depart - reservation.date_arrivee).days):
+            lot.append(OccupationJournaliere(
+                appartement_id=reservation.appartement_id,
+                reservation_id=reservation.pk,
+                date=reservation.date_arrivee + timedelta(days=i),
+            ))
+        if len(lot) >= 1000:
+            OccupationJournaliere.objects.bulk_create(lot)
+            lot = []
+
+    if lot:
+        OccupationJournaliere.objects.bulk_create(lot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appartements', '0001_initial'),
+        ('reservations', '0004_reservation_occupation_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupationJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Nuit du')),
+                ('appartement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupations', to='appartements.appartement')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupations', to='reservations.reservation')),
+            ],
+            options={
+                'verbose_name': 'Occupation journalière',
+                'verbose_name_plural': 'Occupations journalières',
+                'indexes': [models.Index(fields=['date', 'appartement'], name='occupation_date_appart_idx')],
+                'constraints': [models.UniqueConstraint(fields=('reservation', 'date'), name='occupation_reservation_nuit_unique')],
+            },
+        ),
+        migrations.RunPython(remplir_occupation, migrations.RunPython.noop),
+    ]
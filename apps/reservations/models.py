@@ -2,9 +2,12 @@
 # apps/reservations/models.py - AVEC REDUCTION
 # ==========================================
 from django.db import models
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
+from .disponibilite import DisponibiliteService, STATUTS_BLOQUANTS
+
 class Reservation(models.Model):
     STATUT_CHOICES = [
         ('confirmee', 'Confirmée'),
@@ -48,6 +51,30 @@ class Reservation(models.Model):
     date_modification = models.DateTimeField(auto_now=True)
     gestionnaire = models.ForeignKey('users.User', on_delete=models.SET_NULL, null=True, blank=True)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise l'état chargé pour que les signaux connaissent l'ancienne période"""
+        instance = super().from_db(db, field_names, values)
+        instance._etat_initial = {
+            champ: instance.__dict__.get(champ)
+            for champ in ('appartement_id', 'date_arrivee', 'date_depart', 'statut')
+        }
+        instance._serie_initiale = instance._contribution_serie()
+        return instance
+    
+    def _contribution_serie(self):
+        """Apport à la série journalière : réservation comptée le jour de sa création"""
+        from apps.comptabilite.models import STATUTS_MONTANT_RESERVE
+        
+        date_creation = self.__dict__.get('date_creation')
+        if not date_creation:
+            return None
+        montant = self.__dict__.get('prix_total') if self.__dict__.get('statut') in STATUTS_MONTANT_RESERVE else 0
+        return (
+            self.__dict__.get('appartement_id'), timezone.localdate(date_creation), '',
+            {'reservations': 1, 'montant_reservations': montant or 0},
+        )
+    
     def clean(self):
         if self.date_depart and self.date_arrivee:
             if self.date_depart <= self.date_arrivee:
@@ -61,17 +88,15 @@ class Reservation(models.Model):
             if self.reduction > prix_base:
                 raise ValidationError(f'La réduction ({self.reduction} FCFA) ne peut pas dépasser le prix de base ({prix_base} FCFA)')
         
-        # Vérifier conflits
-        if self.appartement and self.date_arrivee and self.date_depart:
-            conflits = Reservation.objects.filter(
-                appartement=self.appartement,
-                statut__in=['confirmee', 'en_cours']
-            ).exclude(pk=self.pk if self.pk else None)
-            
-            for conf in conflits:
-                if (self.date_arrivee < conf.date_depart and 
-                    self.date_depart > conf.date_arrivee):
-                    raise ValidationError(f'Conflit avec réservation {conf.pk}')
+        # Vérifier conflits (une seule requête indexée via le moteur de disponibilité)
+        if (self.appartement_id and self.date_arrivee and self.date_depart
+                and self.statut in STATUTS_BLOQUANTS):
+            conflit = DisponibiliteService.get_conflit(
+                self.appartement_id, self.date_arrivee, self.date_depart,
+                exclude_reservation_id=self.pk
+            )
+            if conflit:
+                raise ValidationError(f'Conflit avec réservation {conflit.pk}')
     
     def save(self, *args, **kwargs):
         # Calcul automatique AVEC réduction
@@ -96,4 +121,39 @@ class Reservation(models.Model):
     class Meta:
         verbose_name = 'Réservation'
         verbose_name_plural = 'Réservations'
-        ordering = ['-date_arrivee']
\ No newline at end of file
+        ordering = ['-date_arrivee']
+        indexes = [
+            # Index d'occupation : sert toutes les recherches de chevauchement
+            models.Index(
+                fields=['appartement', 'date_arrivee', 'date_depart'],
+                name='reservation_occupation_idx',
+                condition=models.Q(statut__in=STATUTS_BLOQUANTS),
+            ),
+        ]
+
+class OccupationJournaliere(models.Model):
+    """
+    Table de faits : une ligne par appartement et par nuit occupée.
+    Maintenue par les signaux de Reservation, reconstructible via
+    la commande `reconstruire_occupation`.
+    """
+    appartement = models.ForeignKey(
+        'appartements.Appartement', on_delete=models.CASCADE, related_name='occupations'
+    )
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.CASCADE, related_name='occupations'
+    )
+    date = models.DateField(verbose_name='Nuit du')
+    
+    def __str__(self):
+        return f"{self.appartement_id} - {self.date}"
+    
+    class Meta:
+        verbose_name = 'Occupation journalière'
+        verbose_name_plural = 'Occupations journalières'
+        constraints = [
+            models.UniqueConstraint(fields=['reservation', 'date'], name='occupation_reservation_nuit_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'appartement'], name='occupation_date_appart_idx'),
+        ]
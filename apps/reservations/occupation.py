@@ -0,0 +1,129 @@
+# ==========================================
+# apps/reservations/occupation.py - Taux d'occupation (table OccupationJournaliere)
+# ==========================================
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import Count
+
+# Statuts qui comptent dans l'occupation (une réservation annulée n'occupe rien)
+STATUTS_OCCUPANTS = ('confirmee', 'en_cours', 'terminee')
+
+TAILLE_LOT = 1000
+
+
+class OccupationService:
+    """
+    Tous les calculs d'occupation passent par la table OccupationJournaliere :
+    une nuit occupée = une ligne, un taux = un GROUP BY sur la période.
+    """
+
+    @staticmethod
+    def _lignes(reservation):
+        from .models import OccupationJournaliere
+
+        return [
+            OccupationJournaliere(
+                appartement_id=reservation.appartement_id,
+                reservation_id=reservation.pk,
+                date=reservation.date_arrivee + timedelta(days=i),
+            )
+            for i in range((reservation.date_depart - reservation.date_arrivee).days)
+        ]
+
+    @staticmethod
+    def synchroniser_reservation(reservation):
+        """Remplace les nuits d'une réservation après création / modification"""
+        from .models import OccupationJournaliere
+
+        with transaction.atomic():
+            OccupationJournaliere.objects.filter(reservation_id=reservation.pk).delete()
+            if reservation.statut in STATUTS_OCCUPANTS:
+                OccupationJournaliere.objects.bulk_create(
+                    OccupationService._lignes(reservation), batch_size=TAILLE_LOT
+                )
+
+    @staticmethod
+    def reconstruire() -> int:
+        """Reconstruit entièrement la table depuis les réservations, retourne le nombre de nuits"""
+        from .models import OccupationJournaliere, Reservation
+
+        total = 0
+        with transaction.atomic():
+            OccupationJournaliere.objects.all().delete()
+
+            lot = []
+            reservations = Reservation.objects.filter(
+                statut__in=STATUTS_OCCUPANTS
+            ).only('pk', 'appartement_id', 'date_arrivee', 'date_depart', 'statut')
+
+            for reservation in reservations.iterator():
+                lot.extend(OccupationService._lignes(reservation))
+                if len(lot) >= TAILLE_LOT:
+                    OccupationJournaliere.objects.bulk_create(lot)
+                    total += len(lot)
+                    lot = []
+
+            if lot:
+                OccupationJournaliere.objects.bulk_create(lot)
+                total += len(lot)
+
+        return total
+
+    @staticmethod
+    def periode_mois(annee: int, mois: int):
+        """Période [premier jour, premier jour du mois suivant["""
+        debut = date(annee, mois, 1)
+        return debut, debut + timedelta(days=monthrange(annee, mois)[1])
+
+    @staticmethod
+    def nuits_par_appartement(date_debut: date, date_fin: date, appartements=None) -> Dict[int, int]:
+        """Nuits occupées par appartement sur [date_debut, date_fin[ - une requête GROUP BY"""
+        from .models import OccupationJournaliere
+
+        occupations = OccupationJournaliere.objects.filter(date__gte=date_debut, date__lt=date_fin)
+        if appartements is not None:
+            occupations = occupations.filter(appartement__in=appartements)
+
+        # distinct : deux séjours terminés saisis en chevauchement ne comptent qu'une nuit
+        return dict(
+            occupations.values('appartement_id')
+            .annotate(nuits=Count('date', distinct=True))
+            .values_list('appartement_id', 'nuits')
+        )
+
+    @staticmethod
+    def taux_occupation(date_debut: date, date_fin: date, appartements=None,
+                        nombre_appartements: Optional[int] = None) -> int:
+        """Taux d'occupation global (%) de la période"""
+        if nombre_appartements is None:
+            from apps.appartements.models import Appartement
+            nombre_appartements = (
+                appartements.count() if appartements is not None else Appartement.objects.count()
+            )
+
+        nuits_possibles = nombre_appartements * (date_fin - date_debut).days
+        if nuits_possibles <= 0:
+            return 0
+
+        nuits = sum(OccupationService.nuits_par_appartement(date_debut, date_fin, appartements).values())
+        return round((nuits / nuits_possibles) * 100)
+
+    @staticmethod
+    def taux_occupation_mois(annee: int, mois: int) -> int:
+        return OccupationService.taux_occupation(*OccupationService.periode_mois(annee, mois))
+
+    @staticmethod
+    def taux_par_appartement(date_debut: date, date_fin: date, appartements=None) -> Dict[int, Dict[str, int]]:
+        """{appartement_id: {'nuits_occupees', 'taux_occupation'}} pour la période"""
+        nb_jours = (date_fin - date_debut).days
+        nuits = OccupationService.nuits_par_appartement(date_debut, date_fin, appartements)
+        return {
+            appartement_id: {
+                'nuits_occupees': nb,
+                'taux_occupation': round((nb / nb_jours) * 100) if nb_jours > 0 else 0,
+            }
+            for appartement_id, nb in nuits.items()
+        }
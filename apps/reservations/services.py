@@ -41,19 +41,52 @@ class ReservationService:
     def verifier_disponibilite_periode(appartement, date_debut: date, date_fin: date, 
                                        exclude_reservation_id: Optional[int] = None) -> bool:
         """Vérifie la disponibilité d'un appartement pour une période"""
-        from apps.reservations.models import Reservation
+        from apps.reservations.disponibilite import DisponibiliteService
         
-        conflits = Reservation.objects.filter(
-            appartement=appartement,
-            statut__in=['confirmee', 'en_cours'],
-            date_arrivee__lt=date_fin,
-            date_depart__gt=date_debut
+        return DisponibiliteService.est_disponible(
+            appartement, date_debut, date_fin, exclude_reservation_id
         )
+    
+    @staticmethod
+    def rechercher_appartements_disponibles(date_debut: date, date_fin: date,
+                                            type_logement: Optional[str] = None,
+                                            maison: Optional[str] = None,
+                                            prix_min: Optional[Decimal] = None,
+                                            prix_max: Optional[Decimal] = None):
+        """
+        Recherche groupée : tous les appartements libres sur la période avec leur prix calculé.
+        Une seule requête (filtres + anti-jointure sur les réservations actives), quel que soit
+        le nombre d'appartements.
+        """
+        from django.db.models import DecimalField, ExpressionWrapper, F, Value
+        from apps.appartements.models import Appartement
+        from apps.reservations.disponibilite import DisponibiliteService
         
-        if exclude_reservation_id:
-            conflits = conflits.exclude(pk=exclude_reservation_id)
-            
-        return not conflits.exists()
+        nombre_nuits = (date_fin - date_debut).days
+        if nombre_nuits <= 0:
+            raise ValidationError("La durée du séjour doit être d'au moins 1 nuit.")
+        
+        # Les appartements en maintenance ne sont jamais proposés
+        appartements = Appartement.objects.exclude(statut='maintenance')
+        
+        if type_logement:
+            appartements = appartements.filter(type_logement=type_logement)
+        if maison:
+            appartements = appartements.filter(maison__iexact=maison)
+        if prix_min is not None:
+            appartements = appartements.filter(prix_par_nuit__gte=prix_min)
+        if prix_max is not None:
+            appartements = appartements.filter(prix_par_nuit__lte=prix_max)
+        
+        return DisponibiliteService.appartements_disponibles(
+            date_debut, date_fin, appartements
+        ).annotate(
+            nombre_nuits=Value(nombre_nuits),
+            prix_total=ExpressionWrapper(
+                F('prix_par_nuit') * nombre_nuits,
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        ).order_by('prix_par_nuit', 'numero')
     
     @staticmethod
     def calculer_prix_reservation(appartement, date_debut: date, date_fin: date, 
@@ -279,40 +312,33 @@ class ReservationService:
     
     @staticmethod
     def get_evolution_reservations(user, nb_mois: int = 12) -> List[Dict]:
-        """Récupère l'évolution des réservations par mois"""
-        reservations = ReservationService.get_reservations_for_user(user)
+        """Évolution des réservations par mois, lue dans la série journalière (une requête)"""
+        from apps.appartements.models import Appartement
+        from apps.comptabilite.models import SerieJournaliere
         
-        # Calculer les 12 derniers mois
-        aujourd_hui = timezone.now().date()
-        mois_data = []
-        
-        for i in range(nb_mois):
-            # Calcul du mois
-            if aujourd_hui.month - i > 0:
-                mois = aujourd_hui.month - i
-                annee = aujourd_hui.year
-            else:
-                mois = 12 + (aujourd_hui.month - i)
-                annee = aujourd_hui.year - 1
-            
-            # Réservations du mois
-            reservations_mois = reservations.filter(
-                date_creation__year=annee,
-                date_creation__month=mois
-            )
-            
-            # CORRECTION avec .get()
-            revenus_result = reservations_mois.filter(
-                statut__in=['confirmee', 'terminee']
-            ).aggregate(total=Sum('prix_total'))
-            
-            mois_data.append({
-                'mois': f"{annee}-{mois:02d}",
-                'reservations': reservations_mois.count(),
-                'revenus': revenus_result.get('total') or 0
-            })
-        
-        return list(reversed(mois_data))
+        if user.is_anonymous:
+            appartements = Appartement.objects.none()
+        elif hasattr(user, 'is_super_admin') and user.is_super_admin():
+            appartements = None
+        elif hasattr(user, 'is_gestionnaire') and user.is_gestionnaire():
+            appartements = Appartement.objects.filter(gestionnaire=user)
+        else:
+            appartements = Appartement.objects.none()
+        
+        # Du 1er du mois il y a nb_mois - 1 mois jusqu'à aujourd'hui
+        aujourd_hui = timezone.localdate()
+        debut = aujourd_hui.replace(day=1)
+        for _ in range(nb_mois - 1):
+            debut = (debut - timedelta(days=1)).replace(day=1)
+        
+        return [
+            {
+                'mois': ligne['periode'].strftime('%Y-%m'),
+                'reservations': ligne['reservations'],
+                'revenus': ligne['montant_reservations'],
+            }
+            for ligne in SerieJournaliere.serie(debut, aujourd_hui, pas='mois', appartements=appartements)
+        ]
 
 
 class PaiementService:
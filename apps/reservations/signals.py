@@ -0,0 +1,61 @@
+# ==========================================
+# apps/reservations/signals.py - Calendrier et occupation journalière
+# ==========================================
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.appartements.models import Appartement
+from apps.clients.models import Client
+from utils import cache as cache_partage
+from .calendrier import CalendrierService, ETIQUETTE_GLOBALE
+from .models import Reservation
+from .occupation import OccupationService
+
+
+def periodes_touchees(instance):
+    """Période actuelle du séjour + période d'origine si les dates ont changé"""
+    periodes = set()
+    if instance.date_arrivee and instance.date_depart:
+        periodes.add((instance.date_arrivee, instance.date_depart))
+
+    etat_initial = getattr(instance, '_etat_initial', None)
+    if etat_initial and etat_initial.get('date_arrivee') and etat_initial.get('date_depart'):
+        periodes.add((etat_initial['date_arrivee'], etat_initial['date_depart']))
+    return periodes
+
+
+def invalider_calendrier(instance):
+    """Seuls les mois couverts par le séjour (avant et après modification) sont invalidés"""
+    periodes = periodes_touchees(instance)
+
+    def invalider():
+        for date_debut, date_fin in periodes:
+            CalendrierService.invalider_periode(date_debut, date_fin)
+
+    transaction.on_commit(invalider)
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_enregistree(sender, instance, created, **kwargs):
+    etat_actuel = {
+        champ: getattr(instance, champ)
+        for champ in ('appartement_id', 'date_arrivee', 'date_depart', 'statut')
+    }
+
+    # Les nuits ne changent que si l'appartement, les dates ou le statut changent
+    if created or getattr(instance, '_etat_initial', None) != etat_actuel:
+        OccupationService.synchroniser_reservation(instance)
+
+    invalider_calendrier(instance)
+    instance._etat_initial = etat_actuel
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_supprimee(sender, instance, **kwargs):
+    # Les lignes d'occupation partent en cascade
+    invalider_calendrier(instance)
+
+
+# Les lignes (appartements) et les noms clients apparaissent sur tous les mois
+cache_partage.invalider_sur_modification([ETIQUETTE_GLOBALE], Appartement, Client)
@@ -10,6 +10,8 @@ urlpatterns = [
     # Calendrier et planning selon cahier
     path('', views.calendrier_reservations, name='calendrier'),
     path('liste/', views.liste_reservations, name='liste'),
+    path('export/', views.export_reservations, name='export'),
+    path('api/calendrier/', views.api_calendrier, name='api_calendrier'),
     
     # Création réservation (5 étapes selon cahier)
     path('nouvelle/', views.creer_reservation, name='nouvelle'),
@@ -19,6 +21,7 @@ urlpatterns = [
     
     # Vérification disponibilité selon cahier (AJAX)
     path('api/disponibilite/', views.verifier_disponibilite, name='verifier_disponibilite'),
+    path('api/disponibles/', views.rechercher_disponibilites, name='rechercher_disponibilites'),
     
     # Arrivées et départs du jour
     path('arrivees-jour/', views.arrivees_du_jour, name='arrivees_jour'),
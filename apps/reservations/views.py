@@ -13,12 +13,13 @@ from apps.notifications.services import NotificationService
 from apps.users.views import is_gestionnaire, is_super_admin, is_receptionniste
 from .models import Reservation
 from .forms import ReservationForm
+from .disponibilite import DisponibiliteService
+from .calendrier import CalendrierService
+from .exports import EXPORT_RESERVATIONS
+from utils.exports import get_format_export, reponse_export
 
-@login_required
-@user_passes_test(is_receptionniste)
-def calendrier_reservations(request):
-    """Vue mensuelle avec couleurs par statut selon cahier - Accessible aux réceptionnistes"""
-    import calendar
+def _get_periode_calendrier(request):
+    """Lit les paramètres du calendrier (vue, annee, mois, nb_mois, jour) et renvoie la période"""
     import re
     
     # Nettoyage et validation des paramètres
@@ -35,6 +36,8 @@ def calendrier_reservations(request):
     # Mois en cours par défaut avec nettoyage
     annee = clean_int_param('annee', datetime.now().year)
     mois = clean_int_param('mois', datetime.now().month)
+    nb_mois = clean_int_param('nb_mois', 1)
+    vue = request.GET.get('vue', 'mois')
     
     # Validation des valeurs
     if not (1 <= mois <= 12):
@@ -42,51 +45,65 @@ def calendrier_reservations(request):
     if not (2000 <= annee <= 2050):  # Plage raisonnable
         annee = datetime.now().year
     
-    # Premier et dernier jour du mois
-    premier_jour = datetime(annee, mois, 1).date()
-    if mois == 12:
-        dernier_jour = datetime(annee + 1, 1, 1).date() - timedelta(days=1)
+    if vue == 'semaine':
+        try:
+            jour = datetime.strptime(request.GET.get('jour', ''), '%Y-%m-%d').date()
+        except ValueError:
+            jour = date.today()
+        date_debut, date_fin = CalendrierService.periode_semaine(jour)
+        annee, mois = date_debut.year, date_debut.month
     else:
-        dernier_jour = datetime(annee, mois + 1, 1).date() - timedelta(days=1)
-    
-    # Générer les jours du mois
-    cal = calendar.monthcalendar(annee, mois)
-    jours_mois = []
-    for semaine in cal:
-        for jour in semaine:
-            if jour != 0:
-                jours_mois.append(datetime(annee, mois, jour).date())
-    
-    # Réservations du mois
-    reservations = Reservation.objects.filter(
-        date_arrivee__lte=dernier_jour,
-        date_depart__gt=premier_jour
-    ).select_related('client', 'appartement')
+        vue = 'mois'
+        date_debut, date_fin = CalendrierService.periode_mois(annee, mois, nb_mois)
     
-    # Préparer les données pour le calendrier
-    from apps.appartements.models import Appartement
-    appartements = Appartement.objects.all().order_by('numero')
+    return vue, annee, mois, date_debut, date_fin
+
+def _navigation_calendrier(vue, premier_jour, fin_periode):
+    """Libellés et liens précédent/suivant qui conservent la vue (semaine, mois, N mois)"""
+    from django.utils.dateformat import format as format_date
+    from django.utils.http import urlencode
     
-    calendrier_data = []
-    for appartement in appartements:
-        app_reservations = reservations.filter(appartement=appartement)
-        
-        # Organiser les réservations par jour
-        jours_data = []
-        for jour in jours_mois:
-            reservations_jour = []
-            for reservation in app_reservations:
-                if reservation.date_arrivee <= jour < reservation.date_depart:
-                    reservations_jour.append(reservation)
-            jours_data.append({
-                'date': jour,
-                'reservations': reservations_jour
-            })
-        
-        calendrier_data.append({
-            'appartement': appartement,
-            'jours': jours_data
-        })
+    if vue == 'semaine':
+        dernier_jour = fin_periode - timedelta(days=1)
+        return {
+            'nb_mois': 1,
+            'libelle_vue': 'Vue hebdomadaire',
+            'titre_periode': f"Semaine du {premier_jour:%d/%m} au {dernier_jour:%d/%m/%Y}",
+            'url_precedente': '?' + urlencode({'vue': 'semaine', 'jour': premier_jour - timedelta(days=7)}),
+            'url_suivante': '?' + urlencode({'vue': 'semaine', 'jour': fin_periode}),
+        }
+    
+    nb_mois = len(CalendrierService.mois_couverts(premier_jour, fin_periode))
+    
+    def lien(decalage):
+        rang = premier_jour.year * 12 + premier_jour.month - 1 + decalage
+        parametres = {'annee': rang // 12, 'mois': rang % 12 + 1}
+        if nb_mois > 1:
+            parametres['nb_mois'] = nb_mois
+        return '?' + urlencode(parametres)
+    
+    titre = format_date(premier_jour, 'F Y')
+    if nb_mois > 1:
+        titre = f"{titre} - {format_date(fin_periode - timedelta(days=1), 'F Y')}"
+    return {
+        'nb_mois': nb_mois,
+        'libelle_vue': f'Vue sur {nb_mois} mois' if nb_mois > 1 else 'Vue mensuelle',
+        'titre_periode': titre,
+        'url_precedente': lien(-nb_mois),
+        'url_suivante': lien(nb_mois),
+    }
+
+@login_required
+@user_passes_test(is_receptionniste)
+def calendrier_reservations(request):
+    """Vue mensuelle avec couleurs par statut selon cahier - Accessible aux réceptionnistes"""
+    vue, annee, mois, premier_jour, fin_periode = _get_periode_calendrier(request)
+    dernier_jour = fin_periode - timedelta(days=1)
+    
+    # Grille construite en une passe (2 requêtes quel que soit le nombre d'appartements),
+    # servie depuis le cache tant que les mois affichés n'ont pas changé
+    grille = CalendrierService.get_grille(premier_jour, fin_periode)
+    jours_mois, calendrier_data = CalendrierService.lignes_template(grille)
     
     # Arrivées du jour
     arrivees_aujourd_hui = Reservation.objects.filter(
@@ -97,15 +114,27 @@ def calendrier_reservations(request):
     context = {
         'calendrier_data': calendrier_data,
         'jours_mois': jours_mois,
+        'vue': vue,
         'annee': annee,
         'mois': mois,
         'mois_nom': datetime(annee, mois, 1).strftime('%B %Y'),
         'premier_jour': premier_jour,
         'dernier_jour': dernier_jour,
         'arrivees_aujourd_hui': arrivees_aujourd_hui,
+        **_navigation_calendrier(vue, premier_jour, fin_periode),
     }
     return render(request, 'reservations/calendrier.html', context)
 
+@login_required
+@user_passes_test(is_receptionniste)
+def api_calendrier(request):
+    """AJAX - Grille compacte du calendrier (mêmes paramètres que la vue HTML)"""
+    vue, annee, mois, date_debut, date_fin = _get_periode_calendrier(request)
+    
+    grille = dict(CalendrierService.get_grille(date_debut, date_fin))
+    grille['vue'] = vue
+    return JsonResponse(grille)
+
 @login_required
 @user_passes_test(is_receptionniste)
 def creer_reservation(request):
@@ -179,18 +208,10 @@ def verifier_disponibilite(request):
             return JsonResponse({'error': 'Date de départ invalide'})
         
         # Vérifier conflits - EXCLURE la réservation en cours de modification
-        conflits = Reservation.objects.filter(
-            appartement=appartement,
-            statut__in=['confirmee', 'en_cours'],
-            date_arrivee__lt=date_depart,
-            date_depart__gt=date_arrivee
-        )
-        
-        # AJOUT : Exclure la réservation en cours de modification
-        if reservation_id:
-            conflits = conflits.exclude(pk=reservation_id)
-        
-        if conflits.exists():
+        if not DisponibiliteService.est_disponible(
+            appartement, date_arrivee, date_depart,
+            exclude_reservation_id=reservation_id or None
+        ):
             return JsonResponse({
                 'disponible': False,
                 'message': 'Dates non disponibles - conflit détecté'
@@ -211,18 +232,70 @@ def verifier_disponibilite(request):
     except Exception as e:
         return JsonResponse({'error': str(e)})
 
+@login_required
+@user_passes_test(is_receptionniste)
+def rechercher_disponibilites(request):
+    """AJAX - Tous les appartements libres sur une période, avec leur prix - Accessible aux réceptionnistes"""
+    date_arrivee = request.GET.get('date_arrivee')
+    date_depart = request.GET.get('date_depart')
+    
+    if not all([date_arrivee, date_depart]):
+        return JsonResponse({'error': 'Paramètres manquants'})
+    
+    try:
+        date_arrivee = datetime.strptime(date_arrivee, '%Y-%m-%d').date()
+        date_depart = datetime.strptime(date_depart, '%Y-%m-%d').date()
+        
+        if date_depart <= date_arrivee:
+            return JsonResponse({'error': 'Date de départ invalide'})
+        
+        prix_min = request.GET.get('prix_min')
+        prix_max = request.GET.get('prix_max')
+        
+        from .services import ReservationService
+        appartements = ReservationService.rechercher_appartements_disponibles(
+            date_arrivee,
+            date_depart,
+            type_logement=request.GET.get('type_logement') or None,
+            maison=request.GET.get('maison') or None,
+            prix_min=Decimal(prix_min) if prix_min else None,
+            prix_max=Decimal(prix_max) if prix_max else None,
+        )
+        
+        resultats = [
+            {
+                'id': appartement.pk,
+                'numero': appartement.numero,
+                'type_logement': appartement.type_logement,
+                'type_logement_display': appartement.get_type_logement_display(),
+                'maison': appartement.maison,
+                'prix_par_nuit': float(appartement.prix_par_nuit),
+                'nombre_nuits': appartement.nombre_nuits,
+                'prix_total': float(appartement.prix_total),
+            }
+            for appartement in appartements
+        ]
+        
+        return JsonResponse({
+            'date_arrivee': date_arrivee.isoformat(),
+            'date_depart': date_depart.isoformat(),
+            'nombre_resultats': len(resultats),
+            'appartements': resultats,
+        })
+    
+    except Exception as e:
+        return JsonResponse({'error': str(e)})
+
 @login_required
 @user_passes_test(is_receptionniste)
 def liste_reservations(request):
     """Liste des réservations selon cahier - Accessible aux réceptionnistes"""
     statut_filtre = request.GET.get('statut', 'tous')
     
-    reservations = Reservation.objects.select_related(
-        'client', 'appartement'
-    ).order_by('-date_arrivee')
-    
-    if statut_filtre != 'tous':
-        reservations = reservations.filter(statut=statut_filtre)
+    reservations = _filtrer_reservations(
+        Reservation.objects.select_related('client', 'appartement').order_by('-date_arrivee'),
+        statut_filtre
+    )
     
     context = {
         'reservations': reservations,
@@ -230,6 +303,27 @@ def liste_reservations(request):
     }
     return render(request, 'reservations/liste.html', context)
 
+def _filtrer_reservations(reservations, statut_filtre):
+    """Filtres communs à la liste et à l'export"""
+    if statut_filtre != 'tous':
+        reservations = reservations.filter(statut=statut_filtre)
+    return reservations
+
+@login_required
+@user_passes_test(is_gestionnaire)
+def export_reservations(request):
+    """Export CSV / XLSX des réservations (mêmes filtres que la liste, + ?annee=)"""
+    reservations = _filtrer_reservations(
+        Reservation.objects.order_by('-date_arrivee'),
+        request.GET.get('statut', 'tous')
+    )
+    
+    annee = request.GET.get('annee', '')
+    if annee.isdigit():
+        reservations = reservations.filter(date_arrivee__year=int(annee))
+    
+    return reponse_export(EXPORT_RESERVATIONS, reservations, get_format_export(request))
+
 @login_required
 @user_passes_test(is_receptionniste)
 def detail_reservation(request, pk):
@@ -0,0 +1,176 @@
+# ==========================================
+# apps/users/audit.py - Journal d'audit en tampon (écriture par lots)
+# ==========================================
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .middleware import get_current_user, get_current_request, get_client_ip
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+CONFIG_DEFAUT = {
+    'INCLURE': [],
+    'EXCLURE': ['users.ActionLog'],
+    'TAILLE_LOT': 200,
+    'DELAI_MAX': 5,
+    # Sauvegardes limitées à ces champs non journalisées (update_fields)
+    'CHAMPS_IGNORES': {
+        'users.User': ['last_login', 'session_key', 'derniere_activite'],
+    },
+}
+
+
+def _config():
+    return {**CONFIG_DEFAUT, **getattr(settings, 'AUDIT_LOG', {})}
+
+
+@lru_cache(maxsize=None)
+def est_audite(model):
+    """Le modèle doit-il être journalisé ? (réglage AUDIT_LOG, résultat mémorisé)"""
+    config = _config()
+    app_label = model._meta.app_label
+    label = f'{app_label}.{model.__name__}'
+
+    def correspond(motifs):
+        return any(motif in (app_label, label) for motif in motifs)
+
+    # ActionLog n'est jamais journalisé (récursion)
+    if label == 'users.ActionLog' or correspond(config['EXCLURE']):
+        return False
+    return not config['INCLURE'] or correspond(config['INCLURE'])
+
+
+def modification_ignoree(model, update_fields):
+    """Sauvegarde partielle ne touchant que des champs techniques du modèle"""
+    if not update_fields:
+        return False
+    ignores = _config()['CHAMPS_IGNORES'].get(f'{model._meta.app_label}.{model.__name__}', ())
+    return set(update_fields) <= set(ignores)
+
+
+def _tampon():
+    if not hasattr(_local, 'actions'):
+        _local.actions = []
+        _local.depuis = None
+    return _local.actions
+
+
+def _ajouter(action):
+    tampon = _tampon()
+    if not tampon:
+        _local.depuis = time.monotonic()
+    tampon.append(action)
+
+    config = _config()
+    if len(tampon) >= config['TAILLE_LOT'] or (
+            get_current_request() is None
+            and time.monotonic() - _local.depuis >= config['DELAI_MAX']):
+        vider()
+
+
+def enregistrer(action, model_name, object_id='', object_repr='', details='', utilisateur=None,
+                request=None, method=None):
+    """
+    Met une action en attente. Elle n'entre dans le tampon qu'au commit de la
+    transaction en cours : une modification annulée n'est pas journalisée.
+    """
+    request = request if request is not None else get_current_request()
+    if utilisateur is None:
+        utilisateur = get_current_user()
+
+    ligne = {
+        'utilisateur_id': getattr(utilisateur, 'pk', None),
+        'action': action,
+        'model_name': model_name,
+        'object_id': object_id,
+        'object_repr': object_repr[:200],
+        'ip_address': get_client_ip(request) if request else None,
+        'user_agent': request.META.get('HTTP_USER_AGENT', '') if request else '',
+        'url': request.get_full_path() if request else '',
+        'method': method or (request.method if request else '') or '',
+        'details': details or '{}',
+    }
+    transaction.on_commit(lambda: _ajouter(ligne))
+
+
+def vider():
+    """Écrit les actions en attente en une requête (fin de requête, tampon plein, sortie)"""
+    tampon = _tampon()
+    if not tampon:
+        return
+
+    actions = tampon[:]
+    tampon.clear()
+    _local.depuis = None
+
+    from .models import ActionLog
+    try:
+        with transaction.atomic():
+            ActionLog.objects.bulk_create([ActionLog(**action) for action in actions], batch_size=500)
+            incrementer_statistiques(actions)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'écriture du journal d'audit ({len(actions)} actions): {e}")
+        # Une ligne invalide ne doit pas faire perdre tout le lot
+        for action in actions:
+            try:
+                with transaction.atomic():
+                    ActionLog.objects.create(**action)
+                    incrementer_statistiques([action])
+            except Exception as e:
+                logger.error(f"Action d'audit ignorée ({action['action']} {action['model_name']}): {e}")
+
+
+def incrementer_statistiques(actions, jour=None):
+    """Ajoute un lot d'actions aux compteurs journaliers (une requête par combinaison)"""
+    from .models import StatistiqueAudit
+
+    jour = jour or timezone.localdate()
+    compteurs = Counter(
+        (action['action'], action['model_name'], action['utilisateur_id']) for action in actions
+    )
+
+    for (type_action, model_name, utilisateur_id), nombre in compteurs.items():
+        cle = {'date': jour, 'action': type_action, 'model_name': model_name, 'utilisateur_id': utilisateur_id}
+        if not StatistiqueAudit.objects.filter(**cle).update(nombre=F('nombre') + nombre):
+            StatistiqueAudit.objects.create(**cle, nombre=nombre)
+
+
+def recalculer_statistiques():
+    """Reconstruit les compteurs des jours encore présents dans ActionLog (jours archivés conservés)"""
+    from django.db.models import Count, Min
+    from django.db.models.functions import TruncDate
+    from .models import ActionLog, StatistiqueAudit
+
+    premier = ActionLog.objects.aggregate(premier=Min('timestamp'))['premier']
+    if premier is None:
+        return 0
+
+    lignes = ActionLog.objects.annotate(jour=TruncDate('timestamp')).values(
+        'jour', 'action', 'model_name', 'utilisateur_id'
+    ).annotate(nombre=Count('id')).order_by()
+
+    with transaction.atomic():
+        StatistiqueAudit.objects.filter(date__gte=timezone.localtime(premier).date()).delete()
+        StatistiqueAudit.objects.bulk_create([
+            StatistiqueAudit(
+                date=ligne['jour'], action=ligne['action'], model_name=ligne['model_name'],
+                utilisateur_id=ligne['utilisateur_id'], nombre=ligne['nombre'],
+            )
+            for ligne in lignes
+        ], batch_size=1000)
+    return len(lignes)
+
+
+# Commandes de gestion / shell : rien ne doit rester en attente à la sortie
+atexit.register(vider)
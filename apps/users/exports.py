@@ -0,0 +1,16 @@
+# ==========================================
+# apps/users/exports.py - Colonnes d'export du journal d'audit
+# ==========================================
+from utils.exports import Colonne, SpecExport
+
+EXPORT_JOURNAL = SpecExport('journal', [
+    Colonne('Date', 'timestamp'),
+    Colonne('Utilisateur', lambda log: log.utilisateur.username if log.utilisateur else 'Anonyme'),
+    Colonne('Action', 'get_action_display'),
+    Colonne('Modèle', 'model_name'),
+    Colonne('Objet', 'object_id'),
+    Colonne('Description', 'object_repr'),
+    Colonne('Adresse IP', 'ip_address'),
+    Colonne('Méthode', 'method'),
+    Colonne('URL', 'url'),
+], select_related=('utilisateur',))
@@ -0,0 +1,108 @@
+# apps/users/management/commands/archiver_journal.py
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.users.models import ActionLog
+
+TAILLE_LOT = 5000
+
+
+class Command(BaseCommand):
+    help = "Archiver les mois anciens du journal d'audit en gzip JSONL puis les retirer de la base"
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'AUDIT_LOG', {})
+        parser.add_argument(
+            '--mois-conserves',
+            type=int,
+            default=config.get('RETENTION_MOIS', 6),
+            help='Nombre de mois conservés en base (mois en cours inclus)'
+        )
+        parser.add_argument(
+            '--dossier',
+            type=str,
+            default=str(config.get('ARCHIVE_DIR', Path(settings.BASE_DIR) / 'backups' / 'journal')),
+            help="Dossier des archives"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Lister les mois concernés sans archiver'
+        )
+
+    def handle(self, *args, **options):
+        limite = self.debut_mois_conserves(max(options['mois_conserves'], 1))
+        dossier = Path(options['dossier'])
+
+        mois_a_archiver = ActionLog.objects.filter(timestamp__lt=limite).dates('timestamp', 'month')
+        if not mois_a_archiver:
+            self.stdout.write(self.style.SUCCESS('✅ Aucun mois à archiver'))
+            return
+
+        dossier.mkdir(parents=True, exist_ok=True)
+        for mois in mois_a_archiver:
+            debut = timezone.make_aware(datetime(mois.year, mois.month, 1))
+            fin = timezone.make_aware(datetime(
+                mois.year + (mois.month == 12), mois.month % 12 + 1, 1
+            ))
+            logs = ActionLog.objects.filter(timestamp__gte=debut, timestamp__lt=fin)
+
+            if options['dry_run']:
+                self.stdout.write(f'  {mois:%m/%Y} : {logs.count()} actions')
+                continue
+
+            fichier = dossier / f'actionlog_{mois:%Y_%m}.jsonl.gz'
+            ecrites = self.archiver(logs, fichier)
+            supprimees = self.supprimer(logs)
+            self.stdout.write(f'  {mois:%m/%Y} : {ecrites} archivées → {fichier.name}, {supprimees} supprimées')
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Journal archivé jusqu\'au {limite:%d/%m/%Y}'))
+
+    @staticmethod
+    def debut_mois_conserves(mois_conserves):
+        """Premier jour du plus ancien mois conservé"""
+        today = timezone.localdate()
+        index = today.year * 12 + today.month - 1 - (mois_conserves - 1)
+        return timezone.make_aware(datetime(index // 12, index % 12 + 1, 1))
+
+    @staticmethod
+    def archiver(logs, fichier):
+        """
+        Écrit le mois en JSON lines compressé dans `<fichier>.tmp`, renommé
+        seulement après une passe complète. Une archive existante est recopiée
+        et ses pk ignorés : une relance après une suppression interrompue
+        n'écrit pas deux fois les mêmes actions.
+        """
+        temporaire = fichier.with_name(f'{fichier.name}.tmp')
+        archivees = set()
+        total = 0
+        with gzip.open(temporaire, 'wt', encoding='utf-8') as archive:
+            if fichier.exists():
+                with gzip.open(fichier, 'rt', encoding='utf-8') as existante:
+                    for ligne in existante:
+                        archivees.add(json.loads(ligne)['id'])
+                        archive.write(ligne)
+            for ligne in logs.order_by('pk').values().iterator(chunk_size=TAILLE_LOT):
+                if ligne['id'] in archivees:
+                    continue
+                archive.write(json.dumps(ligne, default=str, ensure_ascii=False) + '\n')
+                total += 1
+        temporaire.replace(fichier)
+        return total
+
+    @staticmethod
+    def supprimer(logs):
+        """Suppression par lots pour ne pas verrouiller la table longtemps"""
+        total = 0
+        while True:
+            ids = list(logs.values_list('pk', flat=True)[:TAILLE_LOT])
+            if not ids:
+                return total
+            total += ActionLog.objects.filter(pk__in=ids).delete()[0]
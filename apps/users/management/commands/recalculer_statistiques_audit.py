@@ -0,0 +1,12 @@
+# apps/users/management/commands/recalculer_statistiques_audit.py
+from django.core.management.base import BaseCommand
+
+from apps.users.audit import recalculer_statistiques
+
+
+class Command(BaseCommand):
+    help = "Reconstruire les compteurs journaliers d'audit à partir du journal"
+
+    def handle(self, *args, **options):
+        total = recalculer_statistiques()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} compteurs journaliers recalculés'))
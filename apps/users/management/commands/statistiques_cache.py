@@ -0,0 +1,24 @@
+# apps/users/management/commands/statistiques_cache.py
+from django.core.management.base import BaseCommand
+
+from utils import cache as cache_partage
+
+
+class Command(BaseCommand):
+    help = 'Afficher les taux de succès du cache partagé par domaine (tous les processus)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Remettre les compteurs à zéro après affichage'
+        )
+
+    def handle(self, *args, **options):
+        for domaine, stats in cache_partage.statistiques().items():
+            taux = f"{stats['taux']} %" if stats['taux'] is not None else '-'
+            self.stdout.write(f"  {domaine:<15} hits {stats['hits']:>8}  misses {stats['misses']:>8}  taux {taux}")
+
+        if options['reset']:
+            cache_partage.remettre_statistiques_a_zero()
+            self.stdout.write(self.style.SUCCESS('✅ Compteurs remis à zéro'))
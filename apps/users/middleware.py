@@ -36,12 +36,19 @@ class CurrentUserMiddleware(MiddlewareMixin):
         return None
     
     def process_response(self, request, response):
+        # Écrire le journal d'audit de la requête en un lot
+        from .audit import vider
+        vider()
+        
         # Nettoyer le thread local
         set_current_user(None)
         set_current_request(None)
         return response
     
     def process_exception(self, request, exception):
+        from .audit import vider
+        vider()
+        
         # Nettoyer en cas d'exception
         set_current_user(None)
         set_current_request(None)
@@ -58,24 +65,33 @@ def get_client_ip(request):
     return request.META.get('REMOTE_ADDR')
 
 from django.contrib.auth import logout
-from django.contrib.sessions.models import Session
+from django.contrib.auth.views import redirect_to_login
 
 class SingleSessionMiddleware:
+    """
+    Une seule session par utilisateur : la dernière connexion l'emporte.
+    Vérification sur la colonne session_key de l'utilisateur déjà chargé,
+    aucune écriture par requête (voir RegistreSessions).
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
         if request.user.is_authenticated:
-            stored_session_key = getattr(request.user, 'session_key', None)
+            from .session_unique import RegistreSessions
+            
+            session_active = RegistreSessions.session_active(request.user)
             current_session_key = request.session.session_key
             
-            if stored_session_key and stored_session_key != current_session_key:
-                Session.objects.filter(session_key=stored_session_key).delete()
+            if session_active and session_active != current_session_key:
+                # Session remplacée par une connexion plus récente
                 messages.warning(request, 'Vous avez été déconnecté car quelqu\'un s\'est connecté avec votre compte.')
                 logout(request)
-                return self.get_response(request)
+                return redirect_to_login(request.get_full_path())
             
-            request.user.session_key = current_session_key
-            request.user.save()
+            if not session_active:
+                RegistreSessions.enregistrer(request.user, current_session_key)
+            else:
+                RegistreSessions.toucher(request.user)
         
         return self.get_response(request)
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def remplir_statistiques(apps, schema_editor):
+    """Compteurs initiaux à partir du journal existant"""
+    ActionLog = apps.get_model('users', 'ActionLog')
+    StatistiqueAudit = apps.get_model('users', 'StatistiqueAudit')
+
+    lignes = ActionLog.objects.annotate(jour=TruncDate('timestamp')).values(
+        'jour', 'action', 'model_name', 'utilisateur_id'
+    ).annotate(nombre=Count('id')).order_by()
+
+    StatistiqueAudit.objects.bulk_create([
+        StatistiqueAudit(
+            date=ligne['jour'], action=ligne['action'], model_name=ligne['model_name'],
+            utilisateur_id=ligne['utilisateur_id'], nombre=ligne['nombre'],
+        )
+        for ligne in lignes
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_profil'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistiqueAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('action', models.CharField(choices=[('create', 'Création'), ('update', 'Modification'), ('delete', 'Suppression'), ('login', 'Connexion'), ('logout', 'Déconnexion'), ('view', 'Consultation')], max_length=20)),
+                ('model_name', models.CharField(max_length=100)),
+                ('nombre', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': "Statistique d'audit",
+                'verbose_name_plural': "Statistiques d'audit",
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['-timestamp'], name='actionlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['action', '-timestamp'], name='actionlog_action_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['model_name', '-timestamp'], name='actionlog_model_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['utilisateur', '-timestamp'], name='actionlog_user_ts_idx'),
+        ),
+        migrations.AddField(
+            model_name='statistiqueaudit',
+            name='utilisateur',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='statistiqueaudit',
+            index=models.Index(fields=['date'], name='statistique_audit_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='statistiqueaudit',
+            constraint=models.UniqueConstraint(fields=('date', 'action', 'model_name', 'utilisateur'), name='statistique_audit_unique'),
+        ),
+        migrations.RunPython(remplir_statistiques, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_actionlog_index_statistiqueaudit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionUtilisateur',
+            fields=[
+                ('session_key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='session key')),
+                ('session_data', models.TextField(verbose_name='session data')),
+                ('expire_date', models.DateTimeField(db_index=True, verbose_name='expire date')),
+                ('user_id', models.BigIntegerField(db_index=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Session utilisateur',
+                'verbose_name_plural': 'Sessions utilisateurs',
+                'abstract': False,
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 # apps/users/models.py - Profils utilisateurs selon cahier
 from django.contrib.auth.models import AbstractUser
+from django.contrib.sessions.base_session import AbstractBaseSession
 from django.db import models
 
 class User(AbstractUser):
@@ -23,6 +24,15 @@ class User(AbstractUser):
     session_key = models.CharField(max_length=40, blank=True, null=True)
     derniere_activite = models.DateTimeField(auto_now=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État lu en base : les sauvegardes de session ne périment pas le dashboard
+        instance._etat_dashboard = (
+            instance.__dict__.get('profil'), instance.__dict__.get('is_active')
+        )
+        return instance
+
     def is_super_admin(self):
         return self.profil == 'super_admin'
 
@@ -85,9 +95,58 @@ class ActionLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Journal des actions'
         verbose_name_plural = 'Journal des actions'
+        indexes = [
+            # Index alignés sur les filtres du journal (tri par date décroissante)
+            models.Index(fields=['-timestamp'], name='actionlog_timestamp_idx'),
+            models.Index(fields=['action', '-timestamp'], name='actionlog_action_ts_idx'),
+            models.Index(fields=['model_name', '-timestamp'], name='actionlog_model_ts_idx'),
+            models.Index(fields=['utilisateur', '-timestamp'], name='actionlog_user_ts_idx'),
+        ]
     
     def __str__(self):
         user_str = self.utilisateur.username if self.utilisateur else 'Anonyme'
         return f"{user_str} - {self.get_action_display()} {self.model_name} - {self.timestamp}"
 
 
+class StatistiqueAudit(models.Model):
+    """
+    Compteurs journaliers du journal d'audit (jour, action, modèle, utilisateur).
+    Incrémentés à chaque écriture du tampon d'audit : la page de statistiques
+    ne parcourt plus ActionLog, et les compteurs survivent à l'archivage.
+    """
+    date = models.DateField()
+    action = models.CharField(max_length=20, choices=ActionLog.ACTION_CHOICES)
+    model_name = models.CharField(max_length=100)
+    utilisateur = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    nombre = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Statistique d'audit"
+        verbose_name_plural = "Statistiques d'audit"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'action', 'model_name', 'utilisateur'],
+                name='statistique_audit_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='statistique_audit_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.action} {self.model_name} : {self.nombre}"
+
+
+class SessionUtilisateur(AbstractBaseSession):
+    """Session indexée par utilisateur : fermer ses autres sessions est une recherche par clé"""
+    user_id = models.BigIntegerField(null=True, db_index=True)
+
+    @classmethod
+    def get_session_store_class(cls):
+        from .session_backend import SessionStore
+        return SessionStore
+
+    class Meta(AbstractBaseSession.Meta):
+        verbose_name = 'Session utilisateur'
+        verbose_name_plural = 'Sessions utilisateurs'
@@ -1,80 +1,126 @@
 # ==========================================
 # apps/users/services.py - Services métier pour les utilisateurs
 # ==========================================
+
 from django.db.models import Count, Sum, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
-from calendar import monthrange
 from typing import Dict, Any, List
+from utils import cache as cache_partage
 from .models import User
 
 class DashboardService:
     """
-    Service pour les données du dashboard selon cahier des charges
+    Service pour les données du dashboard selon cahier des charges.
+    Les KPIs sont calculés par agrégats conditionnels (une requête par table)
+    et mis en cache par profil ; toute modification d'un modèle concerné
+    change la version du cache (voir users/signals.py).
     """
     
+    CACHE_TIMEOUT = 60
+    CACHE_ETIQUETTE = 'dashboard'
+    
     @staticmethod
-    def get_kpis_principaux() -> Dict[str, Any]:
-        """
-        Récupère les KPIs principaux selon le cahier des charges
-        """
+    def invalider():
+        """Nouvelle version après commit : les snapshots de tous les profils sont périmés"""
+        cache_partage.invalider_apres_commit(DashboardService.CACHE_ETIQUETTE)
+    
+    @staticmethod
+    def get_snapshot(profil: str) -> Dict[str, Any]:
+        """KPIs du dashboard pour un profil, depuis le cache si à jour"""
+        today = timezone.localdate()
+        return cache_partage.obtenir(
+            'dashboard', ('snapshot', profil, today.isoformat()),
+            lambda: DashboardService.calculer_snapshot(profil, today),
+            DashboardService.CACHE_TIMEOUT, etiquettes=[DashboardService.CACHE_ETIQUETTE],
+        )
+    
+    @staticmethod
+    def calculer_snapshot(profil: str, today) -> Dict[str, Any]:
+        """Tous les KPIs du profil : une requête d'agrégats conditionnels par table"""
         # Import ici pour éviter les imports circulaires
         from apps.appartements.models import Appartement
         from apps.clients.models import Client
         from apps.reservations.models import Reservation
+        
+        premier_mois = today.replace(day=1)
+        
+        snapshot = Appartement.objects.aggregate(
+            total_appartements=Count('id'),
+            appartements_disponibles=Count('id', filter=Q(statut='disponible')),
+            appartements_occupes=Count('id', filter=Q(statut='occupe')),
+            appartements_maintenance=Count('id', filter=Q(statut='maintenance')),
+        )
+        snapshot.update(Client.objects.aggregate(
+            total_clients=Count('id'),
+            nouveaux_clients_mois=Count('id', filter=Q(date_creation__gte=premier_mois)),
+        ))
+        
+        if profil == 'receptionniste':
+            return snapshot
+        
         from apps.paiements.models import EcheancierPaiement
         from apps.inventaire.models import EquipementAppartement
         from apps.menage.models import TacheMenage
         
-        now = timezone.now()
-        today = now.date()
-        premier_mois = today.replace(day=1)
-        
-        return {
-            # Appartements
-            'total_appartements': Appartement.objects.count(),
-            'appartements_disponibles': Appartement.objects.filter(statut='disponible').count(),
-            'appartements_occupes': Appartement.objects.filter(statut='occupe').count(),
-            
-            # Clients
-            'total_clients': Client.objects.count(),
-            'nouveaux_clients_mois': Client.objects.filter(date_creation__gte=premier_mois).count(),
-            
-            # Réservations
-            'reservations_actives': Reservation.objects.filter(
+        snapshot.update(Reservation.objects.aggregate(
+            reservations_actives=Count('id', filter=Q(
                 statut__in=['confirmee', 'en_cours'],
                 date_arrivee__lte=today,
                 date_depart__gt=today
-            ).count(),
-            'reservations_ce_mois': Reservation.objects.filter(
+            )),
+            reservations_ce_mois=Count('id', filter=Q(
                 date_arrivee__year=today.year,
                 date_arrivee__month=today.month
-            ).count(),
-            'reservations_aujourd_hui': Reservation.objects.filter(date_arrivee=today).count(),
-            'arrivees_aujourd_hui': Reservation.objects.filter(date_arrivee=today).select_related('client', 'appartement'),
-            
-            # Paiements
-            'paiements_en_attente': EcheancierPaiement.objects.filter(statut='en_attente').count(),
-            'paiements_retard': EcheancierPaiement.objects.filter(
-                statut='en_attente',
-                date_echeance__lt=today
-            ).count(),
-            
-            # Inventaire
-            'total_equipements': EquipementAppartement.objects.count(),
-            'equipements_defectueux': EquipementAppartement.objects.filter(
-                etat__in=['defectueux', 'hors_service']
-            ).count(),
-            
-            # Ménage
-            'taches_menage_urgentes': TacheMenage.objects.filter(
-                statut='a_faire',
-                date_prevue__lte=today
-            ).count(),
-            
-            # Métadonnées
-            'mois_actuel': today,
-        }
+            )),
+            reservations_aujourd_hui=Count('id', filter=Q(date_arrivee=today)),
+        ))
+        snapshot.update(EcheancierPaiement.objects.aggregate(
+            paiements_en_attente=Count('id', filter=Q(statut='en_attente')),
+            paiements_retard=Count('id', filter=Q(statut='en_attente', date_echeance__lt=today)),
+        ))
+        snapshot.update(EquipementAppartement.objects.aggregate(
+            total_equipements=Count('id'),
+            equipements_defectueux=Count('id', filter=Q(etat__in=['defectueux', 'hors_service'])),
+        ))
+        snapshot['taches_menage_urgentes'] = TacheMenage.objects.filter(
+            statut='a_faire',
+            date_prevue__lte=today
+        ).count()
+        
+        snapshot['revenus_mois'] = DashboardService.get_revenus_mois(today.year, today.month)
+        snapshot['taux_occupation'] = DashboardService.get_taux_occupation_mois(today.year, today.month)
+        snapshot['jours_semaine'], snapshot['revenus_semaine'] = DashboardService.get_revenus_7_jours(today)
+        
+        if profil == 'super_admin':
+            snapshot.update(User.objects.aggregate(
+                total_gestionnaires=Count('id', filter=Q(profil='gestionnaire')),
+                gestionnaires_actifs=Count('id', filter=Q(profil='gestionnaire', is_active=True)),
+                super_admins=Count('id', filter=Q(profil='super_admin')),
+                total_receptionistes=Count('id', filter=Q(profil='receptionniste')),
+                receptionistes_actifs=Count('id', filter=Q(profil='receptionniste', is_active=True)),
+            ))
+        
+        return snapshot
+    
+    @staticmethod
+    def get_kpis_principaux() -> Dict[str, Any]:
+        """
+        Récupère les KPIs principaux selon le cahier des charges
+        """
+        return DashboardService.get_snapshot('gestionnaire')
+    
+    @staticmethod
+    def get_revenus_7_jours(today=None):
+        """Revenus encaissés des 7 derniers jours, lus dans la série journalière"""
+        from apps.comptabilite.models import SerieJournaliere
+        
+        today = today or timezone.localdate()
+        serie = SerieJournaliere.serie(today - timedelta(days=6), today, pas='jour')
+        return (
+            [ligne['periode'].strftime('%d/%m') for ligne in serie],
+            [float(ligne['encaissements']) for ligne in serie],
+        )
     
     @staticmethod
     def get_revenus_mois(annee: int, mois: int) -> float:
@@ -82,12 +128,11 @@ class DashboardService:
         Calcul simple des revenus selon cahier des charges
         """
         try:
-            from apps.comptabilite.models import ComptabiliteAppartement
-            revenus = ComptabiliteAppartement.objects.filter(
-                type_mouvement='revenu',
-                date_mouvement__year=annee,
-                date_mouvement__month=mois
-            ).aggregate(total=Sum('montant'))['total']
+            from apps.comptabilite.models import SyntheseMensuelle
+            revenus = SyntheseMensuelle.objects.filter(
+                annee=annee,
+                mois=mois
+            ).aggregate(total=Sum('revenus'))['total']
             return float(revenus) if revenus else 0.0
         except ImportError:
             # Si le modèle n'existe pas encore, calculer à partir des réservations
@@ -101,37 +146,9 @@ class DashboardService:
     
     @staticmethod
     def get_taux_occupation_mois(annee: int, mois: int) -> int:
-        """
-        Calcul simple du taux d'occupation selon cahier des charges
-        """
-        from apps.appartements.models import Appartement
-        from apps.reservations.models import Reservation
-        
-        total_appartements = Appartement.objects.count()
-        if total_appartements == 0:
-            return 0
-            
-        jours_mois = monthrange(annee, mois)[1]
-        nuits_totales_possibles = total_appartements * jours_mois
-        
-        # Compter les nuits réellement occupées
-        nuits_occupees = 0
-        for reservation in Reservation.objects.filter(
-            statut__in=['confirmee', 'en_cours', 'terminee'],
-            date_arrivee__year=annee,
-            date_arrivee__month=mois
-        ).select_related('appartement'):
-            # Intersection avec le mois
-            debut_mois = datetime(annee, mois, 1).date()
-            fin_mois = datetime(annee, mois, jours_mois).date()
-            
-            debut_sejour = max(reservation.date_arrivee, debut_mois)
-            fin_sejour = min(reservation.date_depart, fin_mois)
-            
-            if debut_sejour < fin_sejour:
-                nuits_occupees += (fin_sejour - debut_sejour).days
-        
-        return round((nuits_occupees / nuits_totales_possibles) * 100) if nuits_totales_possibles > 0 else 0
+        """Taux d'occupation du mois (nuits occupées / nuits possibles) selon cahier"""
+        from apps.reservations.occupation import OccupationService
+        return OccupationService.taux_occupation_mois(annee, mois)
 
 
 class PermissionsService:
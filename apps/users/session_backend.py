@@ -0,0 +1,82 @@
+# ==========================================
+# apps/users/session_backend.py - Sessions cache + base indexées par utilisateur
+# ==========================================
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import router
+
+from utils import cache as cache_partage
+
+
+class SessionStore(CachedDBStore):
+    """
+    Sessions lues en cache (Redis ou mémoire locale) et écrites en base.
+    Avec SESSION_SAVE_EVERY_REQUEST, une session inchangée n'est pas réécrite :
+    seule son expiration glisse (TTL du cache, puis date en base au plus une
+    fois par SESSION_ACTIVITE_INTERVALLE).
+
+    Si le cache des sessions est propre à chaque processus (LocMem), une
+    session supprimée par un worker resterait servie par les autres : tout
+    passe alors par la base, comme le moteur `db`.
+    """
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.partage = cache_partage.est_partage(settings.SESSION_CACHE_ALIAS)
+
+    @classmethod
+    def get_model_class(cls):
+        from .models import SessionUtilisateur
+        return SessionUtilisateur
+
+    def create_model_instance(self, data):
+        obj = super().create_model_instance(data)
+        try:
+            obj.user_id = int(data.get('_auth_user_id'))
+        except (TypeError, ValueError):
+            obj.user_id = None
+        return obj
+
+    def load(self):
+        if not self.partage:
+            return DBStore.load(self)
+        return super().load()
+
+    def exists(self, session_key):
+        if not self.partage:
+            return DBStore.exists(self, session_key)
+        return super().exists(session_key)
+
+    def delete(self, session_key=None):
+        if not self.partage:
+            return DBStore.delete(self, session_key)
+        return super().delete(session_key)
+
+    def save(self, must_create=False):
+        if not self.partage:
+            return DBStore.save(self, must_create=must_create)
+        if must_create or self.modified or self.session_key is None or not self.prolonger():
+            super().save(must_create=must_create)
+
+    def prolonger(self):
+        """Fait glisser l'expiration sans réécrire le contenu ; False si la session n'est plus en cache"""
+        expiration = self.get_expiry_age()
+        if not self._cache.touch(self.cache_key, expiration):
+            return False
+
+        # Date d'expiration en base rafraîchie par intervalle (une colonne, pas le contenu)
+        if self._cache.add(f'{self.cache_key}:prolongee', 1, settings.SESSION_ACTIVITE_INTERVALLE):
+            self.model.objects.using(router.db_for_write(self.model)).filter(
+                session_key=self.session_key
+            ).update(expire_date=self.get_expiry_date())
+        return True
+
+    @classmethod
+    def supprimer_sessions_utilisateur(cls, user_id, sauf=None):
+        """Supprime (cache et base) toutes les sessions d'un utilisateur, sauf `sauf`"""
+        cles = cls.get_model_class().objects.filter(user_id=user_id).exclude(
+            session_key=sauf or ''
+        ).values_list('session_key', flat=True)
+        for session_key in list(cles):
+            cls(session_key=session_key).delete()
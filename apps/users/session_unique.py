@@ -0,0 +1,65 @@
+# ==========================================
+# apps/users/session_unique.py - Registre utilisateur -> session active
+# ==========================================
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+def _cle_activite(user_id):
+    return f'users:activite:{user_id}'
+
+
+class RegistreSessions:
+    """
+    Session active de chaque utilisateur : la colonne users.session_key,
+    chargée avec l'utilisateur à chaque requête (aucune requête de plus,
+    identique pour tous les workers). La base n'est écrite qu'à la connexion
+    (ou si la clé change) ; la dernière activité au plus une fois par
+    SESSION_ACTIVITE_INTERVALLE, coalescée par le cache.
+    """
+
+    @staticmethod
+    def session_active(user):
+        """Clé de la session autorisée pour cet utilisateur (colonne déjà chargée)"""
+        return user.session_key or None
+
+    @staticmethod
+    def enregistrer(user, session_key):
+        """Nouvelle session active, écrite en base si elle a changé"""
+        if user.session_key != session_key:
+            user.session_key = session_key
+            user.save(update_fields=['session_key', 'derniere_activite'])
+            cache.set(_cle_activite(user.pk), 1, settings.SESSION_ACTIVITE_INTERVALLE)
+
+    @staticmethod
+    def liberer(user, session_key):
+        """Déconnexion : la session n'est plus active (sauf si une autre l'a remplacée)"""
+        if session_key and user.session_key == session_key:
+            user.session_key = None
+            user.save(update_fields=['session_key'])
+
+    @staticmethod
+    def fermer_autres_sessions(user, session_key):
+        """Supprime les autres sessions de l'utilisateur (index par utilisateur si le moteur l'offre)"""
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        if hasattr(SessionStore, 'supprimer_sessions_utilisateur'):
+            SessionStore.supprimer_sessions_utilisateur(user.pk, sauf=session_key)
+            return
+
+        ancienne = RegistreSessions.session_active(user)
+        if ancienne and ancienne != session_key:
+            SessionStore(session_key=ancienne).delete()
+
+    @staticmethod
+    def toucher(user):
+        """Dernière activité, au plus une écriture par intervalle et par utilisateur"""
+        intervalle = settings.SESSION_ACTIVITE_INTERVALLE
+        # cache.add est atomique : un seul des workers concurrents écrit
+        if not cache.add(_cle_activite(user.pk), 1, intervalle):
+            return False
+        if user.derniere_activite and (timezone.now() - user.derniere_activite).total_seconds() < intervalle:
+            return False
+        user.save(update_fields=['derniere_activite'])
+        return True
@@ -1,12 +1,14 @@
 # apps/users/signals.py
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.signals import request_finished
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.db import transaction
 import logging
 
-# Import du middleware pour récupérer l'utilisateur actuel
-from .middleware import get_current_user, get_current_request, get_client_ip
+from utils import cache as cache_partage
+
+# Journal d'audit en tampon (utilisateur / requête récupérés via le middleware)
+from . import audit
 
 logger = logging.getLogger(__name__)
 
@@ -14,18 +16,12 @@ logger = logging.getLogger(__name__)
 def log_user_login(sender, request, user, **kwargs):
     """Log des connexions"""
     try:
-        # Import local pour éviter les imports circulaires
-        from .models import ActionLog
-        
-        ActionLog.objects.create(
-            utilisateur=user,
-            action='login',
-            model_name='User',
+        audit.enregistrer(
+            'login', 'User',
             object_id=str(user.pk),
             object_repr=f"Connexion: {user.username}",
-            ip_address=get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', '') if request else '',
-            url=request.get_full_path() if request else '',
+            utilisateur=user,
+            request=request,
             method='POST',
         )
     except Exception as e:
@@ -36,17 +32,12 @@ def log_user_logout(sender, request, user, **kwargs):
     """Log des déconnexions"""
     if user:
         try:
-            from .models import ActionLog
-            
-            ActionLog.objects.create(
-                utilisateur=user,
-                action='logout',
-                model_name='User',
+            audit.enregistrer(
+                'logout', 'User',
                 object_id=str(user.pk),
                 object_repr=f"Déconnexion: {user.username}",
-                ip_address=get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', '') if request else '',
-                url=request.get_full_path() if request else '',
+                utilisateur=user,
+                request=request,
                 method='GET',
             )
         except Exception as e:
@@ -54,12 +45,9 @@ def log_user_logout(sender, request, user, **kwargs):
 
 @receiver(post_save)
 def log_model_save(sender, instance, created, **kwargs):
-    """Log création/modification avec utilisateur"""
-    # Import local pour éviter les imports circulaires
-    from .models import ActionLog
-    
-    # Éviter la récursion infinie
-    if sender == ActionLog:
+    """Log création/modification avec utilisateur (mis en tampon, écrit en fin de requête)"""
+    # Modèles exclus du journal (ActionLog lui-même, tables techniques...)
+    if not audit.est_audite(sender):
         return
     
     # Ne pas logger pendant les migrations
@@ -70,40 +58,25 @@ def log_model_save(sender, instance, created, **kwargs):
     if kwargs.get('update_fields') == frozenset():
         return
     
+    # Champs techniques (session, dernière activité) : pas une action à journaliser
+    if audit.modification_ignoree(sender, kwargs.get('update_fields')):
+        return
+    
     try:
-        # Récupérer l'utilisateur actuel via le middleware
-        current_user = get_current_user()
-        current_request = get_current_request()
-        
-        # Informations de la requête si disponible
-        ip_address = get_client_ip(current_request) if current_request else None
-        user_agent = current_request.META.get('HTTP_USER_AGENT', '') if current_request else ''
-        url = current_request.get_full_path() if current_request else ''
-        method = current_request.method if current_request else ''
-        
-        with transaction.atomic():
-            ActionLog.objects.create(
-                utilisateur=current_user,
-                action='create' if created else 'update',
-                model_name=sender.__name__,
-                object_id=str(instance.pk),
-                object_repr=str(instance)[:200],
-                ip_address=ip_address,
-                user_agent=user_agent,
-                url=url,
-                method=method,
-                details=f'{{"created": {str(created).lower()}, "model": "{sender._meta.verbose_name}"}}'
-            )
+        audit.enregistrer(
+            'create' if created else 'update',
+            sender.__name__,
+            object_id=str(instance.pk),
+            object_repr=str(instance),
+            details=f'{{"created": {str(created).lower()}, "model": "{sender._meta.verbose_name}"}}'
+        )
     except Exception as e:
         logger.error(f"Erreur lors du logging de sauvegarde pour {sender.__name__}: {e}")
 
 @receiver(post_delete)
 def log_model_delete(sender, instance, **kwargs):
-    """Log suppression avec utilisateur"""
-    from .models import ActionLog
-    
-    # Éviter la récursion infinie
-    if sender == ActionLog:
+    """Log suppression avec utilisateur (mis en tampon, écrit en fin de requête)"""
+    if not audit.est_audite(sender):
         return
     
     # Ne pas logger pendant les migrations
@@ -111,30 +84,60 @@ def log_model_delete(sender, instance, **kwargs):
         return
     
     try:
-        current_user = get_current_user()
-        current_request = get_current_request()
-        
-        # Informations de la requête si disponible
-        ip_address = get_client_ip(current_request) if current_request else None
-        user_agent = current_request.META.get('HTTP_USER_AGENT', '') if current_request else ''
-        url = current_request.get_full_path() if current_request else ''
-        method = current_request.method if current_request else ''
-        
-        ActionLog.objects.create(
-            utilisateur=current_user,
-            action='delete',
-            model_name=sender.__name__,
+        audit.enregistrer(
+            'delete',
+            sender.__name__,
             object_id=str(instance.pk),
-            object_repr=str(instance)[:200],
-            ip_address=ip_address,
-            user_agent=user_agent,
-            url=url,
-            method=method,
+            object_repr=str(instance),
             details=f'{{"model": "{sender._meta.verbose_name}"}}'
         )
     except Exception as e:
         logger.error(f"Erreur lors du logging de suppression pour {sender.__name__}: {e}")
 
+@receiver(request_finished)
+def vider_journal_audit(sender, **kwargs):
+    """Garantit l'écriture du tampon d'audit à la fin de chaque requête"""
+    audit.vider()
+
+# ==========================================
+# Invalidation du snapshot des dashboards
+# ==========================================
+MODELES_DASHBOARD = (
+    'appartements.Appartement',
+    'clients.Client',
+    'reservations.Reservation',
+    'paiements.EcheancierPaiement',
+    'inventaire.EquipementAppartement',
+    'menage.TacheMenage',
+    'comptabilite.ComptabiliteAppartement',
+)
+
+
+def invalider_dashboard(sender, **kwargs):
+    """Toute écriture sur un modèle compté par les dashboards périme le snapshot"""
+    if kwargs.get('raw', False):
+        return
+    from .services import DashboardService
+    DashboardService.invalider()
+
+
+cache_partage.invalider_sur_modification(['dashboard'], *MODELES_DASHBOARD)
+
+
+@receiver(post_save, sender='users.User', dispatch_uid='dashboard_save_user')
+def invalider_dashboard_utilisateur(sender, instance, created, **kwargs):
+    """Comptes par profil : seulement si le profil ou l'activation change (pas à chaque requête)"""
+    etat = (instance.profil, instance.is_active)
+    if created or getattr(instance, '_etat_dashboard', None) != etat:
+        invalider_dashboard(sender, **kwargs)
+    instance._etat_dashboard = etat
+
+
+@receiver(post_delete, sender='users.User', dispatch_uid='dashboard_delete_user')
+def invalider_dashboard_suppression_utilisateur(sender, **kwargs):
+    invalider_dashboard(sender, **kwargs)
+
+
 # ==========================================
 # Décorateur pour actions manuelles
 # ==========================================
@@ -147,18 +150,12 @@ def log_action(action, model_name, object_repr, object_id=None):
             # Logger l'action si succès
             try:
                 if hasattr(request, 'user') and request.user.is_authenticated:
-                    from .models import ActionLog
-                    
-                    ActionLog.objects.create(
-                        utilisateur=request.user,
-                        action=action,
-                        model_name=model_name,
+                    audit.enregistrer(
+                        action, model_name,
                         object_id=str(object_id) if object_id else '',
                         object_repr=object_repr,
-                        ip_address=get_client_ip(request),
-                        user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                        url=request.get_full_path(),
-                        method=request.method,
+                        utilisateur=request.user,
+                        request=request,
                     )
             except Exception as e:
                 logger.error(f"Erreur lors du logging manuel d'action: {e}")
@@ -169,19 +166,24 @@ def log_action(action, model_name, object_repr, object_id=None):
 
 # apps/users/signals.py
 from django.contrib.auth.signals import user_logged_in
-from django.contrib.sessions.models import Session
 
 def on_user_logged_in(sender, user, request, **kwargs):
-    # Supprimer autres sessions
-    Session.objects.filter(session_data__contains=f'"_auth_user_id":"{user.pk}"').exclude(
-        session_key=request.session.session_key
-    ).delete()
+    from .session_unique import RegistreSessions
     
-    user.session_key = request.session.session_key
-    user.save()
+    # Supprimer la session précédente puis enregistrer la nouvelle
+    RegistreSessions.fermer_autres_sessions(user, request.session.session_key)
+    RegistreSessions.enregistrer(user, request.session.session_key)
 
 user_logged_in.connect(on_user_logged_in)
 
+def on_user_logged_out(sender, user, request, **kwargs):
+    from .session_unique import RegistreSessions
+
+    if user and request is not None:
+        RegistreSessions.liberer(user, request.session.session_key)
+
+user_logged_out.connect(on_user_logged_out)
+
 def log_model_change(sender, instance, created, **kwargs):
     # Récupérer l'utilisateur depuis le middleware ou request
     user = getattr(instance, '_current_user', None)
@@ -32,6 +32,7 @@ urlpatterns = [
     path('historique/', views.historique_activites, name='historique'),
 
     path('audit/journal/', views.journal_actions, name='journal_actions'),
+    path('audit/journal/export/', views.export_journal, name='export_journal'),
     path('audit/stats/', views.statistiques_audit, name='statistiques_audit'),
 
 ]
\ No newline at end of file
@@ -12,6 +12,7 @@ from django.core.paginator import Paginator
 
 from apps.users.forms import GestionnaireCreationForm, ProfilUtilisateurForm, ReceptionnisteCreationForm
 from apps.users.models import User
+from apps.users.services import DashboardService
 
 def is_gestionnaire(user):
     """Vérifier si l'utilisateur est gestionnaire ou super admin"""
@@ -38,7 +39,7 @@ class DashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
 
     def dispatch(self, request, *args, **kwargs):
         # Rediriger les réceptionnistes vers leur dashboard simplifié
-        if request.user.profil == 'receptionniste':
+        if getattr(request.user, 'profil', None) == 'receptionniste':
             return redirect('users:dashboard_receptionniste')
         # Les gestionnaires et super_admin continuent vers le dashboard complet
         return super().dispatch(request, *args, **kwargs)
@@ -46,71 +47,18 @@ class DashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Importer les modèles ici pour éviter les imports circulaires
-        from apps.appartements.models import Appartement
-        from apps.clients.models import Client
-        from apps.reservations.models import Reservation
-        from apps.paiements.models import EcheancierPaiement
-        from apps.inventaire.models import EquipementAppartement
-        from apps.menage.models import TacheMenage
-        
-        now = timezone.now()
-        today = now.date()
-        premier_mois = today.replace(day=1)
-        
-        # KPIs principaux selon cahier
+        # KPIs principaux selon cahier : snapshot en cache par profil
+        snapshot = DashboardService.get_snapshot(self.request.user.profil)
+        context.update(snapshot)
         context.update({
-            # Appartements
-            'total_appartements': Appartement.objects.count(),
-            'appartements_disponibles': Appartement.objects.filter(statut='disponible').count(),
-            'appartements_occupes': Appartement.objects.filter(statut='occupe').count(),
-            'appartements_maintenance': Appartement.objects.filter(statut='maintenance').count(),
-            
-            # Clients
-            'total_clients': Client.objects.count(),
-            'nouveaux_clients_mois': Client.objects.filter(date_creation__gte=premier_mois).count(),
-            
-            # Réservations
-            'reservations_actives': Reservation.objects.filter(
-                statut__in=['confirmee', 'en_cours'],
-                date_arrivee__lte=today,
-                date_depart__gt=today
-            ).count(),
-            'reservations_ce_mois': Reservation.objects.filter(
-                date_arrivee__year=today.year,
-                date_arrivee__month=today.month
-            ).count(),
-            'reservations_aujourd_hui': Reservation.objects.filter(date_arrivee=today).count(),
-            'arrivees_aujourd_hui': Reservation.objects.filter(date_arrivee=today),
-            
-            # Paiements
-            'paiements_en_attente': EcheancierPaiement.objects.filter(statut='en_attente').count(),
-            'paiements_retard': EcheancierPaiement.objects.filter(
-                statut='en_attente',
-                date_echeance__lt=today
-            ).count(),
-            
-            # Inventaire
-            'total_equipements': EquipementAppartement.objects.count(),
-            'equipements_defectueux': EquipementAppartement.objects.filter(
-                etat__in=['defectueux', 'hors_service']
-            ).count(),
-            
-            # Ménage
-            'taches_menage_urgentes': TacheMenage.objects.filter(
-                statut='a_faire',
-                date_prevue__lte=today
-            ).count(),
-            
-            # Calculs financiers simples selon cahier
-            'revenus_mois': self.get_revenus_mois(today.year, today.month),
-            'taux_occupation': self.get_taux_occupation_mois(today.year, today.month),
-            
             # Métadonnées
-            'mois_actuel': today,
+            'mois_actuel': timezone.localdate(),
+            # Données pour le graphique des revenus
+            'jours_semaine': json.dumps(snapshot['jours_semaine']),
+            'revenus_semaine': json.dumps(snapshot['revenus_semaine']),
         })
         
-        # Actions récentes pour le dashboard (8 dernières actions)
+        # Actions récentes pour le dashboard (8 dernières actions, toujours à jour)
         try:
             from .models import ActionLog
             actions_recentes = ActionLog.objects.select_related('utilisateur').order_by('-timestamp')[:8]
@@ -119,104 +67,7 @@ class DashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             # Si le modèle ActionLog n'existe pas encore
             context['actions_recentes'] = []
         
-        # Stats spécifiques aux Super Admin
-        if self.request.user.profil == 'super_admin':
-            context.update({
-                'total_gestionnaires': User.objects.filter(profil='gestionnaire').count(),
-                'gestionnaires_actifs': User.objects.filter(
-                    profil='gestionnaire',
-                    is_active=True
-                ).count(),
-                'super_admins': User.objects.filter(profil='super_admin').count(),
-                'total_receptionistes': User.objects.filter(profil='receptionniste').count(),
-                'receptionistes_actifs': User.objects.filter(
-                    profil='receptionniste',
-                    is_active=True
-                ).count(),
-            })
-        
-        # Données pour le graphique des revenus (exemple)
-        jours_semaine, revenus_semaine = self.get_revenus_7_jours()
-        context.update({
-            'jours_semaine': json.dumps(jours_semaine),
-            'revenus_semaine': json.dumps(revenus_semaine),
-        })
         return context
-    
-    def get_revenus_mois(self, annee, mois):
-        """Calcul simple des revenus selon cahier"""
-        try:
-            from apps.comptabilite.models import ComptabiliteAppartement
-            revenus = ComptabiliteAppartement.objects.filter(
-                type_mouvement='revenu',
-                date_mouvement__year=annee,
-                date_mouvement__month=mois
-            ).aggregate(total=Sum('montant'))['total']
-            return float(revenus) if revenus else 0.0
-        except ImportError:
-            # Si le modèle n'existe pas encore, calculer à partir des réservations
-            from apps.reservations.models import Reservation
-            reservations = Reservation.objects.filter(
-                statut__in=['confirmee', 'en_cours', 'terminee'],
-                date_arrivee__year=annee,
-                date_arrivee__month=mois
-            ).aggregate(total=Sum('prix_total'))['total']
-            return float(reservations) if reservations else 0.0
-    
-    def get_taux_occupation_mois(self, annee, mois):
-        """Calcul simple du taux d'occupation selon cahier"""
-        from apps.appartements.models import Appartement
-        from apps.reservations.models import Reservation
-        from calendar import monthrange
-        
-        total_appartements = Appartement.objects.count()
-        if total_appartements == 0:
-            return 0
-            
-        jours_mois = monthrange(annee, mois)[1]
-        nuits_totales_possibles = total_appartements * jours_mois
-        
-        # Compter les nuits réellement occupées
-        nuits_occupees = 0
-        for reservation in Reservation.objects.filter(
-            statut__in=['confirmee', 'en_cours', 'terminee'],
-            date_arrivee__year=annee,
-            date_arrivee__month=mois
-        ):
-            # Intersection avec le mois
-            debut_mois = datetime(annee, mois, 1).date()
-            fin_mois = datetime(annee, mois, jours_mois).date()
-            
-            debut_sejour = max(reservation.date_arrivee, debut_mois)
-            fin_sejour = min(reservation.date_depart, fin_mois)
-            
-            if debut_sejour < fin_sejour:
-                nuits_occupees += (fin_sejour - debut_sejour).days
-        
-        return round((nuits_occupees / nuits_totales_possibles) * 100) if nuits_totales_possibles > 0 else 0
-    
-    def get_revenus_7_jours(self):
-        """Calcul des revenus réels des 7 derniers jours"""
-        from apps.paiements.models import EcheancierPaiement
-        from datetime import timedelta
-        
-        today = timezone.now().date()
-        jours = []
-        revenus = []
-        
-        for i in range(7):
-            jour = today - timedelta(days=6-i)
-            jours.append(jour.strftime('%d/%m'))
-            
-            # Revenus du jour
-            revenus_jour = EcheancierPaiement.objects.filter(
-                statut='paye',
-                date_paiement=jour
-            ).aggregate(total=Sum('montant_paye'))['total'] or 0
-            
-            revenus.append(float(revenus_jour))
-        
-        return jours, revenus
 
 
 class DashboardReceptionnisteView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
@@ -232,35 +83,29 @@ class DashboardReceptionnisteView(LoginRequiredMixin, UserPassesTestMixin, Templ
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Importer les modèles
-        from apps.appartements.models import Appartement
-        from apps.clients.models import Client
         from apps.reservations.models import Reservation
 
-        now = timezone.now()
-        today = now.date()
+        today = timezone.localdate()
 
-        # Informations de base pour le réceptionniste
-        context.update({
-            # Statistiques simples
-            'total_appartements': Appartement.objects.count(),
-            'appartements_disponibles': Appartement.objects.filter(statut='disponible').count(),
-            'total_clients': Client.objects.count(),
+        # Statistiques simples (snapshot en cache)
+        context.update(DashboardService.get_snapshot('receptionniste'))
 
+        # Informations de base pour le réceptionniste (listes toujours à jour)
+        context.update({
             # Arrivées et départs du jour
-            'arrivees_aujourd_hui': Reservation.objects.filter(
+            'arrivees_aujourd_hui': list(Reservation.objects.filter(
                 date_arrivee=today,
                 statut='confirmee'
-            ).select_related('client', 'appartement'),
-            'departs_aujourd_hui': Reservation.objects.filter(
+            ).select_related('client', 'appartement')),
+            'departs_aujourd_hui': list(Reservation.objects.filter(
                 date_depart=today,
                 statut='en_cours'
-            ).select_related('client', 'appartement'),
+            ).select_related('client', 'appartement')),
 
             # Dernières réservations créées
-            'dernieres_reservations': Reservation.objects.select_related(
+            'dernieres_reservations': list(Reservation.objects.select_related(
                 'client', 'appartement'
-            ).order_by('-date_creation')[:5],
+            ).order_by('-date_creation')[:5]),
 
             # Métadonnées
             'date_jour': today,
@@ -503,14 +348,10 @@ def journal_actions(request):
     model_filter = request.GET.get('model', '')
     user_filter = request.GET.get('user', '')
     
-    logs = ActionLog.objects.select_related('utilisateur').order_by('-timestamp')
-    
-    if action_filter:
-        logs = logs.filter(action=action_filter)
-    if model_filter:
-        logs = logs.filter(model_name__icontains=model_filter)
-    if user_filter:
-        logs = logs.filter(utilisateur__username__icontains=user_filter)
+    logs = _filtrer_journal(
+        ActionLog.objects.select_related('utilisateur').order_by('-timestamp'),
+        action_filter, model_filter, user_filter
+    )
     
     # Pagination
     from django.core.paginator import Paginator
@@ -527,28 +368,60 @@ def journal_actions(request):
     }
     return render(request, 'users/journal_actions.html', context)
 
+def _filtrer_journal(logs, action_filter, model_filter, user_filter):
+    """Filtres communs au journal et à son export"""
+    if action_filter:
+        logs = logs.filter(action=action_filter)
+    if model_filter:
+        logs = logs.filter(model_name__icontains=model_filter)
+    if user_filter:
+        logs = logs.filter(utilisateur__username__icontains=user_filter)
+    return logs
+
+@login_required
+@user_passes_test(is_super_admin)
+def export_journal(request):
+    """Export CSV / XLSX du journal des actions - Admin seulement"""
+    from .models import ActionLog
+    from .exports import EXPORT_JOURNAL
+    from utils.exports import get_format_export, reponse_export
+    
+    logs = _filtrer_journal(
+        ActionLog.objects.order_by('-timestamp'),
+        request.GET.get('action', ''),
+        request.GET.get('model', ''),
+        request.GET.get('user', '')
+    )
+    return reponse_export(EXPORT_JOURNAL, logs, get_format_export(request))
+
 @login_required  
 @user_passes_test(is_super_admin)
 def statistiques_audit(request):
-    """Statistiques d'audit"""
-    from .models import ActionLog
-    from django.db.models import Count
-    from datetime import timedelta
+    """Statistiques d'audit (compteurs journaliers précalculés)"""
+    from .models import StatistiqueAudit
     
-    today = timezone.now().date()
+    today = timezone.localdate()
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
     
+    compteurs = StatistiqueAudit.objects.all()
+    periodes = compteurs.aggregate(
+        total=Sum('nombre'),
+        today=Sum('nombre', filter=Q(date=today)),
+        week=Sum('nombre', filter=Q(date__gte=week_ago)),
+        month=Sum('nombre', filter=Q(date__gte=month_ago)),
+    )
+    
     stats = {
-        'total_actions': ActionLog.objects.count(),
-        'actions_today': ActionLog.objects.filter(timestamp__date=today).count(),
-        'actions_week': ActionLog.objects.filter(timestamp__date__gte=week_ago).count(),
-        'actions_month': ActionLog.objects.filter(timestamp__date__gte=month_ago).count(),
-        'actions_by_type': ActionLog.objects.values('action').annotate(count=Count('action')),
-        'actions_by_user': ActionLog.objects.filter(
+        'total_actions': periodes['total'] or 0,
+        'actions_today': periodes['today'] or 0,
+        'actions_week': periodes['week'] or 0,
+        'actions_month': periodes['month'] or 0,
+        'actions_by_type': compteurs.values('action').annotate(count=Sum('nombre')).order_by('-count'),
+        'actions_by_user': compteurs.filter(
             utilisateur__isnull=False
-        ).values('utilisateur__username').annotate(count=Count('utilisateur')).order_by('-count')[:10],
-        'actions_by_model': ActionLog.objects.values('model_name').annotate(count=Count('model_name')).order_by('-count')[:10],
+        ).values('utilisateur__username').annotate(count=Sum('nombre')).order_by('-count')[:10],
+        'actions_by_model': compteurs.values('model_name').annotate(count=Sum('nombre')).order_by('-count')[:10],
     }
     
     return render(request, 'users/statistiques_audit.html', {'stats': stats})
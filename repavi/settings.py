@@ -164,16 +164,46 @@ if DEBUG and not config('DB_PASSWORD', default=''):
     }
 
 # === CACHE ===
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'repavi-cache',
-        'TIMEOUT': 300,
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000
-        }
+# Cache partagé entre workers (Redis) : les invalidations par étiquette
+# (utils/cache.py) sont alors vues par tous les processus. Sans REDIS_URL,
+# cache mémoire local : valable pour un seul processus (runserver, 1 worker).
+if config('REDIS_URL', default=''):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+            'KEY_PREFIX': 'repavi',
+            'TIMEOUT': 300,
+        },
+        # Sessions (cached_db) : même serveur, espace de clés séparé
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+            'KEY_PREFIX': 'repavi-sessions',
+        },
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'repavi-cache',
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000
+            }
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'repavi-sessions',
+            'OPTIONS': {
+                'MAX_ENTRIES': 5000
+            }
+        },
+    }
+
+# Diffusion temps réel des notifications (SSE) : Redis pub/sub si configuré,
+# sinon diffusion en mémoire (valable pour un seul processus serveur)
+NOTIFICATIONS_REDIS_URL = config('REDIS_URL', default='')
 
 # === VALIDATION DES MOTS DE PASSE SÉCURISÉS selon cahier ===
 AUTH_PASSWORD_VALIDATORS = [
@@ -254,6 +284,11 @@ SESSION_COOKIE_SAMESITE = 'Strict'
 SESSION_COOKIE_AGE = 7200  # 2 heures selon cahier des charges
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Fermeture navigateur = déconnexion
 SESSION_SAVE_EVERY_REQUEST = True
+# Sessions cache + base, indexées par utilisateur (apps/users/session_backend.py)
+SESSION_ENGINE = 'apps.users.session_backend'
+SESSION_CACHE_ALIAS = 'sessions'
+# Dernière activité des utilisateurs écrite au plus une fois par intervalle (secondes)
+SESSION_ACTIVITE_INTERVALLE = config('SESSION_ACTIVITE_INTERVALLE', default=300, cast=int)
 
 # Headers de sécurité
 SECURE_BROWSER_XSS_FILTER = True
@@ -406,6 +441,33 @@ if IS_PRODUCTION:
         ]),
     ]
 
+# === JOURNAL D'AUDIT (ActionLog) ===
+# Les actions sont mises en tampon puis écrites par lots (bulk_create)
+# en fin de requête. Modèles désignés par 'app_label' ou 'app_label.Model'.
+AUDIT_LOG = {
+    'INCLURE': [],  # Si non vide : seuls ces modèles sont journalisés
+    'EXCLURE': [
+        'users.ActionLog',
+        'sessions',
+        'users.SessionUtilisateur',
+        'contenttypes',
+        'admin',
+        'axes',
+        'reservations.OccupationJournaliere',   # Tables dérivées (recalculables)
+        'comptabilite.SyntheseMensuelle',
+        'comptabilite.SerieJournaliere',
+        'users.StatistiqueAudit',              # Agrégats du journal lui-même
+        'facturation.SequenceFacture',         # Compteur de numérotation
+        'notifications.EmailSortant',          # Files de tâches techniques
+        'facturation.TacheRenduPDF',
+        'facturation.LotFactures',
+    ],
+    'TAILLE_LOT': 200,   # Écriture forcée au-delà de N actions en attente
+    'DELAI_MAX': 5,      # ... ou si la plus ancienne attend depuis N secondes
+    'RETENTION_MOIS': 6,  # Mois conservés en base, les plus anciens sont archivés
+    'ARCHIVE_DIR': BASE_DIR / 'backups' / 'journal',  # Archives gzip JSONL par mois
+}
+
 # === SAUVEGARDES AUTOMATIQUES selon cahier ===
 # Configuration pour sauvegardes quotidiennes automatiques
 BACKUP_SETTINGS = {
@@ -678,4 +740,6 @@ if DEBUG:
 TEMPLATES[0]['OPTIONS']['context_processors'].extend([
     # Ajouté pour avoir accès aux settings FACTURE dans les templates
     'apps.facturation.context_processors.facture_settings',
+    # Compteur de notifications non lues (cache, sans requête)
+    'utils.context_processors.notifications_count',
 ])
@@ -1,10 +1,12 @@
 # services/maison_service.py
+import hashlib
+
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
 from django.utils.text import slugify
 from home import models
 from home.models import Maison, PhotoMaison
-from django.core.cache import cache
+from utils import cache as cache_partage
 
 
 class MaisonService:
@@ -61,22 +63,16 @@ class MaisonService:
     @staticmethod
     def get_maisons_for_user(user):
         """Récupérer les maisons selon les permissions utilisateur"""
-        cache_key = f"maisons_user_{user.id}_{user.role}"
-        maisons = cache.get(cache_key)
-        
-        if not maisons:
-            maisons = Maison.objects.accessible_to_user(user).with_photos_and_reservations()
-            cache.set(cache_key, maisons, 300)  # 5 minutes
-        
-        return maisons
+        return cache_partage.obtenir(
+            'maisons', ('user', user.id, user.role),
+            lambda: Maison.objects.accessible_to_user(user).with_photos_and_reservations(),
+            300, etiquettes=['maisons'],  # 5 minutes
+        )
     
     @staticmethod
     def search_maisons(query, user=None, filters=None):
         """Recherche de maisons avec filtres"""
-        cache_key = f"search_{hash(query)}_{user.id if user else 'anon'}_{hash(str(filters))}"
-        results = cache.get(cache_key)
-        
-        if not results:
+        def rechercher():
             queryset = Maison.objects.accessible_to_user(user) if user else Maison.objects.available_for_clients()
             
             if query:
@@ -96,10 +92,14 @@ class MaisonService:
                 if filters.get('prix_max'):
                     queryset = queryset.filter(prix_par_nuit__lte=filters['prix_max'])
             
-            results = queryset[:20]  # Limiter à 20 résultats
-            cache.set(cache_key, results, 180)  # 3 minutes
+            return queryset[:20]  # Limiter à 20 résultats
         
-        return results
+        # hash() varie d'un processus à l'autre : clé stable pour un cache partagé
+        parametres = hashlib.md5(f'{query}|{filters}'.encode()).hexdigest()
+        return cache_partage.obtenir(
+            'maisons', ('search', user.id if user else 'anon', parametres),
+            rechercher, 180, etiquettes=['maisons'],  # 3 minutes
+        )
     
     @staticmethod
     def _generate_unique_slug(nom):
@@ -116,10 +116,7 @@ class MaisonService:
     
     @staticmethod
     def _invalidate_cache():
-        """Invalider les caches liés aux maisons"""
-        cache.delete_many([
-            key for key in cache._cache.keys() 
-            if key.startswith('maisons_') or key.startswith('search_')
-        ])
+        """Invalider les caches liés aux maisons (tous les processus)"""
+        cache_partage.invalider('maisons')
 
 
@@ -0,0 +1,58 @@
+// ==========================================
+// static/js/notifications.js - Notifications en temps réel (Server-Sent Events)
+// ==========================================
+(function () {
+    'use strict';
+
+    if (!window.EventSource) {
+        return;
+    }
+
+    const badge = document.getElementById('notifications-badge');
+    const url = document.body.dataset.notificationsFlux;
+    if (!url) {
+        return;
+    }
+
+    let source = null;
+
+    function mettreAJourBadge(count) {
+        if (!badge) {
+            return;
+        }
+        badge.classList.toggle('hidden', !count);
+        badge.title = count + ' non lue(s)';
+    }
+
+    function ouvrir() {
+        if (source) {
+            return;
+        }
+        source = new EventSource(url);
+        source.addEventListener('notifications', function (event) {
+            const donnees = JSON.parse(event.data);
+            mettreAJourBadge(donnees.unread_count);
+            document.dispatchEvent(new CustomEvent('repavi:notifications', { detail: donnees }));
+        });
+    }
+
+    function fermer() {
+        if (source) {
+            source.close();
+            source = null;
+        }
+    }
+
+    // Pas de connexion ouverte pour les onglets en arrière-plan
+    document.addEventListener('visibilitychange', function () {
+        if (document.hidden) {
+            fermer();
+        } else {
+            ouvrir();
+        }
+    });
+
+    if (!document.hidden) {
+        ouvrir();
+    }
+})();
@@ -0,0 +1,186 @@
+# ==========================================
+# utils/cache.py - Cache partagé : clés par domaine, versions par étiquette, métriques
+# ==========================================
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Domaines connus (préfixe des clés et des étiquettes)
+DOMAINES = ('calendrier', 'dashboard', 'parametres', 'notifications', 'maisons')
+
+_ABSENT = object()
+
+# Compteurs succès/échecs du processus, reportés dans le cache partagé par paquets
+_compteurs = Counter()
+_verrou = threading.Lock()
+_dernier_report = [time.monotonic()]
+REPORT_TAILLE = 50
+REPORT_DELAI = 10
+
+
+def est_partage(alias='default'):
+    """
+    Le cache `alias` est-il commun à tous les processus (Redis...) ?
+    Sans lui (LocMem), une invalidation n'est vue que par le processus qui l'émet.
+    """
+    from django.core.cache import caches
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def cle(domaine, *parties):
+    """Clé d'un domaine : 'dashboard:snapshot:gestionnaire:2024-06-01'"""
+    return ':'.join([domaine, *(str(partie) for partie in parties)])
+
+
+# ==========================================
+# Versions par étiquette
+# ==========================================
+def _cle_version(etiquette):
+    return f'version:{etiquette}'
+
+
+def _version_initiale():
+    # Horodatée : une version évincée du cache ne retombe jamais sur d'anciennes valeurs
+    return int(time.time() * 1000)
+
+
+def versions(*etiquettes):
+    """Versions courantes des étiquettes, lues en un aller-retour"""
+    cles = {_cle_version(etiquette): etiquette for etiquette in etiquettes}
+    trouvees = cache.get_many(list(cles))
+    resultat = {}
+    for cle_version, etiquette in cles.items():
+        version = trouvees.get(cle_version)
+        if version is None:
+            version = cache.get_or_set(cle_version, _version_initiale, None)
+        resultat[etiquette] = version
+    return resultat
+
+
+def version(etiquette):
+    return versions(etiquette)[etiquette]
+
+
+def invalider(*etiquettes):
+    """Périme tout ce qui dépend de ces étiquettes, pour tous les processus"""
+    for etiquette in etiquettes:
+        try:
+            cache.incr(_cle_version(etiquette))
+        except ValueError:
+            cache.set(_cle_version(etiquette), _version_initiale(), None)
+
+
+def invalider_apres_commit(*etiquettes):
+    transaction.on_commit(lambda: invalider(*etiquettes))
+
+
+def invalider_sur_modification(etiquettes, *modeles):
+    """
+    Branche post_save/post_delete des modèles sur l'invalidation des étiquettes.
+    `etiquettes` : liste fixe, ou fonction (instance) -> liste.
+    """
+    from django.db.models.signals import post_delete, post_save
+
+    def recepteur(sender, instance, **kwargs):
+        if kwargs.get('raw', False):
+            return
+        cibles = etiquettes(instance) if callable(etiquettes) else etiquettes
+        if cibles:
+            invalider_apres_commit(*cibles)
+
+    ident = etiquettes.__qualname__ if callable(etiquettes) else ','.join(etiquettes)
+    for modele in modeles:
+        nom = modele if isinstance(modele, str) else modele._meta.label
+        uid = f'cache:{nom}:{ident}'
+        post_save.connect(recepteur, sender=modele, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(recepteur, sender=modele, weak=False, dispatch_uid=f'{uid}:delete')
+    return recepteur
+
+
+# ==========================================
+# Lecture avec calcul sur absence
+# ==========================================
+def obtenir(domaine, parties, calcul, timeout, etiquettes=()):
+    """
+    Valeur en cache sous la clé du domaine ; la clé embarque la version de
+    chaque étiquette, donc une invalidation rend l'ancienne valeur inaccessible.
+    """
+    if etiquettes:
+        courantes = versions(*etiquettes)
+        parties = (*parties, '-'.join(str(courantes[etiquette]) for etiquette in etiquettes))
+    cle_valeur = cle(domaine, *parties)
+
+    valeur = cache.get(cle_valeur, _ABSENT)
+    compter(domaine, valeur is not _ABSENT)
+    if valeur is _ABSENT:
+        valeur = calcul()
+        cache.set(cle_valeur, valeur, timeout)
+    return valeur
+
+
+# ==========================================
+# Métriques
+# ==========================================
+def _cle_statistique(domaine, resultat):
+    return f'statistiques:{domaine}:{resultat}'
+
+
+def compter(domaine, succes):
+    """Note un succès (hit) ou un échec (miss) de lecture pour le domaine"""
+    with _verrou:
+        _compteurs[(domaine, 'hits' if succes else 'misses')] += 1
+        doit_reporter = (
+            sum(_compteurs.values()) >= REPORT_TAILLE
+            or time.monotonic() - _dernier_report[0] >= REPORT_DELAI
+        )
+    if doit_reporter:
+        reporter()
+
+
+def reporter():
+    """Ajoute les compteurs du processus aux totaux partagés"""
+    with _verrou:
+        a_reporter = dict(_compteurs)
+        _compteurs.clear()
+        _dernier_report[0] = time.monotonic()
+
+    for (domaine, resultat), nombre in a_reporter.items():
+        cle_statistique = _cle_statistique(domaine, resultat)
+        try:
+            cache.incr(cle_statistique, nombre)
+        except ValueError:
+            if not cache.add(cle_statistique, nombre, None):
+                cache.incr(cle_statistique, nombre)
+
+
+def statistiques():
+    """{domaine: {'hits', 'misses', 'taux'}} cumulés sur tous les processus"""
+    reporter()
+    cles = [_cle_statistique(domaine, resultat) for domaine in DOMAINES for resultat in ('hits', 'misses')]
+    valeurs = cache.get_many(cles)
+
+    resultat = {}
+    for domaine in DOMAINES:
+        hits = valeurs.get(_cle_statistique(domaine, 'hits'), 0)
+        misses = valeurs.get(_cle_statistique(domaine, 'misses'), 0)
+        total = hits + misses
+        resultat[domaine] = {
+            'hits': hits,
+            'misses': misses,
+            'taux': round(hits / total * 100, 1) if total else None,
+        }
+    return resultat
+
+
+def remettre_statistiques_a_zero():
+    with _verrou:
+        _compteurs.clear()
+    cache.delete_many([
+        _cle_statistique(domaine, resultat) for domaine in DOMAINES for resultat in ('hits', 'misses')
+    ])
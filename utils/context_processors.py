@@ -1,10 +1,7 @@
 # utils/context_processors.py
 def notifications_count(request):
+    """Compteur non lues lu dans le cache (aucune requête en régime établi)"""
     if request.user.is_authenticated:
-        from apps.notifications.models import Notification
-        count = Notification.objects.filter(
-            user=request.user,
-            read=False
-        ).count()
-        return {'notifications_unread_count': count}
-    return {'notifications_unread_count': 0}
\ No newline at end of file
+        from apps.notifications.services import CompteurNotifications
+        return {'notifications_unread_count': CompteurNotifications.get(request.user.pk)}
+    return {'notifications_unread_count': 0}
@@ -0,0 +1,163 @@
+# ==========================================
+# utils/exports.py - Moteur d'export CSV / XLSX en flux
+# ==========================================
+import csv
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+# Nombre de lignes lues par aller-retour base de données
+TAILLE_LOT = 2000
+
+FORMATS_EXPORT = ('csv', 'xlsx')
+
+
+class Colonne:
+    """
+    Colonne d'export : un titre et une source.
+    La source est soit un chemin d'attributs ('client.nom', 'get_statut_display'),
+    soit une fonction qui reçoit l'objet.
+    """
+
+    def __init__(self, titre, source):
+        self.titre = titre
+        self.source = source
+
+    def valeur(self, obj):
+        if callable(self.source):
+            return self.source(obj)
+
+        valeur = obj
+        for attribut in self.source.split('.'):
+            if valeur is None:
+                return None
+            valeur = getattr(valeur, attribut)
+            if callable(valeur):
+                valeur = valeur()
+        return valeur
+
+
+class SpecExport:
+    """Description d'un export : colonnes + relations à charger avec la requête"""
+
+    def __init__(self, nom, colonnes, select_related=()):
+        self.nom = nom
+        self.colonnes = colonnes
+        self.select_related = select_related
+
+    def preparer(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        return queryset
+
+    def entetes(self):
+        return [colonne.titre for colonne in self.colonnes]
+
+    def lignes(self, queryset):
+        """Générateur de lignes : les objets sont lus par lots, jamais tous en mémoire"""
+        for obj in self.preparer(queryset).iterator(chunk_size=TAILLE_LOT):
+            yield [colonne.valeur(obj) for colonne in self.colonnes]
+
+
+def _valeur_csv(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, datetime):
+        return timezone.localtime(valeur).strftime('%d/%m/%Y %H:%M') if timezone.is_aware(valeur) \
+            else valeur.strftime('%d/%m/%Y %H:%M')
+    if isinstance(valeur, date):
+        return valeur.strftime('%d/%m/%Y')
+    if isinstance(valeur, bool):
+        return 'Oui' if valeur else 'Non'
+    return valeur
+
+
+class _Tampon:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire"""
+
+    def write(self, valeur):
+        return valeur
+
+
+def export_csv(lignes, entetes, nom_fichier):
+    """Réponse CSV en flux (BOM UTF-8 pour l'ouverture directe dans Excel)"""
+    writer = csv.writer(_Tampon())
+
+    def generer():
+        yield '\ufeff'
+        yield writer.writerow(entetes)
+        for ligne in lignes:
+            yield writer.writerow([_valeur_csv(valeur) for valeur in ligne])
+
+    response = StreamingHttpResponse(generer(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}.csv"'
+    return response
+
+
+def export_xlsx(lignes, entetes, nom_fichier, titre_feuille='Export'):
+    """
+    Réponse XLSX écrite en mode mémoire constante (xlsxwriter) dans un fichier
+    temporaire, puis envoyée en flux.
+    """
+    import xlsxwriter
+
+    fichier = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(fichier, {
+        'constant_memory': True,
+        'remove_timezone': True,
+        'default_date_format': 'dd/mm/yyyy',
+    })
+    feuille = workbook.add_worksheet(titre_feuille[:31])
+    format_entete = workbook.add_format({'bold': True, 'bg_color': '#E5E7EB'})
+    format_date_heure = workbook.add_format({'num_format': 'dd/mm/yyyy hh:mm'})
+    format_montant = workbook.add_format({'num_format': '#,##0'})
+
+    feuille.write_row(0, 0, entetes, format_entete)
+    feuille.set_column(0, max(len(entetes) - 1, 0), 18)
+
+    # constant_memory impose l'écriture ligne par ligne, dans l'ordre
+    for numero, ligne in enumerate(lignes, start=1):
+        for colonne, valeur in enumerate(ligne):
+            if valeur is None:
+                continue
+            if isinstance(valeur, datetime):
+                if timezone.is_aware(valeur):
+                    valeur = timezone.localtime(valeur)
+                feuille.write_datetime(numero, colonne, valeur, format_date_heure)
+            elif isinstance(valeur, date):
+                feuille.write_datetime(numero, colonne, datetime(valeur.year, valeur.month, valeur.day))
+            elif isinstance(valeur, Decimal):
+                feuille.write_number(numero, colonne, float(valeur), format_montant)
+            elif isinstance(valeur, bool):
+                feuille.write_string(numero, colonne, 'Oui' if valeur else 'Non')
+            else:
+                feuille.write(numero, colonne, valeur)
+
+    workbook.close()
+    fichier.seek(0)
+
+    return FileResponse(
+        fichier,
+        as_attachment=True,
+        filename=f'{nom_fichier}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def get_format_export(request, defaut='csv'):
+    """Format demandé (?format=csv|xlsx)"""
+    format_export = request.GET.get('format', defaut).lower()
+    return format_export if format_export in FORMATS_EXPORT else defaut
+
+
+def reponse_export(spec, queryset, format_export='csv', nom_fichier=None):
+    """Point d'entrée des vues : exporte le queryset selon la spécification"""
+    nom_fichier = nom_fichier or f"{spec.nom}_{timezone.now():%Y%m%d}"
+    lignes = spec.lignes(queryset)
+
+    if format_export == 'xlsx':
+        return export_xlsx(lignes, spec.entetes(), nom_fichier, titre_feuille=spec.nom)
+    return export_csv(lignes, spec.entetes(), nom_fichier)
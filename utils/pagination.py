@@ -0,0 +1,196 @@
+# ==========================================
+# utils/pagination.py - Pagination par curseur (keyset) pour les listes
+# ==========================================
+import base64
+import json
+from functools import cached_property
+
+from django.db.models import Q
+from django.http import JsonResponse
+
+TAILLE_PAGE = 25
+PARAMETRE = 'curseur'
+
+
+def _champs(ordre):
+    """('-date_emission', 'pk') -> [('date_emission', True), ('pk', False)] ; pk ajouté si absent"""
+    champs = [(champ.lstrip('-'), champ.startswith('-')) for champ in ordre]
+    if champs[-1][0] not in ('pk', 'id'):
+        champs.append(('pk', champs[-1][1]))
+    return champs
+
+
+def _valeur(objet, champ):
+    for attribut in champ.split('__'):
+        objet = getattr(objet, attribut)
+    return objet
+
+
+def _serialiser_valeur(valeur):
+    # isoformat complet : les microsecondes comptent pour comparer des DateTimeField
+    if hasattr(valeur, 'isoformat'):
+        return valeur.isoformat()
+    return str(valeur)
+
+
+def encoder(sens, valeurs):
+    """Jeton opaque : sens ('>' page suivante, '<' page précédente) + valeurs de tri"""
+    brut = json.dumps([sens, valeurs], default=_serialiser_valeur, separators=(',', ':'))
+    return base64.urlsafe_b64encode(brut.encode()).decode().rstrip('=')
+
+
+def decoder(jeton, nombre_champs):
+    """(sens, valeurs) ; None si le jeton est absent ou illisible (retour en première page)"""
+    if not jeton:
+        return None
+    try:
+        sens, valeurs = json.loads(base64.urlsafe_b64decode(jeton + '=' * (-len(jeton) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if sens not in ('>', '<') or not isinstance(valeurs, list) or len(valeurs) != nombre_champs:
+        return None
+    return sens, valeurs
+
+
+def _condition(champs, valeurs, sens):
+    """
+    Lignes strictement après (ou avant) la position, dans l'ordre de tri :
+    a > x OR (a = x AND b > y) OR ... — servi par un index sur les champs de tri.
+    """
+    condition = Q()
+    egalites = {}
+    for (champ, descendant), valeur in zip(champs, valeurs):
+        apres = (sens == '>') != descendant
+        condition |= Q(**egalites, **{f"{champ}__{'gt' if apres else 'lt'}": valeur})
+        egalites[champ] = valeur
+    return condition
+
+
+class PageCurseur:
+    """
+    Une page de résultats : itérable dans les templates comme un queryset,
+    avec les jetons et URLs des pages voisines (autres paramètres GET conservés).
+    """
+
+    def __init__(self, objets, queryset, suivant, precedent, requete, parametre):
+        self.objets = objets
+        self.queryset = queryset
+        self.suivant = suivant
+        self.precedent = precedent
+        self.requete = requete
+        self.parametre = parametre
+
+    def __iter__(self):
+        return iter(self.objets)
+
+    def __len__(self):
+        return len(self.objets)
+
+    def __bool__(self):
+        return bool(self.objets)
+
+    def __getitem__(self, index):
+        return self.objets[index]
+
+    @property
+    def a_suivant(self):
+        return self.suivant is not None
+
+    @property
+    def a_precedent(self):
+        return self.precedent is not None
+
+    @property
+    def a_autres_pages(self):
+        return self.a_suivant or self.a_precedent
+
+    @cached_property
+    def total(self):
+        """COUNT du queryset filtré, calculé seulement si le template l'affiche"""
+        return self.queryset.count()
+
+    def _url(self, jeton):
+        if jeton is None:
+            return None
+        parametres = self.requete.GET.copy()
+        parametres[self.parametre] = jeton
+        parametres.pop('format', None)
+        return f'?{parametres.urlencode()}'
+
+    @property
+    def url_premiere(self):
+        parametres = self.requete.GET.copy()
+        parametres.pop(self.parametre, None)
+        parametres.pop('format', None)
+        return f'?{parametres.urlencode()}'
+
+    @property
+    def url_suivante(self):
+        return self._url(self.suivant)
+
+    @property
+    def url_precedente(self):
+        return self._url(self.precedent)
+
+    def en_json(self, serialiser):
+        return {
+            'resultats': [serialiser(objet) for objet in self.objets],
+            'suivant': self.suivant,
+            'precedent': self.precedent,
+        }
+
+
+def _charger(queryset, champs, sens, valeurs, taille):
+    """taille+1 lignes après (ou avant) la position, dans l'ordre d'affichage"""
+    tri = [f"{'-' if descendant == (sens == '>') else ''}{champ}" for champ, descendant in champs]
+    lignes = queryset.order_by(*tri)
+    if valeurs is not None:
+        lignes = lignes.filter(_condition(champs, valeurs, sens))
+    lignes = list(lignes[:taille + 1])
+    plus = len(lignes) > taille
+    lignes = lignes[:taille]
+    if sens == '<':
+        lignes.reverse()
+    return lignes, plus
+
+
+def paginer(request, queryset, ordre, taille=TAILLE_PAGE, parametre=PARAMETRE):
+    """
+    Page de `queryset` triée par `ordre` (champs non nuls, pk en dernier),
+    positionnée par le jeton ?<parametre>= : une requête LIMIT taille+1,
+    sans OFFSET ni COUNT, quel que soit le rang de la page.
+    """
+    champs = _champs(ordre)
+    sens, valeurs = decoder(request.GET.get(parametre), len(champs)) or ('>', None)
+
+    lignes, plus = _charger(queryset, champs, sens, valeurs, taille)
+    if sens == '<' and not lignes:
+        # Rien avant la position (lignes supprimées entre-temps) : première page
+        sens, valeurs = '>', None
+        lignes, plus = _charger(queryset, champs, sens, valeurs, taille)
+
+    if sens == '>':
+        a_suivant, a_precedent = plus, valeurs is not None
+    else:
+        a_suivant, a_precedent = True, plus
+
+    def jeton(sens_voisin, objet):
+        return encoder(sens_voisin, [_valeur(objet, champ) for champ, _ in champs])
+
+    return PageCurseur(
+        lignes,
+        queryset,
+        suivant=jeton('>', lignes[-1]) if a_suivant and lignes else None,
+        precedent=jeton('<', lignes[0]) if a_precedent and lignes else None,
+        requete=request,
+        parametre=parametre,
+    )
+
+
+def demande_json(request):
+    """Variante JSON d'une liste : ?format=json"""
+    return request.GET.get('format') == 'json'
+
+
+def reponse_json(page, serialiser, **extra):
+    return JsonResponse({**page.en_json(serialiser), **extra})
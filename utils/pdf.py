@@ -0,0 +1,98 @@
+# ==========================================
+# utils/pdf.py - Rendu PDF partagé (WeasyPrint)
+# ==========================================
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import get_template
+
+try:
+    from weasyprint import HTML, CSS, default_url_fetcher
+    from weasyprint.text.fonts import FontConfiguration
+    WEASYPRINT_AVAILABLE = True
+except ImportError:
+    WEASYPRINT_AVAILABLE = False
+
+# Feuilles de style déclarées par les applications (nom -> CSS brut)
+_feuilles = {}
+
+# Un moteur "chaud" par thread : configuration des polices et feuilles déjà compilées
+_moteurs = threading.local()
+
+
+def enregistrer_feuille(nom, css):
+    """Déclare une feuille de style, compilée une seule fois par thread de rendu"""
+    _feuilles[nom] = css
+
+
+def _fichier_local(chemin):
+    """Chemin disque d'une URL /static/ ou /media/, sinon None"""
+    if chemin.startswith(settings.STATIC_URL):
+        from django.contrib.staticfiles import finders
+
+        relatif = chemin[len(settings.STATIC_URL):]
+        fichier = finders.find(relatif) or Path(settings.STATIC_ROOT) / relatif
+    elif settings.MEDIA_URL and chemin.startswith(settings.MEDIA_URL):
+        fichier = Path(settings.MEDIA_ROOT) / chemin[len(settings.MEDIA_URL):]
+    else:
+        return None
+
+    fichier = Path(fichier).resolve()
+    return fichier if fichier.is_file() else None
+
+
+def url_fetcher(url, *args, **kwargs):
+    """Fichiers statiques et médias lus sur disque : jamais de requête HTTP vers nous-mêmes"""
+    fichier = _fichier_local(unquote(urlparse(url).path))
+    if fichier is not None:
+        url = fichier.as_uri()
+    return default_url_fetcher(url, *args, **kwargs)
+
+
+def _moteur():
+    if not hasattr(_moteurs, 'font_config'):
+        _moteurs.font_config = FontConfiguration()
+        _moteurs.feuilles = {}
+    return _moteurs
+
+
+def _feuille(nom):
+    moteur = _moteur()
+    if nom not in moteur.feuilles:
+        moteur.feuilles[nom] = CSS(string=_feuilles[nom], font_config=moteur.font_config)
+    return moteur.feuilles[nom]
+
+
+def prechauffer():
+    """Prépare le moteur du thread courant (polices + toutes les feuilles déclarées)"""
+    if WEASYPRINT_AVAILABLE:
+        for nom in list(_feuilles):
+            _feuille(nom)
+
+
+def rendre_pdf(template_name, contexte, feuilles=()):
+    """Rend un template Django en PDF (bytes) avec les feuilles nommées"""
+    if not WEASYPRINT_AVAILABLE:
+        raise RuntimeError("WeasyPrint n'est pas installé")
+
+    html_string = get_template(template_name).render(contexte)
+    moteur = _moteur()
+    html = HTML(
+        string=html_string,
+        base_url=Path(settings.BASE_DIR).resolve().as_uri() + '/',
+        url_fetcher=url_fetcher,
+    )
+    return html.write_pdf(
+        stylesheets=[_feuille(nom) for nom in feuilles],
+        font_config=moteur.font_config,
+    )
+
+
+def reponse_pdf(pdf, nom_fichier):
+    """Réponse HTTP de téléchargement d'un PDF déjà rendu"""
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}"'
+    return response